@@ -12,7 +12,6 @@ import Quetzal_tooltips
 import FreeCAD
 import FreeCADGui
 
-from pCmd import fCmd
 from quetzal_config import addCommand
 
 QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
@@ -582,6 +581,46 @@ class insertSection:
         }
 
 
+class exportFrameModel:
+    """
+    Writes the nodes, members and sections of the frames to a JSON or CSV
+    file for structural analysis (see fExport.exportModel()).
+    """
+    def IsActive(self):
+        if FreeCAD.ActiveDocument is None:
+            return False
+        else:
+            return True
+
+    def Activated(self):
+        if FreeCAD.ActiveDocument:
+            import fExport
+            from PySide.QtWidgets import QFileDialog
+
+            fileName = QFileDialog.getSaveFileName(
+                None,
+                translate("Quetzal_ExportFrameModel", "Export frame model"),
+                FreeCAD.ActiveDocument.Label + ".json",
+                "JSON (*.json);;CSV (*.csv)",
+            )[0]
+            if fileName:
+                model = fExport.exportModel(fileName)
+                FreeCAD.Console.PrintMessage(
+                    "Exported %d nodes and %d members\n"
+                    % (len(model["nodes"]), len(model["members"]))
+                )
+
+    def GetResources(self):
+        return {
+            "Pixmap": "Quetzal_FrameBranchManager",
+            "MenuText": QT_TRANSLATE_NOOP("Quetzal_ExportFrameModel", "Export frame model"),
+            "ToolTip": QT_TRANSLATE_NOOP(
+                "Quetzal_ExportFrameModel",
+                "Exports the nodes and members of FrameBranches and FrameLines for structural analysis",
+            ),
+        }
+
+
 # ---------------------------------------------------------------------------
 # Adds the commands to the FreeCAD command manager
 # ---------------------------------------------------------------------------
@@ -602,3 +641,4 @@ addCommand("Quetzal_InsertPath", insertPath())
 # addCommand('FrameLineManager',FrameLineManager())
 addCommand("Quetzal_InsertSection", insertSection())
 addCommand("Quetzal_FrameBranchManager", FrameBranchManager())
+addCommand("Quetzal_ExportFrameModel", exportFrameModel())
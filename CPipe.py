@@ -642,6 +642,38 @@ class insertRoute:
         }
 
 
+class importRoute:
+
+    def IsActive(self):
+        if FreeCAD.ActiveDocument is None:
+            return False
+        else:
+            return True
+
+    def Activated(self):
+        from PySide.QtGui import QFileDialog
+        import pImport
+
+        f = QFileDialog.getOpenFileName(
+            None, "Import line list", "", "Line list (*.csv *.json)"
+        )[0]
+        if f:
+            try:
+                pImport.importLineList(f)
+            except (pImport.LineListError, KeyError, ValueError) as e:
+                FreeCAD.Console.PrintError("Import failed: %s\n" % e)
+
+    def GetResources(self):
+        return {
+            "Pixmap": "Quetzal_InsertPypeLine",
+            "MenuText": QT_TRANSLATE_NOOP("Quetzal_ImportRoute", "Import line list"),
+            "ToolTip": QT_TRANSLATE_NOOP(
+                "Quetzal_ImportRoute",
+                "Build pipes and fittings from a CSV or JSON line list",
+            ),
+        }
+
+
 class makeHeader:
 
     def IsActive(self):
@@ -705,7 +737,66 @@ class insertOutlet:
                         "(Butt weld/socket weld|Straight/45 lateral)"),
         }
 
+class checkClearance:
+    """FreeCAD command: report the pipes closer than the required clearance."""
+
+    def Activated(self):
+        import pClearance
+
+        doc = FreeCAD.ActiveDocument
+        violations = pClearance.checkClearance(doc)
+        if not violations:
+            FreeCAD.Console.PrintMessage("No clearance violations\n")
+            return
+        for line, rows in sorted(pClearance.reportByLine(violations, doc).items()):
+            FreeCAD.Console.PrintWarning("%s: %d violations\n" % (line or "-", len(rows)))
+            for c, a, b in rows:
+                FreeCAD.Console.PrintWarning("  %s - %s: %.1f mm\n" % (a, b, c))
+        FreeCADGui.Selection.clearSelection()
+        for name in {n for c, a, b in violations for n in (a, b)}:
+            FreeCADGui.Selection.addSelection(doc.getObject(name))
+
+    def IsActive(self):
+        return FreeCAD.activeDocument() is not None
+
+    def GetResources(self):
+        return {
+            "Pixmap":   "Quetzal_InsertPypeLine",
+            "MenuText": QT_TRANSLATE_NOOP("Quetzal_CheckClearance",
+                                          "Check clearance"),
+            "ToolTip":  QT_TRANSLATE_NOOP("Quetzal_CheckClearance",
+                        "Report, per pype-line, the pipes, elbows and flanges "
+                        "closer than the clearance, insulation included"),
+        }
+
+class placeSupports:
+    """FreeCAD command: insert the U-bolts at the allowable span of the pipes."""
+
+    def Activated(self):
+        import pSupports
+
+        ubolts = pSupports.placeSupports(FreeCAD.ActiveDocument)
+        FreeCAD.Console.PrintMessage("%d supports inserted\n" % len(ubolts))
+        FreeCADGui.Selection.clearSelection()
+        for ub in ubolts:
+            FreeCADGui.Selection.addSelection(ub)
+
+    def IsActive(self):
+        return FreeCAD.activeDocument() is not None
+
+    def GetResources(self):
+        return {
+            "Pixmap":   "Quetzal_InsertUBolt",
+            "MenuText": QT_TRANSLATE_NOOP("Quetzal_PlaceSupports",
+                                          "Place supports"),
+            "ToolTip":  QT_TRANSLATE_NOOP("Quetzal_PlaceSupports",
+                        "Insert U-bolts along the pipes of the pype-lines at the "
+                        "allowable span, on the beams nearby where possible"),
+        }
+
 addCommand("Quetzal_InsertOutlet", insertOutlet())
+addCommand("Quetzal_CheckClearance", checkClearance())
+addCommand("Quetzal_PlaceSupports", placeSupports())
 # ---------------------------------------------------------------------------
 # Adds the commands to the FreeCAD command manager
 # ---------------------------------------------------------------------------
@@ -723,6 +814,7 @@ addCommand("Quetzal_InsertPypeLine", insertPypeLine())
 addCommand("Quetzal_InsertBranch", insertBranch())
 addCommand("Quetzal_InsertTank", insertTank())
 addCommand("Quetzal_InsertRoute", insertRoute())
+addCommand("Quetzal_ImportRoute", importRoute())
 addCommand("Quetzal_BreakPipe", breakPipe())
 addCommand("Quetzal_MateEdges", mateEdges())
 addCommand("Quetzal_JoinPype", joinPype())
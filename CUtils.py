@@ -243,6 +243,61 @@ class selectSolids:
         }
 
 
+class massRollUp:
+
+    def IsActive(self):
+        if FreeCAD.ActiveDocument is None:
+            return False
+        else:
+            return True
+
+    def Activated(self):
+        import uMass
+
+        sheet = uMass.toSpreadsheet()
+        mass, G = uMass.getCache().assembly()
+        FreeCAD.Console.PrintMessage(
+            "Assembly: %.1f kg, CoG (%.1f, %.1f, %.1f) -> %s\n" % (mass, G.x, G.y, G.z, sheet.Label)
+        )
+
+    def GetResources(self):
+        return {
+            "Pixmap": "Quetzal_QueryModel",
+            "MenuText": QT_TRANSLATE_NOOP("Quetzal_MassRollUp", "Weight and CoG"),
+            "ToolTip": QT_TRANSLATE_NOOP(
+                "Quetzal_MassRollUp",
+                "Mass and center of gravity of each frame and pype-line\n"
+                "and of the whole assembly, written in a spreadsheet",
+            ),
+        }
+
+
+class clashCheck:
+
+    def IsActive(self):
+        if FreeCAD.ActiveDocument is None:
+            return False
+        else:
+            return True
+
+    def Activated(self):
+        import uClash
+
+        uClash.report(uClash.checkClashes())
+
+    def GetResources(self):
+        return {
+            "Pixmap": "Quetzal_SelectSolids",
+            "MenuText": QT_TRANSLATE_NOOP("Quetzal_ClashCheck", "Check clashes"),
+            "ToolTip": QT_TRANSLATE_NOOP(
+                "Quetzal_ClashCheck",
+                "Find the pipes, elbows, beams and things that interfere\n"
+                "and select them; after the first run, only the objects\n"
+                "changed since are checked again",
+            ),
+        }
+
+
 # ---------------------------------------------------------------------------
 # Adds the commands to the FreeCAD command manager
 # ---------------------------------------------------------------------------
@@ -254,3 +309,5 @@ addCommand("Quetzal_HackedLine", hackedL())
 addCommand("Quetzal_MoveHandle", moveHandle())
 addCommand("Quetzal_PressureLossCalculator", dpCalc())
 addCommand("Quetzal_SelectSolids", selectSolids())
+addCommand("Quetzal_MassRollUp", massRollUp())
+addCommand("Quetzal_ClashCheck", clashCheck())
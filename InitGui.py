@@ -49,6 +49,17 @@ class QuetzalWorkbench(Workbench):
         here is the place to import all the commands.
         """
         QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
+        from time import perf_counter
+
+        # startup timing report: (stage, milliseconds) logged at the end
+        self.startupTimes = []
+        start = [perf_counter()]
+
+        def lap(stage):
+            now = perf_counter()
+            self.startupTimes.append((stage, (now - start[0]) * 1000))
+            start[0] = now
+
         import CUtils  # noqa: F401
 
         self.utilsList = [
@@ -60,9 +71,12 @@ class QuetzalWorkbench(Workbench):
             "Quetzal_HackedLine",
             "Quetzal_MoveHandle",
             "Quetzal_PressureLossCalculator",
+            "Quetzal_MassRollUp",
+            "Quetzal_ClashCheck",
         ]
         self.appendToolbar(QT_TRANSLATE_NOOP("Workbench", "Utils"), self.utilsList)
         Log("Loading Utils: done\n")
+        lap("Utils")
 
         import CFrame  # noqa: F401
         from cut_list.cut_list_commands import cutListCommand  # noqa: F401
@@ -84,9 +98,11 @@ class QuetzalWorkbench(Workbench):
             "Quetzal_AdjustFrameAngle",
             "Quetzal_InsertPath",
             "Quetzal_CreateCutList",
+            "Quetzal_ExportFrameModel",
         ]
         self.appendToolbar(QT_TRANSLATE_NOOP("Workbench", "Frame tools"), self.frameList)
         Log("Loading Frame tools: done\n")
+        lap("Frame tools")
 
         import CPipe  # noqa: F401
 
@@ -116,6 +132,7 @@ class QuetzalWorkbench(Workbench):
             "Quetzal_InsertTank",
             "Quetzal_InsertTerminalAdapter",
             "Quetzal_InsertRoute",
+            "Quetzal_ImportRoute",
             "Quetzal_BreakPipe",
             "Quetzal_MateEdges",
             "Quetzal_Flat",
@@ -128,15 +145,20 @@ class QuetzalWorkbench(Workbench):
             "Quetzal_Point2Point",
             "Quetzal_InsertAnyShape",
             "Quetzal_InsertBeam",
+            "Quetzal_CheckClearance",
+            "Quetzal_PlaceSupports",
         ]
+        lap("Pipe tools")
         from dodoPM import toolList
 
+        lap("Pie menu")
         import DraftTools
         import draftutils.init_tools as it
 
         it.init_toolbar(self,
                         QT_TRANSLATE_NOOP("Workbench", "Draft snap"),
                         it.get_draft_snap_commands())
+        lap("Draft snap")
         self.qm = toolList  # ["pipeQM","elbowQM","reductQM"]
         self.appendToolbar(QT_TRANSLATE_NOOP("Workbench", "Pipe tools"), self.pypeList)
         Log("Loading Pipe tools: done\n")
@@ -145,6 +167,15 @@ class QuetzalWorkbench(Workbench):
         self.appendMenu(QT_TRANSLATE_NOOP("Workbench", "Pipe tools"), self.pypeList)
         self.appendMenu(QT_TRANSLATE_NOOP("Workbench", "Utils"), self.utilsList)
         self.appendMenu(QT_TRANSLATE_NOOP("Workbench", "QM Menus"), self.qm)
+        lap("Menus")
+        self.startupReport()
+
+    def startupReport(self):
+        "logs the time spent in each stage of Initialize()"
+        total = sum(ms for stage, ms in self.startupTimes)
+        for stage, ms in self.startupTimes:
+            Log("Quetzal startup: %-12s %8.1f ms\n" % (stage, ms))
+        Msg("Quetzal initialized in %.0f ms\n" % total)
 
     def ContextMenu(self, recipient):
         QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
@@ -207,6 +238,9 @@ class QuetzalWorkbench(Workbench):
         # if hasattr(FreeCADGui, "Snapper"):  # patch
         #     FreeCADGui.Snapper.show()  # patchm
         self.setWatchers()
+        import pBOM
+
+        pBOM.install()
         FreeCAD.__activePypeLine__ = None
         FreeCAD.__activeFrameLine__ = None
         Msg("Created variables in FreeCAD module:\n")
@@ -1,14 +1,10 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 
-import os
-
 import FreeCAD
 import FreeCADGui
 
 QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
 
-from . import RESOURCE_PATH, cut_list_ui
-
 
 class cutListCommand:
     toolbarName = "Cut List"
@@ -24,6 +20,8 @@ class cutListCommand:
         }
 
     def Activated(self):
+        from . import cut_list_ui
+
         cut_list_ui.openCutListDialog()
 
     def IsActive(self):
@@ -2,7 +2,7 @@
 
 import csv
 from os import listdir, mkdir
-from os.path import abspath, dirname, join, exists
+from os.path import abspath, dirname, join
 
 import FreeCAD
 import FreeCADGui
@@ -399,19 +399,13 @@ class protoPypeForm(QDialog):
             qu.set_size_system(system)
         self.fillSizes()
 
-    def changeSize(self, s):
-        from os import makedirs, listdir
-        from os.path import join
-
-        # Do not attempt a cache lookup or image generation until the form has
-        # a complete selection (grade + size, and secondary size if applicable).
-        # An incomplete selection fires this signal during list population and
-        # would otherwise call self.insert(), creating and then deleting a
-        # document object -- potentially destroying the user's work.
-        if not self._previewReady():
-            self.labImage.clear()
-            return
-
+    def previewKey(self):
+        """
+        previewKey()
+        Returns the key (PType, rating, size stem) of the preview of the
+        current selection; the size stem is "DN400" or "DN400xDN150" for
+        two-port fittings.
+        """
         idx = self.sizeList.currentIndex()
         # Always use the raw DN PSize for the filename, never the display label
         # (which may be NPS or carry dimension suffixes).
@@ -450,80 +444,66 @@ class protoPypeForm(QDialog):
         except Exception:
             dn_psize2 = ""
 
-        # Build the full size stem: "DN400" or "DN400xDN150"
         size_stem = str(dn_psize) + ("x" + str(dn_psize2) if dn_psize2 else "")
+        return self.PType, str(self.ratingList.currentText()), size_stem
 
-        rateselected = self.ratingList.currentText()
-        preview_dir = self.previewSectionsPath + self.PType
-        makedirs(preview_dir, exist_ok=True)
-
-        # Canonical filename: <rating><PSize>[x<PSize2>].png
-        # e.g. SCH-STDDN150xDN100.png
-        canonical_name = str(rateselected) + size_stem + ".png"
-        self.gradeimagepath = canonical_name
-        self.fullimagepath  = join(preview_dir, canonical_name)
-
-        # Cache check: the cached filename stem (everything before ".png") must
-        # match the canonical stem EXACTLY.  A prefix-only check is unsafe
-        # because e.g. "SCH-STDDN40" is a prefix of "SCH-STDDN40xDN65.png",
-        # which would cause a straight-tee selection to display a reducing-tee
-        # image (or vice versa) whenever the larger name happens to sort first.
-        canonical_stem = str(rateselected) + size_stem  # no ".png"
-        cached_path = None
-        if exists(self.fullimagepath):
-            cached_path = self.fullimagepath
+    def showPreview(self, key, build=None):
+        """
+        showPreview(key, build=None)
+        Shows in labImage the thumbnail of key = (PType, rating, size stem),
+        from the memory cache or the atlas of PType (see pPreview.thumbnail()).
+        If it's not in the preview index, it's drawn offscreen by calling
+        build() in a scratch document (see pPreview.renderOffscreen()):
+        if pPreview.asynchronous is True a placeholder is shown and the
+        rendering is queued, so that only the last of the requests made
+        while browsing the sizes is rendered.
+          build: callable inserting the object; default self.insert
+        """
+        import pPreview
+
+        PType, rating, stem = key
+        self.gradeimagepath = rating + stem + ".png"
+        self.fullimagepath = join(self.previewSectionsPath, PType, self.gradeimagepath)
+        if build is None:
+            build = self.insert
+        self._previewRequest = None  # any pending request is now stale
+        pixmap = pPreview.thumbnail(self.previewSectionsPath, PType, rating, stem)
+        if pixmap:
+            self.labImage.setPixmap(pixmap)
+        elif pPreview.asynchronous:
+            self.labImage.setText(translate("protoPypeForm", "Rendering preview..."))
+            self._previewRequest = (key, build)
+            if not hasattr(self, "_previewTimer"):
+                self._previewTimer = QTimer(self)
+                self._previewTimer.setSingleShot(True)
+                self._previewTimer.timeout.connect(self._renderPreview)
+            self._previewTimer.start(pPreview.DELAY)
         else:
-            try:
-                for fname in listdir(preview_dir):
-                    if not fname.endswith(".png"):
-                        continue
-                    fname_stem = fname[:-4]  # strip ".png"
-                    if fname_stem == canonical_stem:
-                        cached_path = join(preview_dir, fname)
-                        break
-            except OSError:
-                pass
-
-        if cached_path:
-            self.labImage.setPixmap(QPixmap(cached_path).scaledToWidth(180))
+            self._showRendered(key, build)
+
+    def _renderPreview(self):
+        "renders the last queued preview request, if still current"
+        request, self._previewRequest = getattr(self, "_previewRequest", None), None
+        if request and self.isVisible():
+            self._showRendered(*request)
+
+    def _showRendered(self, key, build):
+        import pPreview
+
+        if pPreview.preview(self.previewSectionsPath, *key, build=build):
+            self.labImage.setPixmap(pPreview.thumbnail(self.previewSectionsPath, *key))
         else:
-            # 1. Save current selection and camera state
-            saved_sel = FreeCADGui.Selection.getSelectionEx()
-            view = FreeCADGui.ActiveDocument.ActiveView
-            
-            # getCamera() returns the current view parameters as a string
-            saved_camera = view.getCamera() 
-            
-            FreeCADGui.Selection.clearSelection()
-            
-            # 2. Insert the object
-            self.insert()
-            preview_obj = FreeCAD.ActiveDocument.ActiveObject
-            
-            if preview_obj:
-                preview_name = preview_obj.Name
-                preview_obj.Placement = FreeCAD.Placement()
-                FreeCAD.ActiveDocument.recompute()
-                
-                # 3. Capture the profile
-                self.capturePreviewProfile()
-                
-                # 4. Cleanup
-                try:
-                    FreeCAD.ActiveDocument.removeObject(preview_name)
-                except Exception:
-                    pass
-            
-            # Restore view using the saved string
-            view.setCamera(saved_camera)
-            
-            # Restore selection
-            for sx in saved_sel:
-                if not sx.SubElementNames:
-                    FreeCADGui.Selection.addSelection(sx.Object)
-                else:
-                    for sub in sx.SubElementNames:
-                        FreeCADGui.Selection.addSelection(sx.Object, sub)
+            self.labImage.clear()
+
+    def changeSize(self, s):
+        # Do not attempt a cache lookup or image generation until the form has
+        # a complete selection (grade + size, and secondary size if applicable).
+        # An incomplete selection fires this signal during list population and
+        # would otherwise call self.insert() on a partial selection.
+        if not self._previewReady():
+            self.labImage.clear()
+            return
+        self.showPreview(self.previewKey())
 
     def findDN(self, DN):
         result = None
@@ -532,54 +512,3 @@ class protoPypeForm(QDialog):
                 result = row
                 break
         return result
-
-    def capturePreviewProfile(self):
-        doc = FreeCAD.ActiveDocument
-        if not doc:
-            return
-        #some object classes were having trouble finding the correct path - seems to be an issue of / vs \ in the file path
-        import os as _os
-        _img_dir = _os.path.dirname(self.fullimagepath)
-        if _img_dir:
-            _os.makedirs(_img_dir, exist_ok=True)
-
-        view = FreeCADGui.ActiveDocument.ActiveView
-        preview_obj = doc.ActiveObject
-        vis_state = {}
-
-        # Hide other objects
-        for obj in doc.Objects:
-            if obj == preview_obj:
-                continue
-            try:
-                vis_state[obj.Name] = obj.Visibility
-                obj.Visibility = False
-            except:
-                pass
-
-        try:
-            # Set to Axometric and Orthographic
-            view.viewAxometric()
-            view.setCameraType("Orthographic")
-            
-            # Fit the object to the screen
-            view.fitAll() 
-            
-            # Allow the 3D view to update its camera 
-            # before the saveImage command fires.
-            from PySide.QtCore import QCoreApplication
-            QCoreApplication.processEvents() 
-            FreeCADGui.Selection.clearSelection()
-            
-            # Save the image
-            view.saveImage(self.fullimagepath, 300, 300, "Transparent")
-            
-        finally:
-            # Restore visibility
-            for name, state in vis_state.items():
-                try:
-                    target = doc.getObject(name)
-                    if target:
-                        target.Visibility = state
-                except:
-                    pass
@@ -5,7 +5,6 @@ import FreeCADGui
 import math
 import platform
 import csv
-import pCmd
 from PySide import QtCore
 from PySide import QtGui
 from os.path import join, dirname, abspath
@@ -385,6 +384,8 @@ class pQM(DialogQM):
         self.QM.lineEdit.validator().setBottom(0)
 
     def go(self):
+        import pCmd
+
         d = self.dictList[self.QM.listSize.currentRow()]
         if self.QM.lineEdit.text():
             L = float(self.QM.lineEdit.text())
@@ -413,6 +414,8 @@ class eQM(DialogQM):
         self.QM.lineEdit2.setValidator(QtGui.QDoubleValidator())
 
     def go(self):
+        import pCmd
+
         d = self.dictList[self.QM.listSize.currentRow()]
         if self.QM.lineEdit.text():
             ang = float(self.QM.lineEdit.text())
@@ -440,6 +443,8 @@ class fQM(DialogQM):
         super(fQM, self).__init__("Insert flange", "Flange")
 
     def go(self):
+        import pCmd
+
         d = self.dictList[self.QM.listSize.currentRow()]
         proplist = [
             d["PSize"],
@@ -475,6 +480,8 @@ class vQM(DialogQM):
         self.QM.gridLayout.addWidget(self.QM.slider, 4, 0, 1, 3)
 
     def go(self):
+        import pCmd
+
         d = self.dictList[self.QM.listSize.currentRow()]
         proplist = [
             d["PSize"],
@@ -493,6 +500,8 @@ class cQM(DialogQM):
         super(cQM, self).__init__("Insert cap", "Cap")
 
     def go(self):
+        import pCmd
+
         d = self.dictList[self.QM.listSize.currentRow()]
         if d.get("Conn", "").strip().upper() in ("SW", "TH"):
             # Socket-weld / threaded cap
@@ -512,6 +521,8 @@ class tQM(DialogQM):
         super(tQM, self).__init__("Insert tee", "Tee")
 
     def go(self):
+        import pCmd
+
         d = self.dictList[self.QM.listSize.currentRow()]
         if d.get("Conn", "").strip().upper() in ("SW", "TH"):
             # Socket-weld / threaded tee
@@ -532,12 +543,16 @@ class tQM(DialogQM):
         super(tQM, self).go()
 
 # create instances of qkMenu dialogs
-pqm = pQM()
-eqm = eQM()
-fqm = fQM()
-vqm = vQM()
-cqm = cQM()
-tqm = tQM()
+# the dialogs are created at their first use, see __getattr__()
+_qmClasses = {"pqm": pQM, "eqm": eQM, "fqm": fQM, "vqm": vQM, "cqm": cQM, "tqm": tQM}
+
+
+def __getattr__(name):
+    "creates the quick menu dialogs pqm, eqm... on first access"
+    if name in _qmClasses:
+        dialog = globals()[name] = _qmClasses[name]()
+        return dialog
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
 # main
 mw = FreeCADGui.getMainWindow()
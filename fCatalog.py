@@ -0,0 +1,128 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Index of the JIS sections of ShpstData.
+
+ShpstData keeps one dictionary {size string: tuple} per table and separate
+lists of the size strings. catalog() reads them once, at the first lookup,
+into one dictionary {(type, standard, size): record}: the records are named
+tuples with the numeric fields of the table, in the same order as the rows
+of ShpstData, so record.H and record[0] are the same value.
+Dimensions are in mm, the other fields in the units of the tables (cm2,
+kg/m, cm, cm3, cm4).
+"""
+
+__title__ = "frameTools catalog of JIS sections"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+from collections import namedtuple
+
+# the fields of the rows of each layout of table
+LAYOUTS = {
+    "Angle": "A B t r1 r2 area mass Cx Cy Ix Iy Iv ix iy iv Zx Zy",
+    "Channel": "H B t1 t2 r1 r2 area mass Cy Ix Iy ix iy Zx Zy",
+    "H": "H B t1 t2 r area mass Ix Iy ix iy Zx Zy",
+    "I": "H B t1 t2 r1 r2 area mass Ix Iy ix iy Zx Zy",
+    "CT": "H B t1 t2 r area mass Ix Iy ix iy Zx Zy",
+    "Pipe": "D t area mass Ix Iy ix iy Zx Zy",
+    "Tube": "D t",
+    "Flat_Bar": "t B area mass Ix Iy ix iy Zx Zy",
+    "Flat_Bar_SUS": "t B L",
+    "LW_angle": "A B t L",
+    "LW_channel": "H B t area mass Cy Ix Iy ix iy Zx Zy",
+    "LW_channel_SUS": "H B t",
+    "Rip_channel": "H A C t area mass Cy Ix Iy ix iy Zx Zy",
+    "Square_pipe": "A B t",
+}
+
+# (type, standard) -> (table of ShpstData, layout); the types and the
+# standards are those of ShpstData.type and ShpstData.<type>_st
+TABLES = {
+    ("Angle", "SS_Equal"): ("angle_ss_equal", "Angle"),
+    ("Angle", "SS_Unequal"): ("angle_ss_unequal", "Angle"),
+    ("Angle", "SUS_Equal"): ("angle_sus_equal", "Angle"),
+    ("Channel", "SS"): ("channel_ss", "Channel"),
+    ("Channel", "SUS"): ("channel_sus", "Channel"),
+    ("H", "SS_Wide"): ("H_ss_w", "H"),
+    ("H", "SS_Medium"): ("H_ss_m", "H"),
+    ("H", "SS_Thin"): ("H_ss_t", "H"),
+    ("H", "SUS"): ("H_sus", "H"),
+    ("I", "SS"): ("I_ss", "I"),
+    ("CT", "SS"): ("CT_ss", "CT"),
+    ("Pipe", "STK"): ("STK_ss", "Pipe"),
+    ("Flat_Bar", "SS"): ("flat_ss", "Flat_Bar"),
+    ("Flat_Bar", "SUS"): ("flat_sus", "Flat_Bar_SUS"),
+    ("LW_angle", "SS"): ("LW_angle_ss", "LW_angle"),
+    ("LW_angle", "SUS"): ("LW_angle_sus", "LW_angle"),
+    ("LW_channel", "SS"): ("LW_channel_ss", "LW_channel"),
+    ("LW_channel", "SUS"): ("LW_channel_sus", "LW_channel_SUS"),
+    ("Rip_channel", "SS"): ("Rip_channel_ss", "Rip_channel"),
+    ("Rip_channel", "SUS"): ("Rip_channel_sus", "Rip_channel"),
+    ("Square_pipe", "SS"): ("square_pipe_ss", "Square_pipe"),
+    ("Square_pipe", "SUS"): ("square_pipe_sus", "Square_pipe"),
+}
+
+# pipes of ShpstData.tubes: standard -> column of the thickness
+TUBES = {"SGP": 1, "SUS_Sch20S": 8, "SUS_Sch40": 9}
+
+_records = dict()  # layout -> namedtuple class
+_catalog = None  # (type, standard, size) -> record
+_sizes = None  # (type, standard) -> sizes in the order of ShpstData
+
+
+def recordType(layout):
+    "the namedtuple class of the rows of layout"
+    if layout not in _records:
+        fields = LAYOUTS[layout].split()
+        _records[layout] = namedtuple(layout, fields, defaults=[None] * len(fields))
+    return _records[layout]
+
+
+def catalog():
+    """
+    catalog()
+    Returns the dictionary {(type, standard, size): record} of all the
+    tables of ShpstData, built at first call.
+    """
+    global _catalog, _sizes
+    if _catalog is None:
+        import ShpstData
+
+        _catalog, _sizes = dict(), dict()
+        for (PType, standard), (table, layout) in TABLES.items():
+            Record = recordType(layout)
+            n = len(Record._fields)
+            sizes = _sizes[(PType, standard)] = list()
+            for size, row in getattr(ShpstData, table).items():
+                _catalog[(PType, standard, size)] = Record(*row[:n])
+                sizes.append(size)
+        Tube = recordType("Tube")
+        for standard, column in TUBES.items():
+            sizes = _sizes[("Pipe", standard)] = list()
+            for size, row in ShpstData.tubes.items():
+                if row[column]:
+                    _catalog[("Pipe", standard, size)] = Tube(row[0], row[column])
+                    sizes.append(size)
+    return _catalog
+
+
+def lookup(PType, standard, size):
+    """
+    lookup(PType, standard, size)
+    Returns the record of the section, e.g. lookup("Channel", "SS",
+    "100x50x5").H, or None if it's not in the catalog.
+    """
+    return catalog().get((PType, standard, size))
+
+
+def standards(PType):
+    "the standards of the type of section PType"
+    return [s for t, s in TABLES if t == PType] + (list(TUBES) if PType == "Pipe" else [])
+
+
+def sizes(PType, standard):
+    "the sizes of the section (PType, standard), in the order of ShpstData"
+    catalog()
+    return list(_sizes.get((PType, standard), []))
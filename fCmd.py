@@ -7,12 +7,14 @@ __license__ = "LGPL 3"
 
 from typing_extensions import Any
 import FreeCAD
-import FreeCADGui
 import DraftGeomUtils as dgu
 from DraftVecUtils import rounded
 from Part import Edge, Face, Vertex
 import Part
 
+if FreeCAD.GuiUp:
+    import FreeCADGui
+
 ############## AUXILIARY FUNCTIONS ###############
 
 
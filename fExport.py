@@ -0,0 +1,267 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Export of the analytical model of the frames.
+
+The members are the beams of the FrameBranch and FrameLine objects: their
+axes are read from Placement, Height and the offsets of the beams only, so
+no OCC shape is built or queried. The ends closer than a tolerance are
+merged in one node by a spatial hash and the sections are described with
+the dimensions of ./tablez/Section_*.csv and the properties of fCatalog or,
+where these are missing, those computed by fSection.
+"""
+
+__title__ = "frameTools analytical model export"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+import csv
+import json
+import re
+from itertools import product
+from os import listdir
+from os.path import abspath, dirname, join, splitext
+
+import FreeCAD
+
+import fCatalog
+import fSection
+
+X = FreeCAD.Vector(1, 0, 0)
+Z = FreeCAD.Vector(0, 0, 1)
+
+# FType of the profiles with "standard" and "size" properties -> type of fCatalog
+SHPST_TYPES = {"L": "Angle", "C": "Channel"}
+
+_sectionTable = None  # SSize -> row of Section_*.csv
+
+
+def sectionTable():
+    """
+    sectionTable()
+    Returns the dictionary {SSize: row} of all the ./tablez/Section_*.csv
+    files, read at first call.
+    """
+    global _sectionTable
+    if _sectionTable is None:
+        _sectionTable = dict()
+        folder = join(dirname(abspath(__file__)), "tablez")
+        for fileName in listdir(folder):
+            if fileName.startswith("Section_") and fileName.endswith(".csv"):
+                rating = splitext(fileName)[0][len("Section_") :]
+                with open(join(folder, fileName), "r") as f:
+                    for row in csv.DictReader(f, delimiter=";"):
+                        if row.get("SSize"):
+                            row["rating"] = rating
+                            _sectionTable[row["SSize"]] = row
+    return _sectionTable
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _analysis(sp):
+    "the fSection.properties() sp in the axes of the member: y major, z minor"
+    if not sp:
+        return dict()
+    return {
+        "A": sp["A"],
+        "mass": sp["mass"],
+        "Iy": sp["Ix"],
+        "Iz": sp["Iy"],
+        "Wy": sp["Wx"],
+        "Wz": sp["Wy"],
+    }
+
+
+def sectionOf(beam):
+    """
+    sectionOf(beam)
+    Returns (name, properties) of the section of the beam, a Quetzal Beam
+    or an Arch Structure: the dimensions in mm and, where the catalogs
+    have them, area (mm2), mass (kg/m) and inertias (mm4).
+    """
+    if hasattr(beam, "SSize") and hasattr(beam, "stype"):  # Quetzal Beam
+        name = beam.SSize
+        props = {"rating": beam.FRating, "stype": beam.stype}
+        for p in ("H", "W", "ta", "tf"):
+            props[p] = float(getattr(beam, p))
+        dims = [props[p] for p in ("H", "W", "ta", "tf")]
+        props.update(_analysis(fSection.properties(beam.stype, *dims)))
+        return name, props
+    profile = getattr(beam, "Base", None)
+    if profile is None:
+        return "", dict()
+    standard, size = getattr(profile, "standard", None), getattr(profile, "size", None)
+    FType = getattr(profile, "FType", "")
+    if standard and size and FType in SHPST_TYPES:
+        record = fCatalog.lookup(SHPST_TYPES[FType], standard, size)
+        if record:
+            props = {"rating": standard, "stype": FType}
+            props.update(_analysis(fSection.shpstProperties(SHPST_TYPES[FType], standard, size)))
+            if record.Ix:  # the tabulated values, where given
+                props.update(
+                    A=record.area * 100, mass=record.mass, Iy=record.Ix * 1e4, Iz=record.Iy * 1e4
+                )
+            return "%s %s %s" % (FType, standard, size), props
+    name = re.sub(r"-\d+$", "", profile.Label)
+    row = sectionTable().get(name)
+    if row:
+        props = {"rating": row["rating"], "stype": row["stype"]}
+        for p in ("H", "W", "ta", "tf"):
+            props[p] = _float(row.get(p))
+        props.update(_analysis(fSection.rowProperties(row)))
+        return name, props
+    # Arch profile not in the tables: its own parameters
+    props = {"stype": getattr(profile, "ProfileType", FType)}
+    for p, q in (
+        ("H", "Height"),
+        ("W", "Width"),
+        ("ta", "WebThickness"),
+        ("tf", "FlangeThickness"),
+    ):
+        if hasattr(profile, q):
+            props[p] = float(getattr(profile, q))
+        elif hasattr(profile, p):
+            props[p] = float(getattr(profile, p))
+    if "H" in props and "W" in props:
+        dims = [props[p] for p in ("H", "W")] + [props.get(p, 0.0) for p in ("ta", "tf")]
+        props.update(_analysis(fSection.properties(props["stype"], *dims)))
+    return name, props
+
+
+def memberAxis(beam):
+    """
+    memberAxis(beam)
+    Returns (P1, P2, xAxis): the ends of the axis of the beam without the
+    tail and head offsets of FrameBranch and the direction of the X axis
+    of its section.
+    """
+    rot = beam.Placement.Rotation
+    ax = rot.multVec(Z)
+    tail = getattr(beam, "tailOffset", 0.0)
+    head = getattr(beam, "headOffset", 0.0)
+    P1 = beam.Placement.Base + ax * tail
+    P2 = beam.Placement.Base + ax * (float(beam.Height) - head)
+    return P1, P2, rot.multVec(X)
+
+
+class NodeTable(object):
+    """
+    NodeTable(tol=1.0)
+    The nodes of the model: points closer than tol are merged, looking
+    only in the 27 cells of a spatial hash around the point.
+      tol: the merging distance in mm
+    """
+
+    def __init__(self, tol=1.0):
+        self.tol = tol
+        self.points = list()
+        self.cells = dict()  # cell -> indexes of points
+
+    def cell(self, P):
+        return tuple(int(c // self.tol) for c in (P.x, P.y, P.z))
+
+    def add(self, P):
+        "returns the index of the node in P, adding it if new"
+        cx, cy, cz = self.cell(P)
+        for d in product((-1, 0, 1), repeat=3):
+            for i in self.cells.get((cx + d[0], cy + d[1], cz + d[2]), []):
+                if (self.points[i] - P).Length <= self.tol:
+                    return i
+        self.points.append(FreeCAD.Vector(P))
+        self.cells.setdefault((cx, cy, cz), list()).append(len(self.points) - 1)
+        return len(self.points) - 1
+
+
+def frameBeams(doc=None):
+    """
+    frameBeams(doc=None)
+    Returns the list of (group, beam) of the FrameBranch and FrameLine
+    objects of the document.
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    result = list()
+    for o in doc.Objects:
+        FType = getattr(o, "FType", None)
+        if FType == "FrameBranch":
+            beams = [doc.getObject(n) for n in o.Beams if n]
+        elif FType == "FrameLine":
+            groups = doc.getObjectsByLabel(o.Group)
+            beams = groups[0].OutList if groups else []
+        else:
+            continue
+        result.extend((o, b) for b in beams if b and hasattr(b, "Height"))
+    return result
+
+
+def frameModel(doc=None, tol=1.0):
+    """
+    frameModel(doc=None, tol=1.0)
+    Returns the analytical model of the frames of the document as a
+    dictionary with lists "nodes" [id, x, y, z] and "members"
+    [id, node1, node2, section, group, label, xAxis] and the dictionary
+    "sections" {name: properties}.
+      tol: the distance to merge the nodes in mm
+    """
+    nodes = NodeTable(tol)
+    members = list()
+    sections = dict()
+    for group, beam in frameBeams(doc):
+        P1, P2, xAxis = memberAxis(beam)
+        name, props = sectionOf(beam)
+        sections.setdefault(name, props)
+        members.append(
+            [
+                len(members) + 1,
+                nodes.add(P1) + 1,
+                nodes.add(P2) + 1,
+                name,
+                group.Label,
+                beam.Label,
+                [round(c, 6) for c in xAxis],
+            ]
+        )
+    return {
+        "units": {"length": "mm", "area": "mm2", "inertia": "mm4", "mass": "kg/m"},
+        "nodes": [[i + 1, P.x, P.y, P.z] for i, P in enumerate(nodes.points)],
+        "members": members,
+        "sections": sections,
+    }
+
+
+def exportModel(fileName, doc=None, tol=1.0):
+    """
+    exportModel(fileName, doc=None, tol=1.0)
+    Writes the frameModel() of the document: a .json file, or with any
+    other extension three CSV files <name>_nodes, <name>_members and
+    <name>_sections.
+    Returns the model.
+    """
+    model = frameModel(doc, tol)
+    base, ext = splitext(fileName)
+    if ext.lower() == ".json":
+        with open(fileName, "w") as f:
+            json.dump(model, f, separators=(",", ":"))
+        return model
+    with open(base + "_nodes.csv", "w", newline="") as f:
+        w = csv.writer(f, delimiter=";")
+        w.writerow(["id", "x", "y", "z"])
+        w.writerows(model["nodes"])
+    with open(base + "_members.csv", "w", newline="") as f:
+        w = csv.writer(f, delimiter=";")
+        w.writerow(["id", "node1", "node2", "section", "group", "label", "xx", "xy", "xz"])
+        w.writerows(m[:6] + m[6] for m in model["members"])
+    keys = sorted({k for props in model["sections"].values() for k in props})
+    with open(base + "_sections.csv", "w", newline="") as f:
+        w = csv.writer(f, delimiter=";")
+        w.writerow(["section"] + keys)
+        for name, props in sorted(model["sections"].items()):
+            w.writerow([name] + [props.get(k, "") for k in keys])
+    return model
@@ -31,11 +31,12 @@ from PySide.QtWidgets import (
     QWidget,
 )
 
+import fCatalog
 import fCmd
+import fIndex
 import pCmd
 from quetzal_config import FREECADVERSION, get_icon_path
 from uCmd import label3D
-import ShpstData
 
 translate = FreeCAD.Qt.translate
 QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
@@ -94,44 +95,220 @@ def findFB(beamName=None, baseName=None):
     """
     Search FrameBranch object inside the Active document
     if beam name or base object name parameters are given, it will return the frameBranch related to beam or base object (skectch, wire ,etc)
+    The branches are found in the fIndex.BranchIndex, without scanning the document.
     """
-    Branches = [
-        o.Name
-        for o in FreeCAD.ActiveDocument.Objects
-        if hasattr(o, "FType") and o.FType == "FrameBranch"
-    ]
+    index = fIndex.getIndex()
+    if index is None:
+        return None
     if beamName:
-        for name in Branches:
-            if (
-                beamName in FreeCAD.ActiveDocument.getObject(name).Beams
-            ):  # if beam.Name in activeFB.Beams:
-                return FreeCAD.ActiveDocument.getObject(name)
+        return index.branchOf(beamName)
     elif baseName:
-        for name in Branches:
-            if (
-                baseName == FreeCAD.ActiveDocument.getObject(name).Base.Name
-            ):  # if beam.Name in activeFB.Beams:
-                return FreeCAD.ActiveDocument.getObject(name)
+        return index.branchOfBase(baseName)
     return None
 
 
 def refreshBranchObject(beamChild=None):
     """
-    Touch each FrameBranch object in document
+    Recompute the FrameBranch of beamChild and its beams only
+    """
+    bf = findFB(beamChild.Name)
+    if bf:
+        bf.touch()
+        fIndex.recomputeBranch(bf)
+
+
+class branchBatch(object):
+    """
+    with branchBatch(name=None) as batch:
+        beam.headOffset = ...
+        batch.add(beam)
+    Collects the FrameBranch objects of the beams edited inside the block:
+    at the end each of them is executed once and recomputed with its beams
+    only (see fIndex.recomputeBranch()), whatever the number of beams;
+    inside a pCmd.batch() they are left to its final recompute.
+      name: the name of the transaction; None for no transaction, e.g.
+        while dragging the sliders
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.branches = dict()
+
+    def add(self, beam):
+        FB = findFB(beam.Name)
+        if FB:
+            self.branches[FB.Name] = FB
+
+    def __enter__(self):
+        self.doc = FreeCAD.ActiveDocument
+        if self.name:
+            pCmd.openTransaction(self.name, self.doc)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            for FB in self.branches.values():
+                FB.Proxy.execute(FB)  # sets Height and offset of the beams
+                if not pCmd.inBatch():
+                    fIndex.recomputeBranch(FB)
+            if self.name:
+                pCmd.commitTransaction(self.doc)
+        elif self.name and not pCmd.inBatch():
+            self.doc.abortTransaction()
+        return False
+
+
+def beamEdgeIndex(beam):
+    """
+    beamEdgeIndex(beam)
+    Returns the index of the edge of the FrameBranch Base the beam is attached to.
+    """
+    if int(FreeCAD.Version()[0]) >= 1:
+        support = beam.AttachmentSupport
+    else:
+        support = beam.Support
+    return int(support[0][1][0][4:]) - 1
+
+
+def branchEnds(edges, decimals=4):
+    """
+    branchEnds(edges, decimals=4)
+    Returns a dictionary {rounded end point: [indexes of the straight edges ending there]}
+      edges: the edges of the FrameBranch Base
+      decimals: the rounding of the coordinates
+    """
+    ends = dict()
+    for i, e in enumerate(edges):
+        if e.curvatureAt(0) != 0:
+            continue
+        for v in (e.Vertexes[0], e.Vertexes[-1]):
+            key = tuple(round(c, decimals) for c in v.Point)
+            ends.setdefault(key, list()).append(i)
+    return ends
+
+
+def sharedEnd(e1, e2):
     """
-    # import timeit
-    # codigomedir2='''for b in [o for o in FreeCAD.ActiveDocument.Objects if hasattr(o, "FType") and o.FType == "FrameBranch"]:
-    #     b.touch()'''
-    # timefull2=timeit.timeit(codigomedir2,number=1,globals={'FreeCAD': FreeCAD,'fCmd':fCmd})
-    # print("Algoritmo de busqueda de FrameBranch:")
-    # print(f"tiempo total: {timefull2:.4f} segundos")
-    # print(f"Promedio por ejecución: {timefull2/1000:.6f} segundos")
-    for bf in [o for o in FreeCAD.ActiveDocument.Objects if hasattr(o, "FType") and o.FType == "FrameBranch"]:
-        for selected in bf.Beams:
-            if selected == beamChild.Name:
-                # print(bf.Name)
-                bf.touch()
-    FreeCAD.ActiveDocument.recompute()
+    sharedEnd(e1, e2)
+    Returns (P, d1, d2, gap): P is the end of e1 nearest to one end of e2,
+    d1 and d2 the unit vectors of the edges pointing away from it and gap
+    the distance between the two ends.
+    """
+    gap, k1, k2 = min(
+        (e1.Vertexes[a].Point.distanceToPoint(e2.Vertexes[b].Point), a, b)
+        for a in (0, -1)
+        for b in (0, -1)
+    )
+    P = e1.Vertexes[k1].Point
+    d1 = (e1.Vertexes[-1 - k1].Point - P).normalize()
+    d2 = (e2.Vertexes[-1 - k2].Point - e2.Vertexes[k2].Point).normalize()
+    return P, d1, d2, gap
+
+
+def miterHalfSpace(P, d1, d2, size):
+    """
+    miterHalfSpace(P, d1, d2, size)
+    Returns the box of side size laying beyond the bisector plane of
+    directions d1 and d2 through P, on the side of d2: subtracted from the
+    beam along d1, it cuts the miter of the joint.
+    """
+    m = d1.sub(d2)
+    if m.Length < 1e-6:
+        return None  # overlapping edges
+    box = Part.makeBox(size, size, size, FreeCAD.Vector(-size / 2, -size / 2, -size))
+    box.Placement = FreeCAD.Placement(P, FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), m))
+    return box
+
+
+def makeMiterCut(branch, edge, otherEdge):
+    """
+    makeMiterCut(branch, edge, otherEdge)
+    Adds to the document a MiterCut of the beam of branch on edge at its
+    joint with otherEdge and returns it.
+    """
+    a = branch.Document.addObject("Part::FeaturePython", "MiterCut")
+    MiterCut(a, branch, edge, otherEdge)
+    if a.ViewObject:
+        a.ViewObject.Proxy = 0
+        a.ViewObject.Visibility = False
+    return a
+
+
+def makeCopeCut(branch, edge, otherEdge):
+    """
+    makeCopeCut(branch, edge, otherEdge)
+    Adds to the document a CopeCut of the beam of branch on edge where it
+    ends along edge otherEdge and returns it.
+    """
+    a = branch.Document.addObject("Part::FeaturePython", "CopeCut")
+    CopeCut(a, branch, edge, otherEdge)
+    if a.ViewObject:
+        a.ViewObject.Proxy = 0
+        a.ViewObject.Visibility = False
+    return a
+
+
+def miterBranch(branch):
+    """
+    miterBranch(branch)
+    Cuts the beams of the FrameBranch at the joints of its Base:
+    - where two edges share one end, both beams are mitered with a MiterCut
+      along the bisector plane;
+    - where one edge ends along another one, its beam is coped with a
+      CopeCut, the Profile of the branch extruded along the other edge.
+    The cuts are the Subtractions of the beams, so they follow the later
+    changes of the Base. The cuts already in place are not duplicated.
+    Returns the number of cuts added.
+    """
+    doc = branch.Document
+    edges = branch.Base.Shape.Edges
+    beams = dict()
+    for name in branch.Beams:
+        beam = doc.getObject(name) if name else None
+        if beam:
+            beams[beamEdgeIndex(beam)] = beam
+
+    def cuts(beam, FType):
+        "the edges already cut on beam by the cuts of FType"
+        return [
+            o.OtherEdge
+            for o in beam.Subtractions
+            if hasattr(o, "FType") and o.FType == FType
+        ]
+
+    n = 0
+    pCmd.openTransaction(translate("Transaction", "Cut Miters"), doc)
+    for P, indexes in branchEnds(edges).items():
+        if len(indexes) == 2:
+            for i, j in (indexes, indexes[::-1]):
+                beam = beams.get(i)
+                if beam is None or j in cuts(beam, "MiterCut"):
+                    continue
+                beam.Subtractions = beam.Subtractions + [makeMiterCut(branch, i, j)]
+                n += 1
+        elif len(indexes) == 1:
+            i = indexes[0]
+            beam = beams.get(i)
+            end = Part.Vertex(FreeCAD.Vector(*P))
+            for j, other in beams.items():
+                if (
+                    beam is None
+                    or j == i
+                    or j in cuts(beam, "CopeCut")
+                    or i in cuts(other, "CopeCut")
+                    or edges[j].distToShape(end)[0] > 1e-3
+                ):
+                    continue
+                beam.Subtractions = beam.Subtractions + [makeCopeCut(branch, i, j)]
+                n += 1
+                break
+        else:
+            FreeCAD.Console.PrintWarning(
+                "%d beams meet in %s: not mitered\n" % (len(indexes), FreeCAD.Vector(*P))
+            )
+    pCmd.commitTransaction(doc)
+    pCmd.recompute(doc)
+    return n
 
 
 ################ DIALOGS #############################
@@ -238,6 +415,8 @@ class frameLineForm(QDialog):
             FreeCAD.__activeFrameLine__ = self.combo.currentText()
             self.current = FreeCAD.ActiveDocument.getObjectsByLabel(self.combo.currentText())[0]
             FreeCAD.Console.PrintMessage("current FrameLine = " + self.current.Label + "\n")
+            if hasattr(self.current, "ShareProfile"):
+                self.cb1.setChecked(not self.current.ShareProfile)
             if self.current.Profile:
                 FreeCAD.Console.PrintMessage("Profile: %s\n" % self.current.Profile.Label)
             else:
@@ -310,10 +489,9 @@ class frameLineForm(QDialog):
 
     def redraw(self):
         if self.current and self.current.Profile and self.current.Base:
-            if self.cb1.isChecked():
-                self.current.Proxy.update(self.current)
-            else:
-                self.current.Proxy.update(self.current, copyProfile=False)
+            if hasattr(self.current, "ShareProfile"):
+                self.current.ShareProfile = not self.cb1.isChecked()
+            self.current.Proxy.update(self.current, copyProfile=self.cb1.isChecked())
             self.updateSections()
         else:
             FreeCAD.Console.PrintError("Select a Path and a Profile before\n")
@@ -576,82 +754,15 @@ class frameBranchForm(dodoDialogs.protoTypeDialog):
         FreeCAD.ActiveDocument.recompute()
 
     def cutMiters(self):
-        import ArchCutPlane
-
-        volumes = list()
-        totalvertexes = 0
+        """
+        Cuts the miters of the selected FrameBranch (see miterBranch()).
+        """
         sel = FreeCADGui.Selection.getSelection()
-        seldoc = FreeCAD.ActiveDocument
-        miterplanesfaces = self.getMiterPlanesFaces(seldoc)
-        framebeams = self.getBeamsFromStructureNames(sel)
-        for beam in framebeams:
-            for miterplaneface in miterplanesfaces:
-                matchpoints = False
-                sketcher = beam.AttachmentSupport[0][0]
-                edgename = beam.AttachmentSupport[0][1][0]
-                index = int(edgename[4:]) - 1
-                if self.roundVectors(miterplaneface.CenterOfMass, 4) == self.roundVectors(
-                    sketcher.Shape.Edges[index].Vertexes[0].Point, 4
-                ):
-                    matchpoints = True
-                    totalvertexes = totalvertexes + 1
-                elif self.roundVectors(miterplaneface.CenterOfMass, 4) == self.roundVectors(
-                    sketcher.Shape.Edges[index].Vertexes[1].Point, 4
-                ):
-                    matchpoints = True
-                    totalvertexes = totalvertexes + 1
-                if matchpoints:
-                    # FreeCAD.Console.PrintMessage('Plano: '+str()+'\r')
-                    ArchCutPlane.cutComponentwithPlane(beam, miterplaneface, side=0)
-                    FreeCAD.ActiveDocument.recompute()
-                    volumes.append(beam.Shape.Volume)
-                    self.removeCutVolume(beam)
-                    ArchCutPlane.cutComponentwithPlane(beam, miterplaneface, side=1)
-                    FreeCAD.ActiveDocument.recompute()
-                    volumes.append(beam.Shape.Volume)
-                    # volumes.sort()
-                    if volumes[0] < volumes[1]:
-                        FreeCAD.Console.PrintMessage(
-                            str(beam.Name)
-                            + " volume1: "
-                            + str(volumes[0])
-                            + "< volume2: "
-                            + str(volumes[1])
-                            + "\r"
-                        )
-                        FreeCAD.ActiveDocument.recompute()
-                    elif volumes[0] > volumes[1]:
-                        self.removeCutVolume(beam)
-                        ArchCutPlane.cutComponentwithPlane(beam, miterplaneface, side=0)
-                        FreeCAD.Console.PrintMessage(
-                            str(beam.Name)
-                            + " volume1: "
-                            + str(volumes[0])
-                            + "> volume2: "
-                            + str(volumes[1])
-                            + "\r"
-                        )
-                        FreeCAD.ActiveDocument.recompute()
-                    volumes.clear()
-        FreeCAD.Console.PrintMessage("totalvertexes: " + str(totalvertexes))
-
-    def removeCutVolume(self, beam):
-        cutvolumeitems = list()
-        cutvolumeid = list()
-        for obj in beam.OutList:
-            if obj.TypeId == "Part::Feature" and obj.Label.startswith("CutVolume"):
-                cutvolumeid.append(obj.ID)
-                cutvolumeitems.append(obj)
-        cutvolumeid.sort(reverse=True)
-        lastobj = cutvolumeid[0]
-        for obj in beam.OutList:
-            if (
-                obj.TypeId == "Part::Feature"
-                and obj.Label.startswith("CutVolume")
-                and obj.ID == lastobj
-            ):
-                FreeCAD.ActiveDocument.removeObject(obj.Label)
-                FreeCAD.ActiveDocument.recompute()
+        if sel and hasattr(sel[0], "FType") and sel[0].FType == "FrameBranch":
+            n = miterBranch(sel[0])
+            FreeCAD.Console.PrintMessage("%s: %d cuts added\n" % (sel[0].Label, n))
+        else:
+            FreeCAD.Console.PrintError("Select one FrameBranch\n")
 
     def getBeamsFromStructureNames(self, sel):
         """
@@ -664,118 +775,53 @@ class frameBranchForm(dodoDialogs.protoTypeDialog):
                 framebeams.append(beam)
         return framebeams
 
-    def getMiterPlanesFaces(self, seldoc):
-        """
-        Return a list with plane named 'cutplane' from the whole seldoc
-        """
-        miterplanes = list()
-        for object in seldoc.Objects:
-            if object.Name.startswith("cutplane"):
-                miterplanes.append(object.Shape.Faces[0])
-                object.Visibility=False
-        return miterplanes
-
     def roundVectors(self, vxlist, num):
         l = [v for v in vxlist]
         return FreeCAD.Vector(round(l[0], num), round(l[1], num), round(l[2], num))
 
     def generateBisectPlanes(self):
-        """Get intersection between lines, generate a plane between lines & do a boolean diferente"""
+        """
+        Adds one plane "cutplane" in each joint of the Base of the selected
+        FrameBranch, on the bisector of its two edges: the same plane cut by
+        miterBranch(). The joints are those of branchEnds() and the planes
+        are created with one recompute only.
+        """
+        import numpy
+
         sel = FreeCADGui.Selection.getSelection()
-        from DraftGeomUtils import findIntersection
-        # FreeCAD.Console.PrintMessage('posicion de boceto:'+ str(sel[0].Placement.Rotation)+'\r\n')
-        i=0
-        rep=0
-        reachedlines = []
-        interVertex = []
-        if sel[0].FType == 'FrameBranch':
-          for element in sel[0].Base.Geometry:
-              # FreeCAD.Console.PrintMessage('Segmento '+str(element)+'\r\n')
-              for subelement in sel[0].Base.Geometry:
-                  # Avoid process the geometric element that match StartPoint and EndPoint and also just have process elements with  a common point
-                  if  (element.EndPoint != subelement.EndPoint or
-                       element.StartPoint != subelement.StartPoint or
-                       (element.EndPoint != subelement.EndPoint and
-                        element.StartPoint != subelement.StartPoint) and
-                       (element.EndPoint != subelement.StartPoint and
-                        element.StartPoint != subelement.EndPoint)):
-                      #WARN:intersectionCLines method forces to detect infinite intersections that is not required
-                      # interVertex=fCmd.intersectionCLines(element.toShape().Edges[0],subelement.toShape().Edges[0])                        
-                      interVertex=findIntersection(element.toShape().Edges[0],subelement.toShape().Edges[0],infinite1=False, infinite2=False)
-                      if interVertex:
-                          roundelementStart=self.roundVectors(element.StartPoint,2)
-                          roundelementEnd=self.roundVectors(element.EndPoint,2)
-                          roundsubelementStart=self.roundVectors(subelement.StartPoint,2)
-                          roundsubelementEnd=self.roundVectors(subelement.EndPoint,2)
-                          roundinterVertex=self.roundVectors(interVertex[0],2)
-                          if [element.Tag,subelement.Tag] not in reachedlines:
-                              content=True
-                              reachedlines.append([element.Tag,subelement.Tag])
-                          else:
-                              content=False
-                          if [subelement.Tag,element.Tag] not in reachedlines:
-                              contentsub=True
-                              reachedlines.append([subelement.Tag,element.Tag])
-                          else:
-                              contentsub=False
-                          if (content) or (contentsub):
-                              # FreeCAD.Console.PrintMessage('Punto de interseccion: '+str(interVertex[0])+'\r\n')
-                              # Store edge pair that intersect
-                              FreeCAD.Console.PrintMessage('Reachedlines: {0} and {1}'.format(reachedlines[rep][0],reachedlines[rep][1])+'\r\n')
-                              rep=rep+1
-                              # FIXME: intersectCC method does not return line intersection; findIntersection method does it right
-                              # interpoint=element.intersectCC(subelement)[0] 
-
-                              # FreeCAD.Console.PrintMessage('Segmento '+str(element)+' intersecta con segmento '+str(subelement)+' aqui:'+ str(interpoint)+'\r\n')
-                              # FreeCAD.Console.PrintMessage(str(type(interpoint)))
-                              # INFO:Section aided to get bisect vector on each intersection
-                              if roundelementStart== roundinterVertex:
-                                  resultv1 = FreeCAD.Vector(element.EndPoint-element.StartPoint)
-                              elif roundelementEnd == roundinterVertex:
-                                  resultv1 = FreeCAD.Vector(element.StartPoint-element.EndPoint)
-                              if roundsubelementStart == roundinterVertex:
-                                  resultv2 = FreeCAD.Vector(subelement.EndPoint-subelement.StartPoint)
-                              elif roundsubelementEnd == roundinterVertex:
-                                  resultv2 = FreeCAD.Vector(subelement.StartPoint-subelement.EndPoint)
-                              bisectvector=fCmd.bisect(resultv1,resultv2)
-                              plane=FreeCAD.activeDocument().addObject("Part::Plane","cutplane")
-                              import numpy
-                              from math import pi
-                              plane.AttachmentSupport = sel[0].Base.AttachmentSupport
-                              plane.MapMode = 'FlatFace'
-                              self.rotvector =(interVertex[0])-(FreeCAD.Vector(0,plane.Length/2,-plane.Length/2))
-                              # INFO: Section aided to apply random color to each plane
-                              randomcolorarray=numpy.random.choice(range(256),size=3)
-                              plane.ViewObject.ShapeAppearance = FreeCAD.Material(DiffuseColor= tuple(map(int,randomcolorarray)))
-                              plane.recompute()
-                              # self.CenterOfMass = plane.Shape.CenterOfMass
-                              # INFO:Section aided to get the correct plane orientation on each intersection
-                              self.placementrotplan = FreeCAD.Placement(self.rotvector,FreeCAD.Rotation(FreeCAD.Vector(0,1,0),90))
-                              plane.AttachmentOffset = self.placementrotplan
-                              # FreeCAD.Console.PrintMessage('Antes Angulo de arista a vector bisectriz: '+str((FreeCAD.Rotation(bisectvector,plane.Shape.normalAt(0,0)).Angle)*180/pi)+'\r\n')
-                              # crossvector=resultv1.cross(resultv2).normalize()
-                              # FreeCAD.Console.PrintMessage('Vector cruz: '+str(crossvector)+'\r\n')
-                              # FreeCAD.Console.PrintMessage('Vector normal de plano: '+str(self.roundVectors(plane.Shape.normalAt(0,0),2))+'\r\n')
-                              self.placementrelative = FreeCAD.Placement(FreeCAD.Vector(0,0,0),FreeCAD.Rotation(plane.Shape.normalAt(0,0),bisectvector),interVertex[0]).multiply(self.placementrotplan)
-                              # plane.AttachmentOffset = self.placementrelative
-                              # FreeCAD.Console.PrintMessage('Despues Angulo de arista a vector bisectriz: '+str((FreeCAD.Rotation(bisectvector,plane.Shape.normalAt(0,0)).Angle)*180/pi)+'\r\n')
-                              if self.roundVectors(plane.Shape.normalAt(0,0),0) == FreeCAD.Vector(1.0, 0.0, 0.0):
-                                  rotateplane=90
-                              else:
-                                  rotateplane=0
-                              self.placementfinal = FreeCAD.Placement(FreeCAD.Vector(0,0,0),FreeCAD.Rotation(FreeCAD.Vector(0,0,1),rotateplane),interVertex[0]).multiply(self.placementrelative)
-                              plane.AttachmentOffset = self.placementfinal
-                              # FreeCAD.Console.PrintMessage(str(plane.Name))
-                              # sel[0].cutplanes.append(plane.Name)
-              # TODO::Made method definition to change plane dots colors
-              # if i==0:
-              #     FreeCADGui.ActiveDocument.myplane.PointSize = 10
-              #     FreeCADGui.ActiveDocument.myplane.PointColor = 100,50,20
-              # elif i>=1:
-              #     obj=FreeCADGui.ActiveDocument.getObject('myplane00'+str(i))
-              #     obj.PointSize = 10
-              #     obj.PointColor = 100,50,20
-              i=i+1
+        if not (sel and hasattr(sel[0], "FType") and sel[0].FType == "FrameBranch"):
+            FreeCAD.Console.PrintError("Select one FrameBranch\n")
+            return
+        branch = sel[0]
+        doc = branch.Document
+        edges = branch.Base.Shape.Edges
+        if branch.Profile:
+            size = 1.5 * branch.Profile.Shape.BoundBox.DiagonalLength
+        else:
+            size = 100
+        n = 0
+        with pCmd.batch(translate("Transaction", "Generate bisect planes"), doc):
+            for indexes in branchEnds(edges).values():
+                if len(indexes) != 2:
+                    continue
+                P, d1, d2, gap = sharedEnd(edges[indexes[0]], edges[indexes[1]])
+                m = d1.sub(d2)
+                if m.Length < 1e-6:
+                    continue
+                rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), m)
+                plane = doc.addObject("Part::Plane", "cutplane")
+                plane.Length = plane.Width = size
+                plane.Placement = FreeCAD.Placement(
+                    P - rot.multVec(FreeCAD.Vector(size / 2, size / 2, 0)), rot
+                )
+                if plane.ViewObject:
+                    # INFO: random color to tell each plane apart
+                    randomcolorarray = numpy.random.choice(range(256), size=3)
+                    plane.ViewObject.ShapeAppearance = FreeCAD.Material(
+                        DiffuseColor=tuple(map(int, randomcolorarray))
+                    )
+                n += 1
+        FreeCAD.Console.PrintMessage("%s: %d bisect planes\n" % (branch.Label, n))
 
     def accept(self):
         if FreeCAD.ActiveDocument:
@@ -1011,31 +1057,24 @@ class frameBranchForm(dodoDialogs.protoTypeDialog):
             FreeCAD.Console.PrintError("No frameBranch or profile selected\n")
 
     def changeHeadOffset(self):
-        for beam in fCmd.beams():
-            if hasattr(beam, "headOffset"):
-                beam.headOffset = float(self.form.editHead.text())
-                FB = findFB(beam.Name)
-                FB.touch()
-        FreeCAD.ActiveDocument.recompute()
-        FreeCAD.ActiveDocument.recompute()
+        self.editBeams("headOffset", float(self.form.editHead.text()))
 
     def changeTailOffset(self):
-        for beam in fCmd.beams():
-            if hasattr(beam, "tailOffset"):
-                beam.tailOffset = float(self.form.editTail.text())
-                FB = findFB(beam.Name)
-                FB.touch()
-        FreeCAD.ActiveDocument.recompute()
-        FreeCAD.ActiveDocument.recompute()
+        self.editBeams("tailOffset", float(self.form.editTail.text()))
 
     def changeAngle(self):
-        for beam in fCmd.beams():
-            if hasattr(beam, "spin"):
-                FB = findFB(beam.Name)
-                beam.spin = float(self.form.editAngle.text())
-                FB.touch()
-        FreeCAD.ActiveDocument.recompute()
-        FreeCAD.ActiveDocument.recompute()
+        self.editBeams("spin", float(self.form.editAngle.text()))
+
+    def editBeams(self, prop, value):
+        """
+        Sets prop = value in all the selected beams of FrameBranches and
+        updates them in one branchBatch
+        """
+        with branchBatch() as batch:
+            for beam in fCmd.beams():
+                if hasattr(beam, prop):
+                    setattr(beam, prop, value)
+                    batch.add(beam)
 
     def stretchTail(self):
         beams = fCmd.beams()
@@ -1063,42 +1102,45 @@ class frameBranchForm(dodoDialogs.protoTypeDialog):
         first a face or a edge must be selected with selected objetives button before any trim or extend operation.
         """
         try:
-            FreeCAD.activeDocument().openTransaction(translate("Transaction", "Trim Frame Branch"))
             if not self.targets:
                 raise IndexError("Targets do not selected with set objetives button previus to execute this command \n")
-            for target in self.targets:
-                for b in fCmd.beams():
-                    if not hasattr(b, "tailOffset") and not hasattr(b, "headOffset"):
-                        raise AttributeError("Missing tail and head variables, it may not a beam object \n")
-                    if int(FreeCAD.Version()[0]) >= 1:
-                        edge = b.AttachmentSupport[0][0].Shape.getElement(
-                            b.AttachmentSupport[0][1][0]
-                        )
-                    else:
-                        edge = b.Support[0][0].Shape.getElement(b.Support[0][1][0])
-                    ax = edge.tangentAt(0).normalize()  # fCmd.beamAx(b).normalize()
-                    tail = edge.valueAt(0)  # b.Placement.Base
-                    head = edge.valueAt(edge.LastParameter)  # tail+ax*float(b.Height)
-                    if target.ShapeType == "Vertex":
-                        P = target.Point
-                    elif target.ShapeType == "Face" and not fCmd.isOrtho(target, ax):
-                        P = fCmd.intersectionPlane(tail, ax, target)
-                    elif hasattr(target, "CenterOfMass"):
-                        P = target.CenterOfMass
-                    else:
-                        P = None
-                    if P:
-                        deltaTail = (P - tail).dot(ax)
-                        deltaHead = (P - head).dot(ax)
-                        if abs(deltaTail) < abs(deltaHead):
-                            b.tailOffset = -deltaTail
-                        else:
-                            b.headOffset = deltaHead
-                    refreshBranchObject(b)
-            FreeCAD.ActiveDocument.commitTransaction()
+            with branchBatch(translate("Transaction", "Trim Frame Branch")) as batch:
+                self._trimOrExtend(batch)
         except Exception as e:
             FreeCAD.Console.PrintError(""+str(e))
 
+    def _trimOrExtend(self, batch):
+        "moves the ends of the selected beams to the targets"
+        for target in self.targets:
+            for b in fCmd.beams():
+                if not hasattr(b, "tailOffset") and not hasattr(b, "headOffset"):
+                    raise AttributeError("Missing tail and head variables, it may not a beam object \n")
+                if int(FreeCAD.Version()[0]) >= 1:
+                    edge = b.AttachmentSupport[0][0].Shape.getElement(
+                        b.AttachmentSupport[0][1][0]
+                    )
+                else:
+                    edge = b.Support[0][0].Shape.getElement(b.Support[0][1][0])
+                ax = edge.tangentAt(0).normalize()  # fCmd.beamAx(b).normalize()
+                tail = edge.valueAt(0)  # b.Placement.Base
+                head = edge.valueAt(edge.LastParameter)  # tail+ax*float(b.Height)
+                if target.ShapeType == "Vertex":
+                    P = target.Point
+                elif target.ShapeType == "Face" and not fCmd.isOrtho(target, ax):
+                    P = fCmd.intersectionPlane(tail, ax, target)
+                elif hasattr(target, "CenterOfMass"):
+                    P = target.CenterOfMass
+                else:
+                    P = None
+                if P:
+                    deltaTail = (P - tail).dot(ax)
+                    deltaHead = (P - head).dot(ax)
+                    if abs(deltaTail) < abs(deltaHead):
+                        b.tailOffset = -deltaTail
+                    else:
+                        b.headOffset = deltaHead
+                batch.add(b)
+
     def refresh(self):
         """
         no used
@@ -1160,6 +1202,12 @@ class FrameLine(object):
             "FrameLine",
             QT_TRANSLATE_NOOP("App::Property", "the profile"),
         )
+        obj.addProperty(
+            "App::PropertyBool",
+            "ShareProfile",
+            "FrameLine",
+            QT_TRANSLATE_NOOP("App::Property", "All the beams use the Profile instead of a copy"),
+        )
 
     def onChanged(self, fp, prop):
         if prop == "Label" and len(fp.InList):
@@ -1177,11 +1225,15 @@ class FrameLine(object):
         group = FreeCAD.activeDocument().getObjectsByLabel(fp.Group)[0]
         beams2purge = fCmd.beams(group.OutList)
         if beams2purge:
+            profiles = set()
             for b in beams2purge:
-                profiles = b.OutList
+                profiles.update(p.Name for p in b.OutList)
                 FreeCAD.ActiveDocument.removeObject(b.Name)
-                for p in profiles:
-                    FreeCAD.ActiveDocument.removeObject(p.Name)
+            if fp.Profile:
+                profiles.discard(fp.Profile.Name)  # shared, not a copy
+            for name in profiles:
+                if FreeCAD.ActiveDocument.getObject(name):
+                    FreeCAD.ActiveDocument.removeObject(name)
 
     def IsActive(self):
         if FreeCAD.ActiveDocument is None:
@@ -1189,7 +1241,15 @@ class FrameLine(object):
         else:
             return True
 
-    def update(self, fp, copyProfile=True):
+    def update(self, fp, copyProfile=None):
+        """
+        update(fp, copyProfile=None)
+        Draws one Structure for each edge of the Base.
+          copyProfile: if False all the Structures use the Profile, so that
+            there's one section object only; default not fp.ShareProfile
+        """
+        if copyProfile is None:
+            copyProfile = not getattr(fp, "ShareProfile", False)
         if hasattr(fp.Base, "Shape"):
             edges = fp.Base.Shape.Edges
             if not edges:
@@ -1265,11 +1325,13 @@ class FrameBranch(object):
 
     def redraw(self, obj):
         temp_beam_config=list()
+        temp_beam_cuts=list()
         # clear all
         if obj.Beams:
             for o in obj.Beams:
                 maprev=FreeCAD.ActiveDocument.getObject(o).MapReversed
                 temp_beam_config.append(maprev)
+                temp_beam_cuts.append([c for c in FreeCAD.ActiveDocument.getObject(o).Subtractions if hasattr(c, "FType") and c.FType in ("MiterCut", "CopeCut")])
                 FreeCAD.ActiveDocument.removeObject(o)
         # create new beams
         i = 0
@@ -1304,6 +1366,8 @@ class FrameBranch(object):
                 else:
                     beam.Support = [(obj.Base, "Edge" + str(i + 1))]
                 beam.MapMode = "NormalToEdge"
+                if i < len(temp_beam_cuts):
+                    beam.Subtractions = temp_beam_cuts[i]
                 if temp_beam_config:
                     beam.MapReversed = temp_beam_config.pop()
                     # FreeCAD.Console.PrintMessage(beam.MapReversed)
@@ -1363,6 +1427,129 @@ class ViewProviderFrameBranch:
         return True
 
 
+class MiterCut(object):
+    """
+    MiterCut(obj, branch, edge, otherEdge)
+    The volume subtracted from the beam of a FrameBranch on Base edge
+    number edge to miter its joint with edge otherEdge.
+    It's computed from the Base edges only, so that it's updated with them.
+    """
+
+    def __init__(self, obj, branch, edge, otherEdge):
+        obj.Proxy = self
+        obj.addProperty(
+            "App::PropertyString",
+            "FType",
+            "MiterCut",
+            QT_TRANSLATE_NOOP("App::Property", "Type of frameFeature"),
+        ).FType = "MiterCut"
+        obj.addProperty(
+            "App::PropertyLink",
+            "Branch",
+            "MiterCut",
+            QT_TRANSLATE_NOOP("App::Property", "The FrameBranch"),
+        ).Branch = branch
+        obj.addProperty(
+            "App::PropertyInteger",
+            "Edge",
+            "MiterCut",
+            QT_TRANSLATE_NOOP("App::Property", "The index of the edge of the beam to cut"),
+        ).Edge = edge
+        obj.addProperty(
+            "App::PropertyInteger",
+            "OtherEdge",
+            "MiterCut",
+            QT_TRANSLATE_NOOP("App::Property", "The index of the edge it joins"),
+        ).OtherEdge = otherEdge
+
+    def execute(self, fp):
+        edges = fp.Branch.Base.Shape.Edges
+        if max(fp.Edge, fp.OtherEdge) >= len(edges):
+            FreeCAD.Console.PrintWarning(fp.Label + ": edge not found in the Base\n")
+            fp.Shape = Part.Shape()
+            return
+        e1, e2 = edges[fp.Edge], edges[fp.OtherEdge]
+        P, d1, d2, gap = sharedEnd(e1, e2)
+        size = 2 * (e1.Length + e2.Length)
+        if fp.Branch.Profile:
+            size += 2 * fp.Branch.Profile.Shape.BoundBox.DiagonalLength
+        box = miterHalfSpace(P, d1, d2, size) if gap < 1e-3 else None
+        if box is None:
+            FreeCAD.Console.PrintWarning(fp.Label + ": the edges are not joined\n")
+            box = Part.Shape()
+        fp.Shape = box
+
+
+class CopeCut(object):
+    """
+    CopeCut(obj, branch, edge, otherEdge)
+    The volume subtracted from the beam of a FrameBranch on Base edge
+    number edge to cope it where it ends along edge otherEdge: the Profile
+    of the branch extruded along otherEdge, with the offsets and the spin
+    of its beam. It's computed from the Base and the Profile, not from the
+    other beam, so that the beams don't depend on each other.
+    """
+
+    def __init__(self, obj, branch, edge, otherEdge):
+        obj.Proxy = self
+        obj.addProperty(
+            "App::PropertyString",
+            "FType",
+            "CopeCut",
+            QT_TRANSLATE_NOOP("App::Property", "Type of frameFeature"),
+        ).FType = "CopeCut"
+        obj.addProperty(
+            "App::PropertyLink",
+            "Branch",
+            "CopeCut",
+            QT_TRANSLATE_NOOP("App::Property", "The FrameBranch"),
+        ).Branch = branch
+        obj.addProperty(
+            "App::PropertyInteger",
+            "Edge",
+            "CopeCut",
+            QT_TRANSLATE_NOOP("App::Property", "The index of the edge of the beam to cut"),
+        ).Edge = edge
+        obj.addProperty(
+            "App::PropertyInteger",
+            "OtherEdge",
+            "CopeCut",
+            QT_TRANSLATE_NOOP("App::Property", "The index of the edge it ends along"),
+        ).OtherEdge = otherEdge
+
+    def execute(self, fp):
+        edges = fp.Branch.Base.Shape.Edges
+        profile = fp.Branch.Profile
+        if fp.OtherEdge >= len(edges) or not profile:
+            FreeCAD.Console.PrintWarning(fp.Label + ": edge or profile not found\n")
+            fp.Shape = Part.Shape()
+            return
+        e = edges[fp.OtherEdge]
+        # the other beam is read by name for its offsets and spin only: no link
+        names = fp.Branch.Beams
+        name = names[fp.OtherEdge] if fp.OtherEdge < len(names) else ""
+        beam = fp.Document.getObject(name) if name else None
+        tail = getattr(beam, "tailOffset", 0.0)
+        head = getattr(beam, "headOffset", 0.0)
+        spin = getattr(beam, "spin", 0.0)
+        P0 = e.Vertexes[0].Point
+        d = (e.Vertexes[-1].Point - P0).normalize()
+        # the section as placed by FrameBranch.execute(): X on the normal of the Base
+        n = fp.Branch.Base.Placement.Rotation.multVec(FreeCAD.Vector(0, 0, 1))
+        X = n - d * n.dot(d)
+        if X.Length < 1e-6:
+            X = FreeCAD.Vector(1, 0, 0) if abs(d.x) < 0.9 else FreeCAD.Vector(0, 1, 0)
+            X = X - d * X.dot(d)
+        X.normalize()
+        rot = FreeCAD.Rotation(d, spin).multiply(FreeCAD.Rotation(X, d.cross(X), d, "ZXY"))
+        if profile.Shape.Faces:
+            face = profile.Shape.Faces[0].copy()
+        else:
+            face = Part.Face(Part.Wire(profile.Shape.Edges))
+        face.Placement = FreeCAD.Placement(P0 - d * tail, rot)
+        fp.Shape = face.extrude(d * (e.Length + tail + head))
+
+
 ######### customArchProfile ############
 
 import Draft
@@ -1405,6 +1592,20 @@ def doProfile(typeS="RH", label="Square", dims=[50, 100, 5])->FreeCAD.DocumentOb
         FreeCAD.Console.PrintError("Not such section!\n")
 
 
+def cachedFace(key:tuple, build)->Part.Face:
+    """
+    cachedFace(key, build)
+    Returns the section face of key = (type, dimensions..., radii...), calling
+    build() only the first time that key is asked: all the _ProfileXXX objects
+    and the Beams of the same section share one face.
+    The face is shared: don't modify it in place.
+    """
+    face = _profileFaces.get(key)
+    if face is None:
+        face = _profileFaces[key] = build()
+    return face
+
+
 def drawAndCenter(points:list[Vector])->Part.Face:
     """
     Create a Face from a given list of vectors
@@ -1417,6 +1618,8 @@ def drawAndCenter(points:list[Vector])->Part.Face:
     return Part.Face(p2)
 
 
+_profileFaces = dict()  # section key -> Part.Face, see cachedFace()
+
 ############ pointsXXX() functions #################
 
 
@@ -1624,17 +1827,21 @@ class _ProfileRH(_Profile):
 
     def execute(self, obj:FreeCAD.DocumentObject)->None:
         W, H, t1, t2 = obj.W.Value, obj.H.Value, obj.t1.Value, obj.t2.Value
-        p1 = Vector(-W / 2, -H / 2, 0)
-        p2 = Vector(W / 2, -H / 2, 0)
-        p3 = Vector(W / 2, H / 2, 0)
-        p4 = Vector(-W / 2, H / 2, 0)
-        q1 = Vector(-W / 2 + t1, -H / 2 + t2, 0)
-        q2 = Vector(W / 2 - t1, -H / 2 + t2, 0)
-        q3 = Vector(W / 2 - t1, H / 2 - t2, 0)
-        q4 = Vector(-W / 2 + t1, H / 2 - t2, 0)
-        p = Part.makePolygon([p1, p2, p3, p4, p1])
-        q = Part.makePolygon([q1, q2, q3, q4, q1])
-        obj.Shape = Part.Face(p).cut(Part.Face(q))
+
+        def build():
+            p1 = Vector(-W / 2, -H / 2, 0)
+            p2 = Vector(W / 2, -H / 2, 0)
+            p3 = Vector(W / 2, H / 2, 0)
+            p4 = Vector(-W / 2, H / 2, 0)
+            q1 = Vector(-W / 2 + t1, -H / 2 + t2, 0)
+            q2 = Vector(W / 2 - t1, -H / 2 + t2, 0)
+            q3 = Vector(W / 2 - t1, H / 2 - t2, 0)
+            q4 = Vector(-W / 2 + t1, H / 2 - t2, 0)
+            p = Part.makePolygon([p1, p2, p3, p4, p1])
+            q = Part.makePolygon([q1, q2, q3, q4, q1])
+            return Part.Face(p).cut(Part.Face(q))
+
+        obj.Shape = cachedFace(("RH", W, H, t1, t2), build)
 
 class _ProfileTSLOT(_Profile):
     """A parametric Rectangular hollow beam profile. Profile data: [width, height, thickness]"""
@@ -1704,12 +1911,15 @@ class _ProfileR(_Profile):
 
     def execute(self, obj:FreeCAD.DocumentObject)->None:
         W, H = obj.W.Value, obj.H.Value
-        p1 = Vector(-W / 2, -H / 2, 0)
-        p2 = Vector(W / 2, -H / 2, 0)
-        p3 = Vector(W / 2, H / 2, 0)
-        p4 = Vector(-W / 2, H / 2, 0)
-        p = Part.makePolygon([p1, p2, p3, p4, p1])
-        obj.Shape = Part.Face(p)
+
+        def build():
+            p1 = Vector(-W / 2, -H / 2, 0)
+            p2 = Vector(W / 2, -H / 2, 0)
+            p3 = Vector(W / 2, H / 2, 0)
+            p4 = Vector(-W / 2, H / 2, 0)
+            return Part.Face(Part.makePolygon([p1, p2, p3, p4, p1]))
+
+        obj.Shape = cachedFace(("R", W, H), build)
 
 class _ProfileCircle(_Profile):
     """A parametric circular beam profile.
@@ -1742,11 +1952,18 @@ class _ProfileCircle(_Profile):
     def execute(self, obj:FreeCAD.DocumentObject)->None:
         D, t1 = obj.D.Value, obj.t1.Value
         if not t1:
-            obj.Shape = Part.makeFace([Part.makeCircle(D / 2)], "Part::FaceMakerSimple")
+            obj.Shape = cachedFace(
+                ("circle", D, 0),
+                lambda: Part.makeFace([Part.makeCircle(D / 2)], "Part::FaceMakerSimple"),
+            )
         elif t1 < D / 2:
-            c1 = Part.makeFace([Part.makeCircle(D / 2)], "Part::FaceMakerSimple")
-            c2 = Part.makeFace([Part.makeCircle(D / 2 - t1)], "Part::FaceMakerSimple")
-            obj.Shape = c1.cut(c2)
+
+            def build():
+                c1 = Part.makeFace([Part.makeCircle(D / 2)], "Part::FaceMakerSimple")
+                c2 = Part.makeFace([Part.makeCircle(D / 2 - t1)], "Part::FaceMakerSimple")
+                return c1.cut(c2)
+
+            obj.Shape = cachedFace(("circle", D, t1), build)
 
 class _ProfileL(_Profile):
     """A parametric L beam profile. Profile data: [width, height, web thickness]"""
@@ -1786,7 +2003,7 @@ class _ProfileL(_Profile):
 
     def execute(self, obj:FreeCAD.DocumentObject)->None:
         W, H, t1, t2 = obj.W.Value, obj.H.Value, obj.t1.Value, obj.t2.Value
-        obj.Shape = drawAndCenter(pointsL(H, W, t1, t2))
+        obj.Shape = cachedFace(("L", W, H, t1, t2), lambda: drawAndCenter(pointsL(H, W, t1, t2)))
 
 class _ProfileAngle(_Profile):
     """
@@ -1806,12 +2023,7 @@ class _ProfileAngle(_Profile):
         self.Solid = FreeCAD.ActiveDocument.getObject(self.label).Solid
         ## Profile final length
         self.g0 = FreeCAD.ActiveDocument.getObject(self.label).g0 * 1000
-        if self.standard == "SS_Equal":
-            self.sa = ShpstData.angle_ss_equal[self.size]
-        elif self.standard == "SS_Unequal":
-            self.sa = ShpstData.angle_ss_unequal[self.size]
-        elif self.standard == "SUS_Equal":
-            self.sa = ShpstData.angle_sus_equal[self.size]
+        self.sa = fCatalog.lookup("Angle", self.standard, self.size)
         obj.Label = translate("Objects", "L-profile", "Profile name in the Tree View")
         obj.addProperty(
             "App::PropertyString",
@@ -1866,7 +2078,9 @@ class _ProfileAngle(_Profile):
         L = float(L)
         obj.A = A
         obj.B = B
-        obj.Shape = drawAndCenter(pointsLWithRound(A, B, t, r1, r2))
+        obj.Shape = cachedFace(
+            ("Angle", A, B, t, r1, r2), lambda: drawAndCenter(pointsLWithRound(A, B, t, r1, r2))
+        )
 
 class _ProfileChannel(_Profile):
     def __init__(self, obj:FreeCAD.DocumentObject, profile:list[str])->None:
@@ -1876,14 +2090,13 @@ class _ProfileChannel(_Profile):
         self.standard = FreeCAD.ActiveDocument.getObject(self.label).standard
         Solid = FreeCAD.ActiveDocument.getObject(self.label).Solid
         g0 = FreeCAD.ActiveDocument.getObject(self.label).g0 * 1000
+        self.sa = fCatalog.lookup("Channel", self.standard, self.size)
         if self.standard == "SS":
-            self.sa = ShpstData.channel_ss[self.size]
             self.s0 = 5
-            self.t2 = float(self.sa[3])
+            self.t2 = float(self.sa.t2)
         elif self.standard == "SUS":
-            self.self.sa = ShpstData.channel_sus[self.size]
             self.s0 = 0
-            self.t2 = float(self.sa[2])
+            self.t2 = float(self.sa.t1)
         obj.Label = translate("Objects", "U-profile", "Profile name in the Tree View")
         obj.addProperty(
             "App::PropertyString",
@@ -1936,7 +2149,10 @@ class _ProfileChannel(_Profile):
         Solid = FreeCAD.ActiveDocument.getObject(self.label).Solid
         obj.H = H
         obj.B = B
-        obj.Shape = drawAndCenter(pointsChannelWithRound(H, B, t1, self.t2, r1, r2, Cy, self.s0))
+        obj.Shape = cachedFace(
+            ("Channel", H, B, t1, self.t2, r1, r2, Cy, self.s0),
+            lambda: drawAndCenter(pointsChannelWithRound(H, B, t1, self.t2, r1, r2, Cy, self.s0)),
+        )
 
 class _ProfileT(_Profile):
     """A parametric T beam profile. Profile data: [width, height, web thickness]"""
@@ -1977,7 +2193,7 @@ class _ProfileT(_Profile):
 
     def execute(self, obj:FreeCAD.DocumentObject)->None:
         W, H, t1, t2 = obj.W.Value, obj.H.Value, obj.t1.Value, obj.t2.Value
-        obj.Shape = drawAndCenter(pointsT(H, W, t1, t2))
+        obj.Shape = cachedFace(("T", W, H, t1, t2), lambda: drawAndCenter(pointsT(H, W, t1, t2)))
 
 class _ProfileZ(_Profile):
     """A parametric Z beam profile. Profile data: [width, height, web thickness, flange thickness]"""
@@ -2018,7 +2234,7 @@ class _ProfileZ(_Profile):
 
     def execute(self, obj:FreeCAD.DocumentObject)->None:
         W, H, t1, t2 = obj.W.Value, obj.H.Value, obj.t1.Value, obj.t2.Value
-        obj.Shape = drawAndCenter(pointsZ(H, W, t1, t2))
+        obj.Shape = cachedFace(("Z", W, H, t1, t2), lambda: drawAndCenter(pointsZ(H, W, t1, t2)))
 
 class _ProfileOmega(_Profile):
     """A parametric omega beam profile. Profile data: [W, H, D, t1,t2,t3]"""
@@ -2078,7 +2294,9 @@ class _ProfileOmega(_Profile):
             obj.t2.Value,
             obj.t3.Value,
         )
-        obj.Shape = drawAndCenter(pointsOmega(H, W, D, t1, t2, t3))
+        obj.Shape = cachedFace(
+            ("omega", W, H, D, t1, t2, t3), lambda: drawAndCenter(pointsOmega(H, W, D, t1, t2, t3))
+        )
 
 class _ProfileH(_Profile):
     """A parametric omega beam profile. Profile data: [W, H, D, t1,t2,t3]"""
@@ -2138,7 +2356,9 @@ class _ProfileH(_Profile):
             obj.t2.Value,
             obj.t3.Value,
         )
-        obj.Shape = drawAndCenter(pointsH(H, W, D, t1, t2, t3))
+        obj.Shape = cachedFace(
+            ("H", W, H, D, t1, t2, t3), lambda: drawAndCenter(pointsH(H, W, D, t1, t2, t3))
+        )
 
 class _ProfileU(_Profile):
     """A parametric U beam profile. Profile data: [W, H, D, t1,t2,t3]"""
@@ -2197,7 +2417,9 @@ class _ProfileU(_Profile):
             obj.t2.Value,
             obj.t3.Value,
         )
-        obj.Shape = drawAndCenter(pointsU(H, W, D, t1, t2, t3))
+        obj.Shape = cachedFace(
+            ("U", W, H, D, t1, t2, t3), lambda: drawAndCenter(pointsU(H, W, D, t1, t2, t3))
+        )
 # ─────────────────────────────────────────────────────────────
 # Beam — a structural section object modelled after pypeType
 # ─────────────────────────────────────────────────────────────
@@ -2248,6 +2470,11 @@ class Beam(beamType):
       ta     : web thickness (mm)   -- 0 for solid rectangular / circular
       tf     : flange thickness (mm)-- 0 for solid rectangular / circular
       Height : beam length (mm)
+    The ends can be prepared with the properties of group "EndPrep":
+      HeadMiter, TailMiter: angle of the end cut around the X axis of the section
+      CopeEnds, CopeSides: where the flanges are coped
+      CopeDepth, CopeLength, CopeRadius: size of the cope and radius of its corner
+    CutLength is the length of the stock cut for the beam.
     """
 
     def __init__(
@@ -2292,6 +2519,48 @@ class Beam(beamType):
             "App::PropertyLength", "Height", "Beam",
             QT_TRANSLATE_NOOP("App::Property", "Beam length"),
         ).Height = Height
+        self._addEndPrep(obj)
+
+    def _addEndPrep(self, obj):
+        "adds the properties of the end preparation, if missing"
+        if hasattr(obj, "CutLength"):
+            return
+        obj.addProperty(
+            "App::PropertyAngle", "HeadMiter", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "Miter angle of the head around the X axis"),
+        )
+        obj.addProperty(
+            "App::PropertyAngle", "TailMiter", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "Miter angle of the tail around the X axis"),
+        )
+        obj.addProperty(
+            "App::PropertyEnumeration", "CopeEnds", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "The coped ends"),
+        ).CopeEnds = ["None", "Head", "Tail", "Both"]
+        obj.addProperty(
+            "App::PropertyEnumeration", "CopeSides", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "The coped flanges: top (+Y), bottom or both"),
+        ).CopeSides = ["Top", "Bottom", "Both"]
+        obj.addProperty(
+            "App::PropertyLength", "CopeDepth", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "Depth of the cope from the flange"),
+        )
+        obj.addProperty(
+            "App::PropertyLength", "CopeLength", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "Length of the cope from the end"),
+        )
+        obj.addProperty(
+            "App::PropertyLength", "CopeRadius", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "Radius of the inner corner of the cope"),
+        )
+        obj.addProperty(
+            "App::PropertyLength", "CutLength", "EndPrep",
+            QT_TRANSLATE_NOOP("App::Property", "Overall length of the mitered beam"),
+        )
+        obj.setEditorMode("CutLength", 1)
+
+    def onDocumentRestored(self, fp):
+        self._addEndPrep(fp)
 
     def _makeProfile(self, fp):
         """Build a Part.Face cross-section from stored dimensions."""
@@ -2417,10 +2686,110 @@ class Beam(beamType):
             ]
             return face(pts)
 
+    def profileFace(self, fp):
+        """
+        profileFace(fp)
+        Returns the cross-section of fp, shared by the beams of the same
+        dimensions (see cachedFace()).
+        """
+        key = ("Beam", fp.stype, float(fp.H), float(fp.W), float(fp.ta), float(fp.tf))
+        return cachedFace(key, lambda: self._makeProfile(fp))
+
+    def miterEnds(self, fp, face):
+        """
+        miterEnds(fp, face)
+        Returns (zTail, zHead), the extreme Z of the beam of section face
+        with the miters of fp: the ends of the axis stay in 0 and Height.
+        """
+        bb = face.BoundBox
+        tH = tan(radians(float(fp.HeadMiter)))
+        tT = tan(radians(float(fp.TailMiter)))
+        zHead = float(fp.Height) + max(tH * bb.YMax, tH * bb.YMin)
+        zTail = min(tT * bb.YMax, tT * bb.YMin)
+        return zTail, zHead
+
+    def _copeTool(self, bb, zIn, zOut, yIn, yOut, r):
+        """
+        _copeTool(bb, zIn, zOut, yIn, yOut, r)
+        Returns the prism across the section bb that removes the region
+        between zIn, zOut and yIn, yOut, with the corner (yIn, zIn) rounded
+        with radius r.
+        """
+        V = FreeCAD.Vector
+        x = bb.XMin - 1
+        sy = 1 if yOut > yIn else -1
+        sz = 1 if zOut > zIn else -1
+        r = min(r, abs(zOut - zIn), abs(yOut - yIn))
+        if r > 0:
+            k = r * (1 - sqrt(0.5))
+            edges = [
+                Part.LineSegment(V(x, yOut, zIn), V(x, yIn + sy * r, zIn)).toShape(),
+                Part.Arc(
+                    V(x, yIn + sy * r, zIn), V(x, yIn + sy * k, zIn + sz * k), V(x, yIn, zIn + sz * r)
+                ).toShape(),
+                Part.LineSegment(V(x, yIn, zIn + sz * r), V(x, yIn, zOut)).toShape(),
+                Part.LineSegment(V(x, yIn, zOut), V(x, yOut, zOut)).toShape(),
+                Part.LineSegment(V(x, yOut, zOut), V(x, yOut, zIn)).toShape(),
+            ]
+            section = Part.Face(Part.Wire(edges))
+        else:
+            section = Part.Face(
+                Part.makePolygon(
+                    [V(x, yOut, zIn), V(x, yIn, zIn), V(x, yIn, zOut), V(x, yOut, zOut), V(x, yOut, zIn)]
+                )
+            )
+        return section.extrude(V(bb.XLength + 2, 0, 0))
+
+    def endTools(self, fp, face):
+        """
+        endTools(fp, face)
+        Returns the list of solids to subtract from the extrusion of face
+        to prepare the ends of fp.
+        """
+        tools = list()
+        L = float(fp.Height)
+        bb = face.BoundBox
+        zTail, zHead = self.miterEnds(fp, face)
+        size = 2 * (bb.DiagonalLength + L)
+        Z = FreeCAD.Vector(0, 0, 1)
+        for angle, base, axis in (
+            (float(fp.HeadMiter), FreeCAD.Vector(0, 0, L), Z),
+            (float(fp.TailMiter), FreeCAD.Vector(), Z.negative()),
+        ):
+            if angle:
+                box = Part.makeBox(size, size, size, FreeCAD.Vector(-size / 2, -size / 2, 0))
+                n = FreeCAD.Rotation(FreeCAD.Vector(1, 0, 0), angle).multVec(axis)
+                box.Placement = FreeCAD.Placement(base, FreeCAD.Rotation(Z, n))
+                tools.append(box)
+        depth, length, r = float(fp.CopeDepth), float(fp.CopeLength), float(fp.CopeRadius)
+        if fp.CopeEnds != "None" and depth > 0 and length > 0:
+            sides = list()
+            if fp.CopeSides in ("Top", "Both"):
+                sides.append((bb.YMax - depth, bb.YMax + 1))
+            if fp.CopeSides in ("Bottom", "Both"):
+                sides.append((bb.YMin + depth, bb.YMin - 1))
+            for yIn, yOut in sides:
+                if fp.CopeEnds in ("Head", "Both"):
+                    tools.append(self._copeTool(bb, L - length, zHead + 1, yIn, yOut, r))
+                if fp.CopeEnds in ("Tail", "Both"):
+                    tools.append(self._copeTool(bb, length, zTail - 1, yIn, yOut, r))
+        return tools
+
     def execute(self, fp):
         try:
-            profile = self._makeProfile(fp)
-            fp.Shape = profile.extrude(FreeCAD.Vector(0, 0, float(fp.Height)))
+            profile = self.profileFace(fp)
+            if abs(float(fp.HeadMiter)) >= 89 or abs(float(fp.TailMiter)) >= 89:
+                raise ValueError("miter angles must be less than 89 deg")
+            zTail, zHead = self.miterEnds(fp, profile)
+            tools = self.endTools(fp, profile)
+            if tools:
+                solid = profile.translated(FreeCAD.Vector(0, 0, zTail)).extrude(
+                    FreeCAD.Vector(0, 0, zHead - zTail)
+                )
+                fp.Shape = solid.cut(tools)  # one boolean for all the ends
+            else:
+                fp.Shape = profile.extrude(FreeCAD.Vector(0, 0, float(fp.Height)))
+            fp.CutLength = zHead - zTail
         except Exception as e:
             FreeCAD.Console.PrintError("Beam execute error: {}\n".format(e))
             return
@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+__title__ = "frameTools index of FrameBranch objects"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+import FreeCAD
+
+_indexes = dict()  # document name -> BranchIndex
+_observer = None
+
+
+def isBranch(obj):
+    "True if obj is a FrameBranch"
+    return hasattr(obj, "FType") and obj.FType == "FrameBranch"
+
+
+class BranchIndex(object):
+    """
+    BranchIndex(doc)
+    Maps the beams and the Base of each FrameBranch of the document doc to
+    the branch; it's updated by the BranchObserver, so that finding the
+    branch of a beam does not scan the document.
+      doc: the App document
+    """
+
+    def __init__(self, doc):
+        self.docName = doc.Name
+        self.byBeam = dict()  # beam name -> branch name
+        self.byBase = dict()  # Base name -> branch name
+        self.beamsOf = dict()  # branch name -> beam names
+        for o in doc.Objects:
+            self.add(o)
+
+    def add(self, obj):
+        if isBranch(obj):
+            self.update(obj, "Beams")
+            self.update(obj, "Base")
+
+    def remove(self, obj):
+        for b in self.beamsOf.pop(obj.Name, []):
+            if self.byBeam.get(b) == obj.Name:
+                del self.byBeam[b]
+        for k in [k for k, v in self.byBase.items() if v == obj.Name]:
+            del self.byBase[k]
+
+    def update(self, obj, prop):
+        if prop == "FType":
+            self.add(obj)
+        elif prop == "Beams" and hasattr(obj, "Beams") and isBranch(obj):
+            for b in self.beamsOf.get(obj.Name, []):
+                if self.byBeam.get(b) == obj.Name:
+                    del self.byBeam[b]
+            beams = [str(b) for b in obj.Beams if b]
+            self.beamsOf[obj.Name] = beams
+            for b in beams:
+                self.byBeam[b] = obj.Name
+        elif prop == "Base" and hasattr(obj, "Base") and isBranch(obj):
+            for k in [k for k, v in self.byBase.items() if v == obj.Name]:
+                del self.byBase[k]
+            if obj.Base:
+                self.byBase[obj.Base.Name] = obj.Name
+
+    def _branch(self, name):
+        doc = FreeCAD.getDocument(self.docName)
+        return doc.getObject(name) if name else None
+
+    def branchOf(self, beamName):
+        "the FrameBranch that owns the beam named beamName, or None"
+        branch = self._branch(self.byBeam.get(beamName))
+        if branch and beamName in branch.Beams:
+            return branch
+        return None
+
+    def branchOfBase(self, baseName):
+        "the FrameBranch whose Base is the object named baseName, or None"
+        branch = self._branch(self.byBase.get(baseName))
+        if branch and branch.Base and branch.Base.Name == baseName:
+            return branch
+        return None
+
+
+class BranchObserver(object):
+    "Document observer that keeps the BranchIndex instances up to date"
+
+    def slotCreatedObject(self, obj):
+        # a branch restored by undo comes back without change signals
+        index = _indexes.get(obj.Document.Name)
+        if index:
+            index.add(obj)
+
+    def slotDeletedObject(self, obj):
+        index = _indexes.get(obj.Document.Name)
+        if index:
+            index.remove(obj)
+
+    def slotChangedObject(self, obj, prop):
+        if prop in ("FType", "Beams", "Base"):
+            index = _indexes.get(obj.Document.Name)
+            if index:
+                index.update(obj, prop)
+
+    def slotDeletedDocument(self, doc):
+        _indexes.pop(doc.Name, None)
+
+
+def install():
+    "register the document observer once"
+    global _observer
+    if _observer is None:
+        _observer = BranchObserver()
+        FreeCAD.addDocumentObserver(_observer)
+
+
+def uninstall():
+    global _observer
+    if _observer is not None:
+        FreeCAD.removeDocumentObserver(_observer)
+        _observer = None
+    _indexes.clear()
+
+
+def getIndex(doc=None):
+    """
+    getIndex(doc=None)
+    Returns the BranchIndex of the document, building it at first call.
+      doc: the App document; default the ActiveDocument
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    if doc is None:
+        return None
+    install()
+    index = _indexes.get(doc.Name)
+    if index is None:
+        index = _indexes[doc.Name] = BranchIndex(doc)
+    return index
+
+
+def recomputeBranch(branch):
+    """
+    recomputeBranch(branch)
+    Recomputes the FrameBranch and then its beams, instead of the whole
+    document: FrameBranch.execute() changes the beams, so they come after.
+    """
+    doc = branch.Document
+    doc.recompute([branch])
+    beams = [doc.getObject(n) for n in branch.Beams if n]
+    doc.recompute([b for b in beams if b])
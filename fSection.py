@@ -0,0 +1,242 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Section properties of the profiles.
+
+Area, weight per metre, inertias and section moduli are computed from the
+outlines of the pointsXXX() functions of fFeatures with the moment formulas
+of polygons (Green's theorem): no face is built and no shape is integrated.
+The results are memoized per section, so each size of the catalogs is
+computed once per session.
+"""
+
+__title__ = "frameTools section properties"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+from math import pi, sqrt
+
+from FreeCAD import Vector
+
+import fCatalog
+from fFeatures import (
+    pointL,
+    pointsChannelWithRound,
+    pointsH,
+    pointsLWithRound,
+    pointsOmega,
+    pointsT,
+    pointsU,
+    pointsZ,
+)
+
+DENSITY = 7850  # kg/m3, steel
+
+_properties = dict()  # (stype, dims...) -> dictionary of properties
+
+
+def polygonMoments(points):
+    """
+    polygonMoments(points)
+    Returns (A, Sx, Sy, Ixx, Iyy, Ixy) of the polygon of the (u, v) points
+    about the origin: area, first moments and second moments, positive if
+    the points go counterclockwise.
+    """
+    A = Sx = Sy = Ixx = Iyy = Ixy = 0.0
+    n = len(points)
+    for i in range(n):
+        x0, y0 = points[i]
+        x1, y1 = points[(i + 1) % n]
+        c = x0 * y1 - x1 * y0
+        A += c
+        Sx += (y0 + y1) * c
+        Sy += (x0 + x1) * c
+        Ixx += (y0 * y0 + y0 * y1 + y1 * y1) * c
+        Iyy += (x0 * x0 + x0 * x1 + x1 * x1) * c
+        Ixy += (x0 * y1 + 2 * x0 * y0 + 2 * x1 * y1 + x1 * y0) * c
+    return A / 2, Sx / 6, Sy / 6, Ixx / 12, Iyy / 12, Ixy / 24
+
+
+def planar(points):
+    """
+    planar(points)
+    Returns the list of (u, v) of the Vectors points, dropping the
+    coordinate that is constant: the pointsXXX() functions draw in the
+    XY or in the XZ plane.
+    """
+    if all(abs(p.y - points[0].y) < 1e-9 for p in points):
+        return [(p.x, p.z) for p in points]
+    return [(p.x, p.y) for p in points]
+
+
+def rectangle(W, H):
+    "the points of the rectangle W x H centred in the origin"
+    return [
+        Vector(-W / 2, -H / 2, 0),
+        Vector(W / 2, -H / 2, 0),
+        Vector(W / 2, H / 2, 0),
+        Vector(-W / 2, H / 2, 0),
+    ]
+
+
+def sectionLoops(stype, dims):
+    """
+    sectionLoops(stype, dims)
+    Returns the list of (points, sign) of the outlines of the section:
+    sign is -1 for the holes.
+      stype: "R", "RH", "H", "U", "L", "T", "Z", "Omega" with
+        dims = (H, W, ta, tf) as in ./tablez/Section_*.csv, or
+        "LR" (A, B, t, r1, r2) and "CR" (H, B, t1, t2, r1, r2, Cy, s0),
+        the rounded angles and channels of ShpstData
+    """
+    if stype == "LR":
+        return [(pointsLWithRound(*dims), 1)]
+    if stype == "CR":
+        return [(pointsChannelWithRound(*dims), 1)]
+    H, W, ta, tf = dims[:4]
+    if stype == "R":
+        return [(rectangle(W, H), 1)]
+    if stype == "RH":
+        return [(rectangle(W, H), 1), (rectangle(W - 2 * ta, H - 2 * tf), -1)]
+    if stype == "H":
+        return [(pointsH(H, W, W, ta, tf, tf), 1)]
+    if stype == "U":
+        return [(pointsU(H, W, W, ta, tf, tf), 1)]
+    if stype == "L":
+        return [(pointL(H, W, ta, tf), 1)]
+    if stype == "T":
+        return [(pointsT(H, W, ta, tf), 1)]
+    if stype == "Z":
+        return [(pointsZ(H, W, ta, tf), 1)]
+    if stype == "Omega":
+        return [(pointsOmega(H, W, W, ta, tf, tf), 1)]
+    return []
+
+
+def _fromMoments(A, Sx, Sy, Ixx, Iyy, Ixy, extremes):
+    "properties about the centroid; extremes = (uMin, uMax, vMin, vMax)"
+    Cx, Cy = Sy / A, Sx / A
+    Ix = Ixx - A * Cy * Cy
+    Iy = Iyy - A * Cx * Cx
+    uMin, uMax, vMin, vMax = extremes
+    return {
+        "A": A,
+        "mass": A * 1e-6 * DENSITY,
+        "Cx": Cx,
+        "Cy": Cy,
+        "Ix": Ix,
+        "Iy": Iy,
+        "Ixy": Ixy - A * Cx * Cy,
+        "Wx": Ix / max(vMax - Cy, Cy - vMin),
+        "Wy": Iy / max(uMax - Cx, Cx - uMin),
+        "rx": sqrt(Ix / A),
+        "ry": sqrt(Iy / A),
+    }
+
+
+def _circle(D, t=0):
+    "properties of the solid (t=0) or hollow circle of diameter D"
+    d = D - 2 * t if t else 0.0
+    A = pi * (D**2 - d**2) / 4
+    Ic = pi * (D**4 - d**4) / 64
+    return _fromMoments(A, 0.0, 0.0, Ic, Ic, 0.0, (-D / 2, D / 2, -D / 2, D / 2))
+
+
+def properties(stype, *dims):
+    """
+    properties(stype, *dims)
+    Returns the dictionary of the properties of the section, computed at
+    the first call for these dimensions:
+      A (mm2), mass (kg/m), Cx, Cy (mm) the centroid in the coordinates of
+      the outline, Ix, Iy, Ixy (mm4) about the centroid, Wx, Wy (mm3) the
+      elastic section moduli and rx, ry (mm) the radii of gyration.
+    x is the horizontal axis of the section: Ix is the inertia for bending
+    in the plane of H. Returns None for the sections that are not known.
+      stype: see sectionLoops(); also "circle" (D), "C" (radius, as in
+        Section_REBARS.csv) and "tube" (D, t)
+    The dictionary is shared: don't modify it.
+    """
+    key = (stype,) + tuple(float(d) for d in dims)
+    if key in _properties:
+        return _properties[key]
+    result = None
+    if stype == "circle":
+        result = _circle(key[1])
+    elif stype == "C":
+        result = _circle(2 * key[1])
+    elif stype == "tube":
+        result = _circle(key[1], key[2])
+    else:
+        loops = sectionLoops(stype, key[1:])
+        if loops:
+            moments = [0.0] * 6
+            us, vs = list(), list()
+            for points, sign in loops:
+                uv = planar(points)
+                if uv[0] == uv[-1]:
+                    uv = uv[:-1]
+                m = polygonMoments(uv)
+                k = sign if m[0] > 0 else -sign  # clockwise outlines
+                moments = [a + k * b for a, b in zip(moments, m)]
+                us.extend(u for u, v in uv)
+                vs.extend(v for u, v in uv)
+            if moments[0] > 0:
+                result = _fromMoments(*moments, extremes=(min(us), max(us), min(vs), max(vs)))
+    _properties[key] = result
+    return result
+
+
+def rowProperties(row):
+    """
+    rowProperties(row)
+    Returns the properties() of a row of ./tablez/Section_*.csv, that is a
+    dictionary with keys "stype", "H", "W", "ta", "tf".
+    """
+    try:
+        H, W, ta, tf = (float(row.get(p) or 0) for p in ("H", "W", "ta", "tf"))
+    except ValueError:
+        return None
+    return properties(row["stype"], H, W, ta, tf)
+
+
+# type of fCatalog -> function of its record returning (stype, dims...)
+SHPST_SECTIONS = {
+    "Angle": lambda r: ("LR", r.A, r.B, r.t, r.r1, r.r2),
+    "Channel": lambda r: (
+        "CR",
+        r.H,
+        r.B,
+        r.t1,
+        r.t2 or r.t1,
+        r.r1,
+        r.r2,
+        r.Cy * 10,
+        5 if r.t2 else 0,
+    ),
+    "H": lambda r: ("H", r.H, r.B, r.t1, r.t2),
+    "I": lambda r: ("H", r.H, r.B, r.t1, r.t2),
+    "CT": lambda r: ("T", r.H, r.B, r.t1, r.t2),
+    "Pipe": lambda r: ("tube", r.D, r.t),
+    "Flat_Bar": lambda r: ("R", r.t, r.B, 0, 0),
+    "LW_angle": lambda r: ("L", r.A, r.B, r.t, r.t),
+    "LW_channel": lambda r: ("U", r.H, r.B, r.t, r.t),
+    "Square_pipe": lambda r: ("RH", r.A, r.B, r.t, r.t),
+}
+
+
+def shpstProperties(PType, standard, size):
+    """
+    shpstProperties(PType, standard, size)
+    Returns the properties() of the JIS section of fCatalog, e.g.
+    ("Channel", "SS", "100x50x5"), or None.
+    """
+    record = fCatalog.lookup(PType, standard, size)
+    if record is None or PType not in SHPST_SECTIONS:
+        return None
+    return properties(*SHPST_SECTIONS[PType](record))
+
+
+def clear():
+    "forgets the memoized properties"
+    _properties.clear()
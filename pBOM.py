@@ -0,0 +1,228 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+__title__ = "pypeTools bill of materials cache"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+import FreeCAD
+
+# properties that make up one row of the bill of materials
+BOM_PROPS = [
+    "Label",
+    "PType",
+    "FType",
+    "PRating",
+    "FRating",
+    "PSize",
+    "SSize",
+    "Height",
+    "BendAngle",
+    "BendRadius",
+    "OD",
+    "OD2",
+    "thk",
+    "PSize2",
+    "FlangeType",
+    "ValveType",
+]
+
+_caches = dict()  # document name -> BOMCache
+_observer = None
+
+
+def isBOMItem(obj):
+    "True if obj carries a PType or a FType and shall appear in the BOM"
+    if hasattr(obj, "InstanceKey"):
+        return False  # prototype of App::Link instances, see pCmd.makeInstance()
+    return hasattr(obj, "PType") or (hasattr(obj, "FType") and obj.FType == "Beam")
+
+
+def _value(v):
+    "convert quantities to plain floats, leave the rest as is"
+    if hasattr(v, "Value"):
+        return v.Value
+    return v
+
+
+class BOMCache(object):
+    """
+    BOMCache(doc)
+    Keeps one row per part of the document doc and updates it
+    incrementally from the BOMObserver: after the first full scan,
+    only the objects that change are read again.
+      doc: the App document
+    """
+
+    def __init__(self, doc):
+        self.docName = doc.Name
+        self.rows = dict()  # object name -> dict of BOM_PROPS
+        self.dirtyVolume = set()
+        self.volumes = dict()
+        self.watchers = list()  # sets of the names changed, see watch()
+        for o in doc.Objects:
+            self.add(o)
+
+    def add(self, obj):
+        if isBOMItem(obj):
+            self.rows[obj.Name] = self.readRow(obj)
+            self.dirtyVolume.add(obj.Name)
+            self.changed(obj.Name)
+
+    def remove(self, obj):
+        if self.rows.pop(obj.Name, None) is not None:
+            self.volumes.pop(obj.Name, None)
+            self.dirtyVolume.discard(obj.Name)
+            self.changed(obj.Name)
+
+    def update(self, obj, prop):
+        if prop == "InstanceKey":
+            self.remove(obj)
+            return
+        if obj.Name not in self.rows:
+            # PType/FType may be added after the object was created
+            if prop in ("PType", "FType"):
+                self.add(obj)
+            return
+        if prop == "Shape":
+            self.dirtyVolume.add(obj.Name)
+            self.changed(obj.Name)
+        elif prop in BOM_PROPS:
+            self.rows[obj.Name][prop] = _value(getattr(obj, prop))
+            self.changed(obj.Name)
+
+    def changed(self, name):
+        "records that the row of name changed in all the sets of watch()"
+        for watched in self.watchers:
+            watched.add(name)
+
+    def watch(self):
+        """
+        watch()
+        Returns a new set that collects the names of the rows added, removed
+        or changed from now on: each view of the BOM keeps its own and
+        empties it with popChanged().
+        """
+        watched = set()
+        self.watchers.append(watched)
+        return watched
+
+    def popChanged(self, watched):
+        "returns the names collected in the set watched and empties it"
+        names = set(watched)
+        watched.clear()
+        return names
+
+    def readRow(self, obj):
+        row = dict()
+        for p in BOM_PROPS:
+            if hasattr(obj, p):
+                row[p] = _value(getattr(obj, p))
+        return row
+
+    def volume(self, name):
+        "volume of the object, evaluated only if its shape changed"
+        if name in self.dirtyVolume:
+            doc = FreeCAD.getDocument(self.docName)
+            o = doc.getObject(name)
+            if hasattr(o, "LinkedObject") and not hasattr(o, "Shape"):
+                o = o.LinkedObject  # App::Link instance
+            try:
+                self.volumes[name] = o.Shape.Volume
+            except Exception:
+                self.volumes[name] = 0.0
+            self.dirtyVolume.discard(name)
+        return self.volumes.get(name, 0.0)
+
+    def row(self, name, withVolume=False):
+        "the BOM row of object name, or None if it isn't a part"
+        r = self.rows.get(name)
+        if r is not None and withVolume:
+            r = dict(r)
+            r["Volume"] = self.volume(name)
+        return r
+
+
+class TakeOff(object):
+    """
+    TakeOff(cache)
+    The rows, with Volume, of a part list taken from the BOMCache cache:
+    refresh() reads again only the rows changed since its previous call,
+    so that refreshing the list costs O(changed objects).
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.watched = cache.watch()
+        self.rows = dict()  # object name -> row with Volume, or None
+
+    def refresh(self, names):
+        """
+        refresh(names)
+        Returns the list of the rows of the objects names, in that order,
+        skipping those that are not parts.
+        """
+        changed = self.cache.popChanged(self.watched)
+        rows = dict()
+        for n in names:
+            if n in changed or n not in self.rows:
+                rows[n] = self.cache.row(n, withVolume=True)
+            else:
+                rows[n] = self.rows[n]
+        self.rows = rows
+        return [r for r in (rows[n] for n in names) if r]
+
+
+class BOMObserver(object):
+    "Document observer that keeps the BOMCache instances up to date"
+
+    def slotCreatedObject(self, obj):
+        cache = _caches.get(obj.Document.Name)
+        if cache:
+            cache.add(obj)
+
+    def slotDeletedObject(self, obj):
+        cache = _caches.get(obj.Document.Name)
+        if cache:
+            cache.remove(obj)
+
+    def slotChangedObject(self, obj, prop):
+        cache = _caches.get(obj.Document.Name)
+        if cache:
+            cache.update(obj, prop)
+
+    def slotDeletedDocument(self, doc):
+        _caches.pop(doc.Name, None)
+
+
+def install():
+    "register the document observer once"
+    global _observer
+    if _observer is None:
+        _observer = BOMObserver()
+        FreeCAD.addDocumentObserver(_observer)
+
+
+def uninstall():
+    global _observer
+    if _observer is not None:
+        FreeCAD.removeDocumentObserver(_observer)
+        _observer = None
+    _caches.clear()
+
+
+def getCache(doc=None):
+    """
+    getCache(doc=None)
+    Returns the BOMCache of the document, building it at first call.
+      doc: the App document; default the ActiveDocument
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    if doc is None:
+        return None
+    install()
+    cache = _caches.get(doc.Name)
+    if cache is None:
+        cache = _caches[doc.Name] = BOMCache(doc)
+    return cache
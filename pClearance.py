@@ -0,0 +1,273 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Clearance between the pipes of the pype-lines.
+
+Each Pipe, Elbow and Flange is the envelope of the points within a radius
+from its axis: OD/2 (D/2 for flanges) plus insulation plus half the gap
+required, around the axis of the pipe, the chords of the center-line of the
+elbow or the thickness of the flange. Two envelopes that overlap are a
+violation; no offset solid is built.
+The candidate pairs are those in neighbouring cells of a uniform grid where
+each axis is registered in the cells it crosses, so the check takes time
+about linear with the number of parts.
+The parts joined directly or through one fitting are not checked: the
+joints are found between the ports of all the pype-objects, so that the
+parts without envelope, like the gaskets, join the parts on their sides.
+"""
+
+__title__ = "pypeTools clearance check"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+from itertools import product
+from math import cos, pi
+
+import FreeCAD
+
+from uClash import connected, segmentDistance
+
+GAP = 25.0  # mm between the outer faces of the insulation
+INSULATION = 0.0  # mm, where the parts and their PypeLine have no "Insulation"
+ELBOW_CHORDS = 4  # segments of the center-line of the elbows
+TOL = 0.1  # mm between ports that are connected
+
+
+class Envelope(object):
+    """
+    Envelope(obj, points, r)
+    The points within r from the polyline points, in global coordinates.
+    Like uClash.ClashItem it has the ends and the axes where other parts
+    connect.
+    """
+
+    def __init__(self, obj, points, r):
+        self.name = obj.Name
+        self.label = obj.Label
+        self.r = r
+        self.segments = list(zip(points[:-1], points[1:]))
+        self.ends = [obj.Placement.multVec(p) for p in getattr(obj, "Ports", [])]
+        self.axes = self.segments
+
+    def distance(self, other):
+        "the minimum distance between the axes"
+        return min(segmentDistance(A, B, C, D) for A, B in self.segments for C, D in other.segments)
+
+
+def insulationOf(obj, lines, default=INSULATION):
+    """
+    insulationOf(obj, lines, default=INSULATION)
+    The thickness of the insulation of obj: its property "Insulation" if
+    any, else that of its PypeLine, else default.
+      lines: the dictionary {part name: PypeLine} of pypeLines()
+    """
+    for o in (obj, lines.get(obj.Name)):
+        if o is not None and hasattr(o, "Insulation"):
+            return float(o.Insulation)
+    return default
+
+
+def envelopeOf(obj, insulation, gap=GAP):
+    """
+    envelopeOf(obj, insulation, gap=GAP)
+    Returns the Envelope of the Pipe, Elbow or Flange obj, or None.
+    """
+    PType = getattr(obj, "PType", None)
+    pl = obj.Placement
+    if PType == "Pipe" and float(obj.Height) > 0:
+        points = [pl.Base, pl.multVec(FreeCAD.Vector(0, 0, float(obj.Height)))]
+        return Envelope(obj, points, float(obj.OD) / 2 + insulation + gap / 2)
+    if PType == "Elbow" and 0 < float(obj.BendAngle) < 180:
+        # the App::Link instances carry BendAngle and BendRadius, not the Proxy
+        proxy = obj.getLinkedObject(True).Proxy
+        points = [pl.multVec(p) for p in proxy.axisPoints(obj, ELBOW_CHORDS)]
+        # the chords are inside the arc by the sagitta
+        half = float(obj.BendAngle) / 180 * pi / ELBOW_CHORDS / 2
+        sagitta = float(obj.BendRadius) * (1 - cos(half))
+        return Envelope(obj, points, float(obj.OD) / 2 + insulation + gap / 2 + sagitta)
+    if PType == "Flange":
+        z0, z1 = -float(getattr(obj, "trf", 0)), float(obj.t)
+        points = [pl.multVec(FreeCAD.Vector(0, 0, z)) for z in (z0, z1)]
+        return Envelope(obj, points, float(obj.D) / 2 + gap / 2)
+    return None
+
+
+def pypeLines(doc):
+    """
+    pypeLines(doc)
+    Returns the dictionary {part name: PypeLine or PypeBranch object}.
+    """
+    lines = dict()
+    for o in doc.Objects:
+        PType = getattr(o, "PType", None)
+        if PType == "PypeLine":
+            found = doc.getObjectsByLabel(o.Group)
+            for x in found[0].OutList if found else []:
+                lines.setdefault(x.Name, o)
+        elif PType == "PypeBranch":
+            for n in list(o.Tubes) + list(o.Curves):
+                lines[n] = o
+    return lines
+
+
+def portLinks(parts, tol=TOL):
+    """
+    portLinks(parts, tol=TOL)
+    Returns the dictionary {(name, k): set of (name, k)} of the ports of
+    the other parts within tol from the port k of each part, found hashing
+    the ports in cells of side tol.
+      parts: the dictionary {name: list of the global ports}
+    """
+    cells = dict()  # cell -> [(name, k, port)]
+    for name, ports in parts.items():
+        for k, P in enumerate(ports):
+            c = (round(P.x / tol), round(P.y / tol), round(P.z / tol))
+            cells.setdefault(c, list()).append((name, k, P))
+    links = {(name, k): set() for name, ports in parts.items() for k in range(len(ports))}
+    for (cx, cy, cz), items in cells.items():
+        near = list()
+        for d in product((-1, 0, 1), repeat=3):
+            near.extend(cells.get((cx + d[0], cy + d[1], cz + d[2]), []))
+        for a, i, P in items:
+            for b, j, Q in near:
+                if a != b and (P - Q).Length <= tol:
+                    links[(a, i)].add((b, j))
+    return links
+
+
+def portJoints(parts, tol=TOL):
+    """
+    portJoints(parts, tol=TOL)
+    Returns the dictionary {name: set of names} of the parts with one port
+    within tol from a port of the other (see portLinks()).
+      parts: the dictionary {name: list of the global ports}
+    """
+    joints = {name: set() for name in parts}
+    for (a, i), others in portLinks(parts, tol).items():
+        joints[a].update(b for b, j in others)
+    return joints
+
+
+def envelopeJoints(joints, names):
+    """
+    envelopeJoints(joints, names)
+    Returns the dictionary {name: set of names} of the parts of names
+    joined directly or through parts not in names, as the gaskets.
+      joints: the dictionary of portJoints()
+    """
+    result = dict()
+    for name in names:
+        found, stack, seen = set(), list(joints.get(name, [])), {name}
+        while stack:
+            n = stack.pop()
+            if n in seen:
+                continue
+            seen.add(n)
+            if n in names:
+                found.add(n)
+            else:
+                stack.extend(joints.get(n, []))
+        result[name] = found
+    return result
+
+
+class Grid(object):
+    """
+    Grid(size)
+    Uniform grid of cubic cells of side size: each envelope is registered
+    in the cells of the points of its axis, taken every size/4.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = dict()  # cell -> indexes of envelopes
+
+    def cell(self, P):
+        return (int(P.x // self.size), int(P.y // self.size), int(P.z // self.size))
+
+    def add(self, i, envelope):
+        cells = set()
+        step = self.size / 4
+        for A, B in envelope.segments:
+            n = max(1, int((B - A).Length / step) + 1)
+            for k in range(n + 1):
+                cells.add(self.cell(A + (B - A) * (k / n)))
+        for c in cells:
+            self.cells.setdefault(c, list()).append(i)
+        return cells
+
+    def near(self, cells):
+        "indexes of the envelopes in the cells and in their neighbours"
+        result = set()
+        for cx, cy, cz in cells:
+            for d in product((-1, 0, 1), repeat=3):
+                result.update(self.cells.get((cx + d[0], cy + d[1], cz + d[2]), []))
+        return result
+
+
+def checkClearance(doc=None, gap=GAP, insulation=INSULATION):
+    """
+    checkClearance(doc=None, gap=GAP, insulation=INSULATION)
+    Returns the sorted list of (clearance, name1, name2) of the pairs of
+    parts whose insulated envelopes are closer than gap: clearance is the
+    distance between the outer faces of insulation minus gap, negative.
+      insulation: the thickness for the parts without "Insulation"
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    lines = pypeLines(doc)
+    envelopes = list()
+    ports = dict()  # name of each pype-object -> global ports
+    for o in doc.Objects:
+        if hasattr(o, "PType") and not hasattr(o, "InstanceKey"):
+            if o.PType in ("PypeLine", "PypeBranch"):
+                continue
+            ports[o.Name] = [o.Placement.multVec(p) for p in getattr(o, "Ports", [])]
+            e = envelopeOf(o, insulationOf(o, lines, insulation), gap)
+            if e:
+                envelopes.append(e)
+    if not envelopes:
+        return []
+    index = {e.name: i for i, e in enumerate(envelopes)}
+    # two envelopes closer than r1+r2 have axis points at most 2*rMax + size/4
+    # apart: with size = 3*rMax they fall in neighbouring cells
+    grid = Grid(3 * max(e.r for e in envelopes))
+    cellsOf = [grid.add(i, e) for i, e in enumerate(envelopes)]
+    candidates = set()
+    for i, cells in enumerate(cellsOf):
+        candidates.update((i, j) for j in grid.near(cells) if j > i)
+    byName = envelopeJoints(portJoints(ports), set(index))
+    joined = {i: {index[n] for n in byName[e.name]} for i, e in enumerate(envelopes)}
+    for i, j in candidates:
+        if connected(envelopes[i], envelopes[j], TOL):
+            joined[i].add(j)
+            joined[j].add(i)
+    violations = list()
+    for i, j in candidates:
+        if j in joined[i] or joined[i] & joined[j]:
+            continue
+        a, b = envelopes[i], envelopes[j]
+        c = a.distance(b) - a.r - b.r
+        if c < 0:
+            violations.append((c, a.name, b.name))
+    return sorted(violations)
+
+
+def reportByLine(violations, doc=None):
+    """
+    reportByLine(violations, doc=None)
+    Returns the dictionary {PypeLine label: [(clearance, label1, label2)]}
+    of the violations of checkClearance(); a pair of two pype-lines is
+    listed under both, the parts of no pype-line under "".
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    lines = pypeLines(doc)
+    report = dict()
+    for c, a, b in violations:
+        row = (c, doc.getObject(a).Label, doc.getObject(b).Label)
+        owners = {lines[n].Label if n in lines else "" for n in (a, b)}
+        for label in owners:
+            report.setdefault(label, list()).append(row)
+    return report
@@ -2,7 +2,6 @@
 
 __title__ = "pypeTools functions"
 import FreeCAD
-import FreeCADGui
 import Part
 import fCmd
 import pFeatures
@@ -11,7 +10,11 @@ from quetzal_config import get_icon_path
 
 from math import degrees
 
+if FreeCAD.GuiUp:
+    import FreeCADGui
+
 objToPaint = ["Pipe", "Elbow", "Reduct", "Flange", "Cap", "Tee"]
+viewProviders = True  # set False to skip view providers in make* functions
 
 
 __author__ = "oddtopus"
@@ -24,6 +27,210 @@ Z = FreeCAD.Vector(0, 0, 1)
 translate = FreeCAD.Qt.translate
 QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
 
+############### BATCH CONSTRUCTION ###############
+
+_batchDepth = 0
+_batchDoc = None
+
+
+class batch(object):
+    """
+    with batch(name=None, doc=None):
+        ...
+    Suppresses the recompute() and the transactions of the make* and do*
+    functions called inside the block: one transaction is opened at the
+    beginning and the document is recomputed only once at the end.
+    Nested blocks are merged into the outermost one.
+    If an exception is raised inside the block the transaction is aborted.
+      name: the name of the transaction
+      doc: the document; default the ActiveDocument
+      lazy: if True, new pype-objects get only their Ports (see
+        pFeatures.pypeType.initShape()) and the Shapes are built by the
+        final recompute; don't use it if the Shapes are read inside the block
+    """
+
+    def __init__(self, name=None, doc=None, lazy=False):
+        self.name = name or translate("Transaction", "Batch insert")
+        self.doc = doc
+        self.lazy = lazy
+
+    def __enter__(self):
+        global _batchDepth, _batchDoc
+        if not _batchDepth:
+            _batchDoc = self.doc or FreeCAD.ActiveDocument
+            _batchDoc.openTransaction(self.name)
+        _batchDepth += 1
+        self.lazyShapes = pFeatures.lazyShapes
+        if self.lazy:
+            pFeatures.lazyShapes = True
+        return _batchDoc
+
+    def __exit__(self, exc_type, exc_value, tb):
+        global _batchDepth, _batchDoc
+        pFeatures.lazyShapes = self.lazyShapes
+        _batchDepth -= 1
+        if not _batchDepth:
+            doc, _batchDoc = _batchDoc, None
+            if exc_type is None:
+                doc.commitTransaction()
+                doc.recompute()
+            else:
+                doc.abortTransaction()
+        return False
+
+
+def inBatch():
+    "True inside a batch() block"
+    return _batchDepth > 0
+
+
+def recompute(doc=None):
+    "Recomputes the document, unless inside a batch() block"
+    if not _batchDepth:
+        (doc or FreeCAD.ActiveDocument).recompute()
+
+
+def openTransaction(name, doc=None):
+    "Opens a transaction, unless inside a batch() block"
+    if not _batchDepth:
+        (doc or FreeCAD.ActiveDocument).openTransaction(name)
+
+
+def commitTransaction(doc=None):
+    "Commits the transaction, unless inside a batch() block"
+    if not _batchDepth:
+        (doc or FreeCAD.ActiveDocument).commitTransaction()
+
+
+############### INSTANCING ###############
+
+# PTypes that can be inserted as App::Link to a shared prototype
+instanceTypes = [
+    "Elbow",
+    "Flange",
+    "Cap",
+    "Tee",
+    "Gasket",
+    "Bolts_Nuts",
+    "SocketEll",
+    "SocketTee",
+    "SocketCap",
+    "SocketCoupling",
+    "SocketUnion",
+]
+instancing = None  # True/False override the preference "UseInstances"
+
+
+def useInstances():
+    "True if the do* functions shall insert App::Link instead of new solids"
+    if instancing is not None:
+        return instancing
+    return FreeCAD.ParamGet("User parameter:BaseApp/Preferences/Mod/Quetzal").GetBool(
+        "UseInstances", False
+    )
+
+
+# PType -> the groups of its catalog properties, where not only the one named as the PType
+catalogGroups = {
+    "Flange": ["Flange", "Flange2", "Flange Socket welding"],
+}
+
+
+def catalogProps(obj):
+    "the names of the properties of obj in the catalog groups of its PType"
+    groups = catalogGroups.get(obj.PType, [obj.PType])
+    return [p for p in obj.PropertiesList if obj.getGroupOfProperty(p) in groups]
+
+
+def instanceKey(obj):
+    """
+    instanceKey(obj)
+    Returns the catalog key of the pype-object obj as a string:
+    PType, PRating, PSize and the values of its catalogProps().
+    """
+    values = [obj.PType, obj.PRating, obj.PSize]
+    for p in sorted(catalogProps(obj)):
+        v = getattr(obj, p)
+        if hasattr(v, "Value"):
+            v = round(v.Value, 6)
+        values.append("%s=%s" % (p, v))
+    return ";".join(str(v) for v in values)
+
+
+def prototypesGroup(doc=None):
+    """
+    prototypesGroup(doc=None)
+    Returns the group of the prototypes of the document, creating it if missing.
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    group = doc.getObject("Prototypes")
+    if group is None:
+        group = doc.addObject("App::DocumentObjectGroup", "Prototypes")
+        group.Label = translate("Objects", "Prototypes")
+    return group
+
+
+def findPrototype(key, doc=None):
+    "Returns the prototype with InstanceKey key, or None"
+    for o in prototypesGroup(doc).Group:
+        if getattr(o, "InstanceKey", None) == key:
+            return o
+    return None
+
+
+def makeInstance(obj):
+    """
+    makeInstance(obj)
+    Replaces the pype-object obj with an App::Link to the prototype with
+    the same instanceKey(): obj is deleted or, if no such prototype
+    exists yet, becomes the prototype itself.
+    The link carries a read-only copy of PType, PRating, PSize, Ports,
+    PortDirections and catalogProps(), so it can be aligned and listed
+    in the BOM as obj; to change the dimensions, insert a new component.
+    Returns the link, or obj if its PType is not in instanceTypes.
+    """
+    if getattr(obj, "PType", None) not in instanceTypes:
+        return obj
+    doc = obj.Document
+    key = instanceKey(obj)
+    proto = findPrototype(key, doc)
+    link = doc.addObject("App::Link", obj.PType)
+    for p in ["PType", "PRating", "PSize", "Ports", "PortDirections"] + catalogProps(obj):
+        link.addProperty(obj.getTypeIdOfProperty(p), p, obj.getGroupOfProperty(p))
+        setattr(link, p, getattr(obj, p))
+        link.setEditorMode(p, 1)
+    link.Placement = obj.Placement
+    link.Label = obj.Label
+    if proto is None:
+        proto = obj
+        proto.addProperty(
+            "App::PropertyString",
+            "InstanceKey",
+            "PBase",
+            QT_TRANSLATE_NOOP("App::Property", "Catalog key shared by the linked instances"),
+        ).InstanceKey = key
+        proto.setEditorMode("InstanceKey", 1)
+        proto.Placement = FreeCAD.Placement()
+        proto.Visibility = False
+        prototypesGroup(doc).addObject(proto)
+    else:
+        doc.removeObject(obj.Name)
+    link.LinkedObject = proto
+    return link
+
+
+def makeInstances(objs):
+    """
+    makeInstances(objs)
+    Applies makeInstance() to the list objs if useInstances() is True.
+    Returns the list of the resulting objects.
+    """
+    if not useInstances():
+        return objs
+    return [makeInstance(o) for o in objs]
+
+
 ############### AUX FUNCTIONS ######################
 
 
@@ -87,14 +294,16 @@ def moveToPyLi(obj, plName):
     """
     Move obj to the group of pypeLine plName
     """
-    pl = FreeCAD.ActiveDocument.getObjectsByLabel(plName)[0]
-    group = FreeCAD.ActiveDocument.getObjectsByLabel(str(pl.Group))[0]
+    doc = obj.Document
+    pl = doc.getObjectsByLabel(plName)[0]
+    group = doc.getObjectsByLabel(str(pl.Group))[0]
     group.addObject(obj)
-    if hasattr(obj, "PType"):
+    # App::Link instances have no ShapeColor: they show the one of their prototype
+    if hasattr(obj, "PType") and pl.ViewObject and hasattr(obj.ViewObject, "ShapeColor"):
         if obj.PType in objToPaint:
             obj.ViewObject.ShapeColor = pl.ViewObject.ShapeColor
         elif obj.PType == "PypeBranch":
-            for e in [FreeCAD.ActiveDocument.getObject(name) for name in obj.Tubes + obj.Curves]:
+            for e in [doc.getObject(name) for name in obj.Tubes + obj.Curves]:
                 e.ViewObject.ShapeColor = pl.ViewObject.ShapeColor
 
 
@@ -649,6 +858,20 @@ class ViewProvider:
         return self.icon_fn
 
 
+def setViewProvider(obj, icon_fn):
+    """
+    setViewProvider(obj, icon_fn)
+    Attaches the ViewProvider with icon icon_fn to obj.
+    Nothing is done when the GUI is not up (i.e. FreeCADCmd) or when
+    the module variable viewProviders is False.
+    Returns True if the ViewProvider was attached.
+    """
+    if viewProviders and FreeCAD.GuiUp and obj.ViewObject:
+        ViewProvider(obj.ViewObject, icon_fn)
+        return True
+    return False
+
+
 def simpleSurfBend(path=None, profile=None):
     "select the centerline and the O.D. and let it sweep"
     curva = FreeCAD.activeDocument().addObject("Part::Feature", "Simple curve")
@@ -741,7 +964,7 @@ def makePipe(rating,propList=[], pos=None, Z=None):
         pFeatures.Pipe(a,rating, *propList)
     else:
         pFeatures.Pipe(a,rating)
-    ViewProvider(a.ViewObject, "Quetzal_InsertPipe")
+    setViewProvider(a, "Quetzal_InsertPipe")
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -759,7 +982,7 @@ def doPipes(rating,propList=["DN50", 60.3, 3, 1000], pypeline=None):
       H (float): length of pipe ]
     pypeline = string
     """
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert pipe"))
+    openTransaction(translate("Transaction", "Insert pipe"))
     plist = list()
     try:
         #first, if a an object with ports is selected and edges, faces, or vertices are selected, insert the component at the closest port to the 
@@ -776,8 +999,8 @@ def doPipes(rating,propList=["DN50", 60.3, 3, 1000], pypeline=None):
         if usablePorts:
             pipe = makePipe(rating, propList, pos, Z)
             plist.append(pipe)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(pipe, 0, srcObj, srcPort)
         else:
             plist.append(makePipe(rating, propList, pos, Z))
@@ -788,8 +1011,8 @@ def doPipes(rating,propList=["DN50", 60.3, 3, 1000], pypeline=None):
     if pypeline:
         for p in plist:
             moveToPyLi(p, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
 
 
@@ -802,7 +1025,7 @@ def makeTerminalAdapter(rating,propList=[],pos=None,Z=None):
         Z = FreeCAD.Vector(0, 0, 1)
     a = FreeCAD.ActiveDocument.addObject("Part::FeaturePython", "TerminalAdapter")
     pFeatures.TerminalAdapter(a,rating, *propList)
-    ViewProvider(a.ViewObject, "Quetzal_TerminalAdapter")
+    setViewProvider(a, "Quetzal_TerminalAdapter")
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), -Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -831,7 +1054,7 @@ def makeElbow(propList=[], pos=None, Z=None, rating="SCH-STD"):
         pFeatures.Elbow(a, rating, *propList)
     else:
         pFeatures.Elbow(a, rating)
-    ViewProvider(a.ViewObject, "Quetzal_InsertElbow")
+    setViewProvider(a, "Quetzal_InsertElbow")
    
     # Rotate so port[0]'s local direction faces Z.
     # SocketEll port[0] direction is (1,0,0) — local +X, not +Z — so the
@@ -934,6 +1157,9 @@ def shortenPipeAtPort(pipe, trim_length, port):
     Port 1 is the far end: shortening it reduces Height only; Placement.Base
     is unchanged so Port[0] stays in place.
 
+    Ports and PortDirections are updated at once, without a recompute, so
+    the fittings can be aligned to them inside a batch().
+
     The function does nothing and prints a warning if trim_length is negative
     or would reduce the pipe to zero or negative length.
     """
@@ -954,6 +1180,9 @@ def shortenPipeAtPort(pipe, trim_length, port):
         return
 
     pipe.Height = FreeCAD.Units.Quantity(str(h - trim_length) + "mm")
+    # refresh the ports now: inside a batch() there's no recompute before
+    # alignTwoPorts() reads them
+    pipe.Ports, pipe.PortDirections = pipe.Proxy.computePorts(pipe)
 
     if port == 0:
         # Trim the base end: move Placement.Base along the pipe axis so that
@@ -979,7 +1208,7 @@ def doElbow(rating="SCH-STD", propList=["DN50", 60.3, 3, 90, 45.225], pypeline=N
       pFeatures.Elbow.execute().
     """
     elist = []
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert elbow"))
+    openTransaction(translate("Transaction", "Insert elbow"))
     selex = FreeCADGui.Selection.getSelectionEx()
     if len(selex) == 0:  # no selection -> insert one elbow at origin
         elist.append(makeElbow(propList, rating=rating))
@@ -1014,8 +1243,8 @@ def doElbow(rating="SCH-STD", propList=["DN50", 60.3, 3, 90, 45.225], pypeline=N
                     rot = elb.Placement.Rotation
                     trim_length = rot.multVec(port_vec).Length
                     shortenPipeAtPort(pipe, trim_length, srcPort)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(elb, 0, srcObj, srcPort)
         else:
             elist.append(makeElbow(propList, pos, Z, rating=rating))
@@ -1036,11 +1265,12 @@ def doElbow(rating="SCH-STD", propList=["DN50", 60.3, 3, 90, 45.225], pypeline=N
             elb = elist.append(makeElbowBetweenThings(*things[:2], propList=propList))
         except:
             FreeCAD.Console.PrintError("Creation of elbow is failed\n")
+    elist = makeInstances(elist)
     if pypeline:
         for e in elist:
             moveToPyLi(e, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return elist
 
 
@@ -1080,7 +1310,7 @@ def makeFlange(propList=[], pos=None, Z=None, doOffset=None, rating="DIN-PN16",
         pFeatures.Flange(a, rating, *propList, FClass=fclass)
     else:
         pFeatures.Flange(a, rating, FClass=fclass)
-    ViewProvider(a.ViewObject, "Quetzal_InsertFlange")
+    setViewProvider(a, "Quetzal_InsertFlange")
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -1098,7 +1328,7 @@ def makeFlange(propList=[], pos=None, Z=None, doOffset=None, rating="DIN-PN16",
         a.Placement = a.Placement.multiply(
             FreeCAD.Placement(FreeCAD.Vector(0, 0, zpos), FreeCAD.Rotation())
         )
-    FreeCAD.ActiveDocument.recompute()
+    recompute()
     a.Label = translate("Objects", "Flange")
     return a
 
@@ -1134,7 +1364,7 @@ def doFlanges(
     """
     flist = []
     #tubes = [t for t in fCmd.beams() if hasattr(t, "PSize")]
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert flange"))
+    openTransaction(translate("Transaction", "Insert flange"))
     
     if attachFace:
         connecting_port = 0
@@ -1176,19 +1406,20 @@ def doFlanges(
                     pipe = pipes[0]
                     shortenPipeAtPort(pipe, trim_length, srcPort)
 
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
          
             alignTwoPorts(flange, connecting_port, srcObj, srcPort)
 
         else:
             flist.append(makeFlange(propList, pos, Z, doOffset, rating=rating, fclass=fclass))
    
+    flist = makeInstances(flist)
     if pypeline:
         for f in flist:
             moveToPyLi(f, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return flist
 
 
@@ -1222,7 +1453,7 @@ def makeReduct(propList=[], pos=None, Z=None, conc=True, smallerEnd=False, ratin
     propList = list(propList)
     propList.insert(6, conc)
     pFeatures.Reduct(a, rating, *propList)
-    ViewProvider(a.ViewObject, "Quetzal_InsertReduct")
+    setViewProvider(a, "Quetzal_InsertReduct")
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -1254,7 +1485,7 @@ def doReduct(rating="SCH-STD", propList=[], pypeline=None, pos=None, Z=None, con
         connecting_port = 1
     else:
         connecting_port = 0
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert Reduct"))
+    openTransaction(translate("Transaction", "Insert Reduct"))
     plist = list()
     try:
         #first, if a an object with ports is selected and edges, faces, or vertices are selected, insert the component at the closest port to the 
@@ -1271,8 +1502,8 @@ def doReduct(rating="SCH-STD", propList=[], pypeline=None, pos=None, Z=None, con
         if usablePorts:
             reduct = makeReduct(propList, pos, Z, conc, smallerEnd, rating=rating)
             plist.append(reduct)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(reduct, connecting_port, srcObj, srcPort)
         else:
             plist.append(makeReduct(propList, pos, Z, conc, smallerEnd, rating=rating))
@@ -1283,14 +1514,14 @@ def doReduct(rating="SCH-STD", propList=[], pypeline=None, pos=None, Z=None, con
     if pypeline:
         for p in plist:
             moveToPyLi(p, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
 
 
-def makeUbolt(propList=[], pos=None, Z=None):
+def makeUbolt(propList=[], pos=None, Z=None, doc=None):
     """Adds a Ubolt object:
-    makeUbolt(propList,pos,Z);
+    makeUbolt(propList,pos,Z,doc);
       propList is one optional list with 5 elements:
         PSize (string): nominal diameter
         ClampType (string): the clamp type or standard
@@ -1299,18 +1530,21 @@ def makeUbolt(propList=[], pos=None, Z=None):
         d (float): the rod diameter
       pos (vector): position of insertion; default = 0,0,0
       Z (vector): orientation: default = 0,0,1
+      doc: the document; default the ActiveDocument
     Remember: property PRating must be defined afterwards
     """
     if pos == None:
         pos = FreeCAD.Vector(0, 0, 0)
     if Z == None:
         Z = FreeCAD.Vector(0, 0, 1)
-    a = FreeCAD.ActiveDocument.addObject("Part::FeaturePython", "U-Bolt")
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    a = doc.addObject("Part::FeaturePython", "U-Bolt")
     if len(propList) == 5:
         pFeatures.Ubolt(a, *propList)
     else:
         pFeatures.Ubolt(a)
-    ViewProvider(a.ViewObject, "Quetzal_InsertUBolt")
+    setViewProvider(a, "Quetzal_InsertUBolt")
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -1329,11 +1563,12 @@ def makeShell(L=1000, W=1500, H=1500, thk1=6, thk2=8):
     """
     a = FreeCAD.ActiveDocument.addObject("Part::FeaturePython", "Tank")
     pFeatures.Shell(a, L, W, H, thk1, thk2)
-    ViewProvider(a.ViewObject, "Quetzal_InsertTank")
+    setViewProvider(a, "Quetzal_InsertTank")
     a.Placement.Base = FreeCAD.Vector(0, 0, 0)
-    a.ViewObject.ShapeColor = 0.0, 0.0, 1.0
-    a.ViewObject.Transparency = 85
-    FreeCAD.ActiveDocument.recompute()
+    if a.ViewObject:
+        a.ViewObject.ShapeColor = 0.0, 0.0, 1.0
+        a.ViewObject.Transparency = 85
+    recompute()
     a.Label = translate("Objects", "Tank")
     return a
 
@@ -1360,7 +1595,7 @@ def makeCap(propList=[], pos=None, Z=None, rating="SCH-STD"):
         pFeatures.Cap(a, rating, *propList)
     else:
         pFeatures.Cap(a, rating)
-    ViewProvider(a.ViewObject, "Quetzal_InsertCap")
+    setViewProvider(a, "Quetzal_InsertCap")
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -1377,7 +1612,7 @@ def doCaps(rating="SCH-STD", propList=["DN50", 60.3, 3], pypeline=None):
       thk (float): shell thickness ]
     pypeline = string
     """
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert cap"))
+    openTransaction(translate("Transaction", "Insert cap"))
     plist = list()
     try:
         #first, if a an object with ports is selected and edges, faces, or vertices are selected, insert the component at the closest port to the 
@@ -1394,8 +1629,8 @@ def doCaps(rating="SCH-STD", propList=["DN50", 60.3, 3], pypeline=None):
         if usablePorts:
             cap = makeCap(propList, pos, Z, rating=rating)
             plist.append(cap)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(cap, 0, srcObj, srcPort)
         else:
             plist.append(makeCap(propList, pos, Z, rating=rating))
@@ -1403,11 +1638,12 @@ def doCaps(rating="SCH-STD", propList=["DN50", 60.3, 3], pypeline=None):
         #nothing selected, insert at origin
         plist.append(makeCap(propList, rating=rating))
         
+    plist = makeInstances(plist)
     if pypeline:
         for p in plist:
             moveToPyLi(p, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
     
     
@@ -1437,7 +1673,7 @@ def makeTee(propList=[], pos=None, Z=None, insertOnBranch=False, rating="SCH-STD
         pFeatures.Tee(a, rating, *propList)
     else:
         pFeatures.Tee(a, rating)
-    ViewProvider(a.ViewObject, "Quetzal_InsertTee")
+    setViewProvider(a, "Quetzal_InsertTee")
 
     a.Placement.Base = pos
 
@@ -1488,7 +1724,7 @@ def doTees(rating="SCH-STD", propList=["DN150", 168.27, 114.3,7.11,6.02,178,156]
         insertion_port = 2
     else:
         insertion_port = 0
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert tee"))
+    openTransaction(translate("Transaction", "Insert tee"))
     plist = list()
     selex = FreeCADGui.Selection.getSelectionEx()
     if len(selex) == 0:  # no selection -> insert one tee at origin
@@ -1519,17 +1755,18 @@ def doTees(rating="SCH-STD", propList=["DN150", 168.27, 114.3,7.11,6.02,178,156]
                     rot = tee.Placement.Rotation
                     trim_length = rot.multVec(port_vec).Length
                     shortenPipeAtPort(pipe, trim_length, srcPort)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(tee, insertion_port, srcObj, srcPort)
         else:
             plist.append(makeTee(propList, pos, Z, insertOnBranch, rating=rating))
 
+    plist = makeInstances(plist)
     if pypeline:
         for p in plist:
             moveToPyLi(p, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
     
 def makeW():
@@ -1580,12 +1817,14 @@ def makePypeLine2(
     lab="Tubatura",
     pl=None,
     color=(0.8, 0.8, 0.8),
+    base=None,
 ):
     """
-    makePypeLine2(DN="DN50",PRating="SCH-STD",OD=60.3,thk=3,BR=None, lab="Tubatura",pl=None, color=(0.8,0.8,0.8))
+    makePypeLine2(DN="DN50",PRating="SCH-STD",OD=60.3,thk=3,BR=None, lab="Tubatura",pl=None, color=(0.8,0.8,0.8), base=None)
     Adds a PypeLine2 object creating pipes over the selected edges.
     Default tube is "DN50", "SCH-STD"
     Bending Radius is set to 0.75*OD.
+      base: the path (Wire or Sketch); if None the selection is used
     """
     if not BR:
         BR = 0.75 * OD
@@ -1593,9 +1832,13 @@ def makePypeLine2(
     if not pl:
         a = FreeCAD.ActiveDocument.addObject("Part::FeaturePython", lab)
         pFeatures.PypeLine2(a, DN, PRating, OD, thk, BR, lab)
-        pFeatures.ViewProviderPypeLine(a.ViewObject)  # a.ViewObject.Proxy=0
-        a.ViewObject.ShapeColor = color
-        if len(FreeCADGui.Selection.getSelection()) == 1:
+        if viewProviders and FreeCAD.GuiUp:
+            pFeatures.ViewProviderPypeLine(a.ViewObject)  # a.ViewObject.Proxy=0
+            a.ViewObject.ShapeColor = color
+        if base:
+            a.Base = base
+            a.Proxy.update(a)
+        elif FreeCAD.GuiUp and len(FreeCADGui.Selection.getSelection()) == 1:
             obj = FreeCADGui.Selection.getSelection()[0]
             isWire = hasattr(obj, "Shape") and obj.Shape.Edges  # type(obj.Shape)==Part.Wire
             isSketch = hasattr(obj, "TypeId") and obj.TypeId == "Sketcher::SketchObject"
@@ -1604,14 +1847,17 @@ def makePypeLine2(
                 a.Proxy.update(a)
             if isWire:
                 drawAsCenterLine(obj)
-        elif fCmd.edges():
+        elif FreeCAD.GuiUp and fCmd.edges():
             path = makeW()
             a.Base = path
             a.Proxy.update(a)
     else:
         a = FreeCAD.ActiveDocument.getObjectsByLabel(pl)[0]
         group = FreeCAD.ActiveDocument.getObjectsByLabel(a.Group)[0]
-        a.Proxy.update(a, fCmd.edges())
+        if base:
+            a.Proxy.update(a, base.Shape.Edges)
+        else:
+            a.Proxy.update(a, fCmd.edges())
         FreeCAD.Console.PrintWarning("Objects added to pypeline's group " + a.Group + "\n")
     return a
 
@@ -1632,7 +1878,7 @@ def makeBranch(
     """
     if not BR:
         BR = 0.75 * OD
-    if not base:
+    if not base and FreeCAD.GuiUp:
         if FreeCADGui.Selection.getSelection():
             obj = FreeCADGui.Selection.getSelection()[0]
             isWire = hasattr(obj, "Shape") and type(obj.Shape) == Part.Wire
@@ -1646,7 +1892,8 @@ def makeBranch(
     if base:
         a = FreeCAD.ActiveDocument.addObject("Part::FeaturePython", lab)
         pFeatures.PypeBranch2(a,PRating, base, DN, OD, thk, BR)
-        pFeatures.ViewProviderPypeBranch(a.ViewObject)
+        if viewProviders and FreeCAD.GuiUp:
+            pFeatures.ViewProviderPypeBranch(a.ViewObject)
         return a
     else:
         FreeCAD.Console.PrintError("Select a valid path.\n")
@@ -2067,7 +2314,7 @@ def header():  # start 20200725
                 pipe.ViewObject.Visibility = False
         else:
             header.Placement = pl.multiply(header.Placement)
-        FreeCAD.activeDocument().recompute()
+        recompute()
     else:
         FreeCAD.Console.PrintError("Insufficient pipes selected\n")
 
@@ -2281,7 +2528,7 @@ def makeValve(propList=[], pos=None, Z=None, flgPropList=None, actuator="Handle"
     else:
         pFeatures.Valve(a)
 
-    ViewProvider(a.ViewObject, "Quetzal_InsertValve")
+    setViewProvider(a, "Quetzal_InsertValve")
 
     # Orient port 0's local direction to face Z, then place origin so that
     # port 0 lands at pos.  (Mirrors the pattern used by makeElbow / makePipe.)
@@ -2311,7 +2558,7 @@ def doValves(propList=["DN50", "ball", 72, 50, 40, 150], pypeline=None, pos=0,
     """
     color  = 0.05, 0.3, 0.75
     vlist  = []
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert valve"))
+    openTransaction(translate("Transaction", "Insert valve"))
 
     if 0 < pos < 100:
         # -- legacy: split a pipe and insert valve in the gap ----------------
@@ -2344,8 +2591,8 @@ def doValves(propList=["DN50", "ball", 72, 50, 40, 150], pypeline=None, pos=0,
                 valve = makeValve(propList, pos_vec, Z_vec, flgPropList=flgPropList, actuator=actuator)
                 vlist.append(valve)
                 valve.ViewObject.ShapeColor = color
-                FreeCAD.activeDocument().commitTransaction()
-                FreeCAD.activeDocument().recompute()
+                commitTransaction()
+                recompute()
                 alignTwoPorts(valve, 0, srcObj, srcPort)
             else:
                 valve = makeValve(propList, pos_vec, Z_vec, flgPropList=flgPropList, actuator=actuator)
@@ -2361,8 +2608,8 @@ def doValves(propList=["DN50", "ball", 72, 50, 40, 150], pypeline=None, pos=0,
         for v in vlist:
             moveToPyLi(v, pypeline)
 
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return vlist
 
 
@@ -2390,7 +2637,7 @@ def makeNozzle(DN="DN50", H=200, OD=60.3, thk=3, D=160, d=62, df=132, f=14, t=15
                 pos=e.centerOfCurvatureAt(0),
                 Z=e.tangentAt(0).cross(e.normalAt(0)),
             )
-            FreeCAD.ActiveDocument.recompute()
+            recompute()
             flange = makeFlange(
                 [DN, "S.O.", D, d, df, f, t, n], pos=portsPos(pipe)[1], Z=portsDir(pipe)[1]
             )
@@ -2403,7 +2650,7 @@ def makeNozzle(DN="DN50", H=200, OD=60.3, thk=3, D=160, d=62, df=132, f=14, t=15
             flange.AttachmentSupport = [(pipe, "Edge1")]
             flange.MapReversed = True
             flange.MapMode = "Concentric"
-            FreeCAD.ActiveDocument.recompute()
+            recompute()
 
 
 def makeRoute(n=Z):
@@ -2434,7 +2681,7 @@ def makeRoute(n=Z):
         s.AttachmentOffset.Rotation = s.AttachmentOffset.Rotation.multiply(
             FreeCAD.Rotation(Y, alfa)
         )
-    FreeCAD.ActiveDocument.recompute()
+    recompute()
     FreeCADGui.activeDocument().setEdit(s.Name)
 
 
@@ -2459,9 +2706,9 @@ def flatten(p1=None, p2=None, c=None):
         com2 = p2.Shape.Solids[0].CenterOfMass
         v1 = P - com1
         v2 = com2 - P
-        FreeCAD.activeDocument().openTransaction(translate("Transaction", "Place one curve"))
+        openTransaction(translate("Transaction", "Place one curve"))
         placeoTherElbow(curves[0], v1, v2, P)
-        FreeCAD.ActiveDocument.recompute()  # recompute for the elbow
+        recompute()  # recompute for the elbow
         port1, port2 = portsPos(curves[0])
         if (com1 - port1).Length < (com1 - port2).Length:
             fCmd.extendTheBeam(p1, port1)
@@ -2469,8 +2716,8 @@ def flatten(p1=None, p2=None, c=None):
         else:
             fCmd.extendTheBeam(p1, port2)
             fCmd.extendTheBeam(p2, port1)
-        FreeCAD.ActiveDocument.recompute()  # recompute for the pipes
-        FreeCAD.ActiveDocument.commitTransaction()
+        recompute()  # recompute for the pipes
+        commitTransaction()
     except:
         FreeCAD.Console.PrintError("Intersection point not found\n")
 
@@ -2513,8 +2760,8 @@ def makeGasket(propList=[], pos=None, Z=None):
     else:
         pFeatures.Gasket(a, "150lb")
 
-    ViewProvider(a.ViewObject, "Quetzal_InsertGasket") 
-    a.ViewObject.ShapeColor = (1.0, 1.0, 0.0)   # yellow
+    if setViewProvider(a, "Quetzal_InsertGasket"):
+        a.ViewObject.ShapeColor = (1.0, 1.0, 0.0)   # yellow
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -2535,7 +2782,7 @@ def doGaskets(propList=[], pypeline=None):
       Rthk (float): inner and centering ring thickness ]
     pypeline = string
     """
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert gasket"))
+    openTransaction(translate("Transaction", "Insert gasket"))
     glist = []
     connecting_port = 0  # gaskets connect via Port[0] (the -Z face) to the mating flange face
     try:
@@ -2549,8 +2796,8 @@ def doGaskets(propList=[], pypeline=None):
         if usablePorts:
             gasket = makeGasket(propList, pos, Z)
             glist.append(gasket)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(gasket, connecting_port, srcObj, srcPort)
         else:
             glist.append(makeGasket(propList, pos, Z))
@@ -2558,11 +2805,12 @@ def doGaskets(propList=[], pypeline=None):
         # nothing selected -- insert at origin
         glist.append(makeGasket(propList))
 
+    glist = makeInstances(glist)
     if pypeline:
         for g in glist:
             moveToPyLi(g, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return glist
 
 
@@ -2594,8 +2842,8 @@ def makeBolts_Nuts(propList=[], pos=None, Z=None):
     else:
         pFeatures.Bolts_Nuts(a, "150lb")
 
-    ViewProvider(a.ViewObject, "Quetzal_InsertGasket")
-    a.ViewObject.ShapeColor = (0.7, 0.7, 0.7)   # light gray for metal
+    if setViewProvider(a, "Quetzal_InsertGasket"):
+        a.ViewObject.ShapeColor = (0.7, 0.7, 0.7)   # light gray for metal
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -2617,7 +2865,7 @@ def doBolts_Nuts(propList=[], pypeline=None):
       SEthk (float) : sealing element thickness from matching gasket ]
     pypeline = string
     """
-    FreeCAD.activeDocument().openTransaction(
+    openTransaction(
         translate("Transaction", "Insert bolts and nuts")
     )
     blist = []
@@ -2633,8 +2881,8 @@ def doBolts_Nuts(propList=[], pypeline=None):
         if usablePorts:
             bn = makeBolts_Nuts(propList, pos, Z)
             blist.append(bn)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(bn, connecting_port, srcObj, srcPort)
         else:
             blist.append(makeBolts_Nuts(propList, pos, Z))
@@ -2642,11 +2890,12 @@ def doBolts_Nuts(propList=[], pypeline=None):
         # nothing selected -- insert at origin
         blist.append(makeBolts_Nuts(propList))
 
+    blist = makeInstances(blist)
     if pypeline:
         for b in blist:
             moveToPyLi(b, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return blist
 
 
@@ -2675,7 +2924,8 @@ def makeBeam(propList=[], pos=None, Z=None):
         fFeatures.Beam(a, *propList)
     else:
         fFeatures.Beam(a)
-    fFeatures.ViewProviderBeam(a.ViewObject)
+    if viewProviders and FreeCAD.GuiUp:
+        fFeatures.ViewProviderBeam(a.ViewObject)
     a.Placement.Base = pos
     rot = FreeCAD.Rotation(FreeCAD.Vector(0, 0, 1), Z)
     a.Placement.Rotation = rot.multiply(a.Placement.Rotation)
@@ -2695,7 +2945,7 @@ def doBeams(propList=[], frameline=None):
       - vertex selected        -> place at vertex, default orientation
       - nothing selected       -> place at origin
     """
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert beam"))
+    openTransaction(translate("Transaction", "Insert beam"))
     blist = []
     try:
         selex = FreeCADGui.Selection.getSelectionEx()[0]
@@ -2718,8 +2968,8 @@ def doBeams(propList=[], frameline=None):
             if edgeLen is not None:
                 beam.Height = edgeLen
             blist.append(beam)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(beam, 0, srcObj, srcPort)
         else:
             beam = makeBeam(propList, pos, Z)
@@ -2734,8 +2984,8 @@ def doBeams(propList=[], frameline=None):
         for b in blist:
             _moveToFrameLine(b, frameline)
 
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return blist
 
 
@@ -2786,9 +3036,9 @@ def makeOutlet(propList=[], pos=None, rot=None, carrierOD=0.0):
     else:
         pFeatures.Outlet(a, carrierOD=carrierOD)
 
-    ViewProvider(a.ViewObject, "Quetzal_InsertOutlet")
+    setViewProvider(a, "Quetzal_InsertOutlet")
     a.Placement = FreeCAD.Placement(pos, rot)
-    FreeCAD.ActiveDocument.recompute()
+    recompute()
     a.Label = translate("Objects", "Outlet")
     return a
 
@@ -2999,13 +3249,13 @@ def doOutlets(propList=None, pypeline=None,
     if rot is None:
         rot = FreeCAD.Rotation()
 
-    FreeCAD.activeDocument().openTransaction(
+    openTransaction(
         translate("Transaction", "Insert outlet"))
     obj = makeOutlet(propList, pos, rot, carrierOD=carrierOD)
     if pypeline:
         moveToPyLi(obj, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return [obj]
 
 def makeSocketElbow(propList=[], pos=None, Z=None, rating="3000lb"):
@@ -3035,7 +3285,7 @@ def makeSocketElbow(propList=[], pos=None, Z=None, rating="3000lb"):
         pFeatures.SocketEll(a, rating, *propList)
     else:
         pFeatures.SocketEll(a, rating)
-    ViewProvider(a.ViewObject, "Quetzal_InsertElbow")
+    setViewProvider(a, "Quetzal_InsertElbow")
     # Rotate so port[0]'s local direction faces Z.
     # SocketEll port[0] direction is (1,0,0) — local +X, not +Z — so the
     # reference axis must be port[0]'s actual local direction, not (0,0,1).
@@ -3078,7 +3328,7 @@ def doSocketElbow(rating="3000lb", propList=["DN25", 33.4, 90, 35.0, 5.0, 25.4,
           """
     
     elist = list()
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert socket elbow"))
+    openTransaction(translate("Transaction", "Insert socket elbow"))
     #first, if a an object with ports is selected and edges, faces, or vertices are selected, insert the component at the closest port to the 
     #first selected object's first selected edge, face, or vertex. If none of those are present, the entire object is selected - insert
     #the component at the highest number port.
@@ -3109,17 +3359,18 @@ def doSocketElbow(rating="3000lb", propList=["DN25", 33.4, 90, 35.0, 5.0, 25.4,
                     rot = socketEll.Placement.Rotation
                     trim_length = rot.multVec(port_vec).Length
                     shortenPipeAtPort(pipe, trim_length, srcPort)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(socketEll, 0, srcObj, srcPort)
         else:
             elist.append(makeSocketElbow(propList, pos, Z, rating=rating))
         
+    elist = makeInstances(elist)
     if pypeline:
         for e in elist:
             moveToPyLi(e, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return elist
 
 
@@ -3152,7 +3403,7 @@ def makeSocketTee(propList=[], pos=None, Z=None, insertOnBranch=False, rating="3
         pFeatures.SocketTee(a, rating, *propList)
     else:
         pFeatures.SocketTee(a, rating)
-    ViewProvider(a.ViewObject, "Quetzal_InsertTee")
+    setViewProvider(a, "Quetzal_InsertTee")
 
     # Choose the insertion port and read its local direction from the object.
     # port[0] direction = (0, 0, -1)  — run end at -Z
@@ -3204,7 +3455,7 @@ def doSocketTee(rating="3000lb", propList=["DN25", "DN25", 33.4, 33.4, 35.0, 5.0
                                   the selected face normal / edge tangent.
     """
     insertion_port = 2 if insertOnBranch else 0
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert socket tee"))
+    openTransaction(translate("Transaction", "Insert socket tee"))
     plist = []
     selex = FreeCADGui.Selection.getSelectionEx()
     if len(selex) == 0:  # no selection -> insert one tee at origin
@@ -3233,17 +3484,18 @@ def doSocketTee(rating="3000lb", propList=["DN25", "DN25", 33.4, 33.4, 35.0, 5.0
                     rot = tee.Placement.Rotation
                     trim_length = rot.multVec(port_vec).Length
                     shortenPipeAtPort(pipe, trim_length, srcPort)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(tee, insertion_port, srcObj, srcPort)
         else:
             plist.append(makeSocketTee(propList, pos, Z, insertOnBranch, rating=rating))
 
+    plist = makeInstances(plist)
     if pypeline:
         for t in plist:
             moveToPyLi(t, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
 
     
@@ -3270,7 +3522,7 @@ def makeSocketCap(propList=[], pos=None, Z=None):
         pFeatures.SocketCap(a, *propList)
     else:
         pFeatures.SocketCap(a)
-    ViewProvider(a.ViewObject, "Quetzal_InsertCap")
+    setViewProvider(a, "Quetzal_InsertCap")
 
     # SocketCap port[0] direction is (0,0,-1) — same axis as BW Cap
     # Rotate so port[0]'s local direction faces Z.
@@ -3307,7 +3559,7 @@ def doSocketCap(propList=["DN25", 33.4, 26.0, 5.0, 13.0, "SW"],
       - Non-ported geometry   → insert with port[0] direction matching
                                   the selected face normal / edge tangent.
     """
-    FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert socket cap"))
+    openTransaction(translate("Transaction", "Insert socket cap"))
     plist = []
     try:
         selex = FreeCADGui.Selection.getSelectionEx()[0]
@@ -3321,8 +3573,8 @@ def doSocketCap(propList=["DN25", 33.4, 26.0, 5.0, 13.0, "SW"],
         if usablePorts:
             cap = makeSocketCap(propList, pos, Z)
             plist.append(cap)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(cap, 0, srcObj, srcPort)
         else:
             plist.append(makeSocketCap(propList, pos, Z))
@@ -3330,11 +3582,12 @@ def doSocketCap(propList=["DN25", 33.4, 26.0, 5.0, 13.0, "SW"],
         # Nothing selected — insert at origin.
         plist.append(makeSocketCap(propList))
 
+    plist = makeInstances(plist)
     if pypeline:
         for t in plist:
             moveToPyLi(t, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
 
 def _makeSocketStraight(fcClass, label, iconName, propList, expectedLen,
@@ -3355,7 +3608,7 @@ def _makeSocketStraight(fcClass, label, iconName, propList, expectedLen,
         fcClass(a, *propList)
     else:
         fcClass(a)
-    ViewProvider(a.ViewObject, iconName)
+    setViewProvider(a, iconName)
 
     # port[0] local direction is (0,0,-1); rotate so it aligns with Z.
     port0_local_dir = a.PortDirections[0] if a.PortDirections else FreeCAD.Vector(0, 0, 1)
@@ -3374,7 +3627,7 @@ def _doSocketStraight(makeFn, transactionLabel, propList, pypeline=None):
     """Insert a socket coupling or union, aligning to the selected port when
     possible.  Internal helper shared by doSocketCoupling and doSocketUnion.
     """
-    FreeCAD.activeDocument().openTransaction(
+    openTransaction(
         translate("Transaction", transactionLabel))
     plist = []
     try:
@@ -3389,8 +3642,8 @@ def _doSocketStraight(makeFn, transactionLabel, propList, pypeline=None):
         if usablePorts:
             fitting = makeFn(propList, pos, Z)
             plist.append(fitting)
-            FreeCAD.activeDocument().commitTransaction()
-            FreeCAD.activeDocument().recompute()
+            commitTransaction()
+            recompute()
             alignTwoPorts(fitting, 0, srcObj, srcPort)
         else:
             plist.append(makeFn(propList, pos, Z))
@@ -3398,11 +3651,12 @@ def _doSocketStraight(makeFn, transactionLabel, propList, pypeline=None):
         # Nothing selected — insert at origin.
         plist.append(makeFn(propList))
 
+    plist = makeInstances(plist)
     if pypeline:
         for t in plist:
             moveToPyLi(t, pypeline)
-    FreeCAD.activeDocument().commitTransaction()
-    FreeCAD.activeDocument().recompute()
+    commitTransaction()
+    recompute()
     return plist
 
 
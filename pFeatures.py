@@ -10,13 +10,15 @@ metaObjs = ["PypeLine", "PypeBranch"]
 from os.path import abspath, dirname, join
 
 import FreeCAD
-import FreeCADGui
 import Part
 
 import fCmd
 import pCmd
 from quetzal_config import FREECADVERSION, get_icon_path
 
+if FreeCAD.GuiUp:
+    import FreeCADGui
+
 QT_TRANSLATE_NOOP = FreeCAD.Qt.QT_TRANSLATE_NOOP
 translate = FreeCAD.Qt.translate
 
@@ -51,6 +53,8 @@ pipe_OD = {
     "DN600" : 609.6
 }
 
+lazyShapes = False  # True: constructors skip execute(), see pypeType.initShape()
+
 ################ CLASSES ###########################
 
 
@@ -107,6 +111,33 @@ class pypeType(object):
     def execute(self, fp):
         fp.positionBySupport()  # to recomute placement according the Support
 
+    def computePorts(self, fp):
+        """
+        computePorts(fp)
+        Returns the tuple (Ports, PortDirections) evaluated from the
+        properties of fp, without building the Shape, or None if
+        the class does not provide it.
+        Pure math: subclasses' execute() use it to set the Ports, so it
+        is also safe to call for snapping and placement before recompute.
+        """
+        return None
+
+    def initShape(self, fp):
+        """
+        initShape(fp)
+        Called at the end of __init__ instead of execute().
+        If lazyShapes is True (see pCmd.batch(lazy=True)) and the
+        class implements computePorts(), only the Ports are set and the
+        Shape is built at the first recompute of the document.
+        """
+        if lazyShapes:
+            ports = self.computePorts(fp)
+            if ports:
+                fp.Ports, fp.PortDirections = ports
+                fp.touch()
+                return
+        self.execute(fp)
+
     def nearestPort(self, point=None):
         """
         nearestPort (point=None)
@@ -116,7 +147,7 @@ class pypeType(object):
         """
         if FreeCAD.ActiveDocument:
             obj = FreeCAD.ActiveDocument.getObject(self.Name)
-            if not point and FreeCADGui.ActiveDocument:
+            if not point and FreeCAD.GuiUp and FreeCADGui.ActiveDocument:
                 try:
                     selex = FreeCADGui.Selection.getSelectionEx()
                     target = selex[0].Object
@@ -190,12 +221,18 @@ class Pipe(pypeType):
             QT_TRANSLATE_NOOP("App::Property", "Section dim."),
         ).Profile = str(obj.OD) + "x" + str(obj.thk)
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         if prop == "ID" and fp.ID < fp.OD:
             fp.thk = (fp.OD - fp.ID) / 2
 
+    def computePorts(self, fp):
+        return (
+            [FreeCAD.Vector(), FreeCAD.Vector(0, 0, float(fp.Height))],
+            [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)],
+        )
+
     def execute(self, fp):
         from math import tan
 
@@ -229,8 +266,7 @@ class Pipe(pypeType):
             )
         else:
             fp.Shape = Part.makeCylinder(fp.OD / 2, fp.Height)
-        fp.Ports = [FreeCAD.Vector(), FreeCAD.Vector(0, 0, float(fp.Height))]
-        fp.PortDirections = [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)] 
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(Pipe, self).execute(fp)  # perform common operations
 
 class TerminalAdapter(pypeType):
@@ -271,7 +307,7 @@ class TerminalAdapter(pypeType):
             "TerminalAdapter",
             QT_TRANSLATE_NOOP("App::Property", "Outside thread side"),
         ).OD2 = OD2
-        self.execute(obj)
+        self.initShape(obj)
     def onChanged(self, fp,prop):
         pass
     def execute(self, fp):
@@ -349,12 +385,61 @@ class Elbow(pypeType):
             QT_TRANSLATE_NOOP("App::Property", "Section dim."),
         ).Profile = str(obj.OD) + "x" + str(obj.thk)
         # obj.Ports=[FreeCAD.Vector(1,0,0),FreeCAD.Vector(0,1,0)]
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         if prop == "ID" and fp.ID < fp.OD:
             fp.thk = (fp.OD - fp.ID) / 2
 
+    def computePorts(self, fp):
+        """
+        Ports at the ends of the center-line: an arc of radius BendRadius
+        centered in (BR, BR, 0) between 225 -/+ BendAngle/2 degrees,
+        moved so that the origin is the intersection of the tangents.
+        """
+        from math import pi, cos, sin, sqrt
+
+        if fp.BendAngle >= 180:
+            return None
+        BR = float(fp.BendRadius)
+        BA = float(fp.BendAngle) / 180 * pi
+        d = BR * sqrt(2) - BR / cos(BA / 2)
+        P = FreeCAD.Vector(BR - d * cos(pi / 4), BR - d * cos(pi / 4), 0)
+        a1 = 5 * pi / 4 - BA / 2
+        a2 = 5 * pi / 4 + BA / 2
+        ports = [
+            P + FreeCAD.Vector(BR * cos(a1), BR * sin(a1), 0),
+            P + FreeCAD.Vector(BR * cos(a2), BR * sin(a2), 0),
+        ]
+        dirs = [
+            FreeCAD.Vector(sin(a1), -cos(a1), 0),  # each port faces outward
+            FreeCAD.Vector(-sin(a2), cos(a2), 0),
+        ]
+        return ports, dirs
+
+    def midPoint(self, fp):
+        "the middle point of the center-line, on the bisector of the elbow"
+        from math import pi, cos, sqrt
+
+        BR = float(fp.BendRadius)
+        d = BR * sqrt(2) - BR / cos(float(fp.BendAngle) / 360 * pi)
+        return FreeCAD.Vector(1, 1, 0) * ((BR - d * cos(pi / 4)) - BR * cos(pi / 4))
+
+    def axisPoints(self, fp, n=4):
+        """
+        axisPoints(fp, n=4)
+        Returns the n+1 points that divide the center-line in n arcs, from
+        Ports[0] to Ports[1], in the coordinates of the elbow.
+        """
+        from math import pi, cos, sin, sqrt
+
+        BR = float(fp.BendRadius)
+        BA = float(fp.BendAngle) / 180 * pi
+        d = BR * sqrt(2) - BR / cos(BA / 2)
+        P = FreeCAD.Vector(BR - d * cos(pi / 4), BR - d * cos(pi / 4), 0)
+        angles = [5 * pi / 4 - BA / 2 + BA * i / n for i in range(n + 1)]
+        return [P + FreeCAD.Vector(BR * cos(a), BR * sin(a), 0) for a in angles]
+
     def execute(self, fp):
         parent = fp.getParentGroup()
         if parent:
@@ -371,34 +456,16 @@ class Elbow(pypeType):
                 fp.thk = fp.OD / 2
             fp.ID = fp.OD - 2 * fp.thk
             fp.Profile = str(fp.OD) + "x" + str(fp.thk)
-            CenterOfBend = FreeCAD.Vector(fp.BendRadius, fp.BendRadius, 0)
-            ## make center-line ##
-            R = Part.makeCircle(
-                fp.BendRadius,
-                CenterOfBend,
-                FreeCAD.Vector(0, 0, 1),
-                225 - float(fp.BendAngle) / 2,
-                225 + float(fp.BendAngle) / 2,
-            )
-            ## move the cl so that Placement.Base is the center of elbow ##
-            from math import pi, cos, sqrt
-
-            d = fp.BendRadius * sqrt(2) - fp.BendRadius / cos(fp.BendAngle / 180 * pi / 2)
-            P = FreeCAD.Vector(-d * cos(pi / 4), -d * cos(pi / 4), 0)
-            R.translate(P)
             ## calculate Ports position ##
-            fp.Ports = [R.valueAt(R.FirstParameter), R.valueAt(R.LastParameter)]
-            fp.PortDirections = [
-                R.tangentAt(R.FirstParameter) * -1,  #each port faces outward
-                R.tangentAt(R.LastParameter)          
-            ]
+            fp.Ports, fp.PortDirections = self.computePorts(fp)
+            ## make center-line through the ports ##
+            P0, P1 = fp.Ports
+            R = Part.Arc(P0, self.midPoint(fp), P1).toShape()
             ## make the shape of the elbow ##
-            c = Part.makeCircle(fp.OD / 2, fp.Ports[0], R.tangentAt(R.FirstParameter) * -1)
+            c = Part.makeCircle(fp.OD / 2, P0, fp.PortDirections[0])
             b = Part.makeSweepSurface(R, c)
             p1 = Part.Face(Part.Wire(c))
-            p2 = Part.Face(
-                Part.Wire(Part.makeCircle(fp.OD / 2, fp.Ports[1], R.tangentAt(R.LastParameter)))
-            )
+            p2 = Part.Face(Part.Wire(Part.makeCircle(fp.OD / 2, P1, fp.PortDirections[1])))
             try:
                 sol = Part.Solid(Part.Shell([b.Faces[0], p1.Faces[0], p2.Faces[0]]))
                 planeFaces = [f for f in sol.Faces if type(f.Surface) == Part.Plane]
@@ -575,6 +642,19 @@ class Flange(pypeType):
                 )
         return None
 
+    def computePorts(self, fp):
+        if fp.FlangeType == "WN":
+            ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.T1))] #weld neck flanges mate with pipe at T1, raised face is at 0,0,-RF thickness
+        elif fp.FlangeType == "SW":
+            ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.T1)-float(fp.Y)-float(fp.trf))] #Socket weld flanges mate with pipe at Y - RF thickness, raised face is at 0,0,-RF thickness
+        elif fp.FlangeType == "BL": #blind flange
+            ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.t))] #Blind flange: port 0 at raised face, fictitious port 1 at outer back face
+        elif fp.FlangeType == "SO":
+            ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.trf))] #slip on flange: port 0 at raised face, port 1 mated to pipe back RF thickness from edge of flange hub (2 * trf back from raised face edge)
+        else: #lap joint
+            ports = [FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(0, 0, float(fp.trf))] #lap joint flanges should be mated with pipe at 0,0,0. Raised face will be at 0,0,-RF thickness
+        return ports, [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)] #Flange face is toward -Z direction, flange weld end faces in +Z direction
+
     def execute(self, fp):
        
         base = Part.Face(Part.Wire(Part.makeCircle(fp.D / 2)))
@@ -597,7 +677,8 @@ class Flange(pypeType):
                 hole.rotate(FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(0, 0, 1), 360.0 / fp.n)
         # creates flange thickness
         flange = base.extrude(FreeCAD.Vector(0, 0, fp.t)) 
-        fp.ViewObject.Deviation = 0.10
+        if fp.ViewObject:
+            fp.ViewObject.Deviation = 0.10
         if (
             fp.FlangeType == "SW"
             or fp.FlangeType == "WN"
@@ -662,17 +743,7 @@ class Flange(pypeType):
                 rf = Part.makeCylinder(fp.drf / 2, fp.trf, vO, vZ * -1)
                 flange = flange.fuse(rf)
         fp.Shape = flange
-        if fp.FlangeType == "WN":
-            fp.Ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.T1))] #weld neck flanges mate with pipe at T1, raised face is at 0,0,-RF thickness
-        elif fp.FlangeType == "SW":
-            fp.Ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.T1)-float(fp.Y)-float(fp.trf))] #Socket weld flanges mate with pipe at Y - RF thickness, raised face is at 0,0,-RF thickness
-        elif fp.FlangeType == "BL": #blind flange
-            fp.Ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.t))] #Blind flange: port 0 at raised face, fictitious port 1 at outer back face
-        elif fp.FlangeType == "SO":
-            fp.Ports = [FreeCAD.Vector(0, 0, -float(fp.trf)), FreeCAD.Vector(0, 0, float(fp.trf))] #slip on flange: port 0 at raised face, port 1 mated to pipe back RF thickness from edge of flange hub (2 * trf back from raised face edge)
-        else: #lap joint
-            fp.Ports = [FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(0, 0, float(fp.trf))] #lap joint flanges should be mated with pipe at 0,0,0. Raised face will be at 0,0,-RF thickness
-        fp.PortDirections = [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)] #Flange face is toward -Z direction, flange weld end faces in +Z direction
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(Flange, self).execute(fp)  # perform common operations
 
     #!TODO:this method generate a PartDesign object with sketch nest, pending feature compatibility
@@ -803,10 +874,20 @@ class SocketEll(pypeType):
             "SocketEll",
             QT_TRANSLATE_NOOP("App::Property", "Connection type (SW=Socket Weld, TH=Threaded)"),
         ).Conn = Conn
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
+
+    def computePorts(self, fp):
+        from math import pi, cos, sin
+
+        E = float(fp.E)
+        a = float(fp.BendAngle) * pi / 180
+        return (
+            [FreeCAD.Vector(E, 0, 0), FreeCAD.Vector(-E * cos(a), E * sin(a), 0)],
+            [FreeCAD.Vector(1, 0, 0), FreeCAD.Vector(-cos(a), sin(a), 0)],
+        )
     
     def execute(self, fp):
         from math import pi, cos, sin
@@ -852,9 +933,7 @@ class SocketEll(pypeType):
 
         fp.Shape = base   
 
-        fp.Ports = [ FreeCAD.Vector(fp.E,0,  0), FreeCAD.Vector(-fp.E * cos(fp.BendAngle*pi/180), fp.E* sin(fp.BendAngle*pi/180), 0)]
-        fp.PortDirections = [FreeCAD.Vector(1,0,0), 
-                      FreeCAD.Vector(-cos(fp.BendAngle*pi/180), sin(fp.BendAngle*pi/180), 0)]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(SocketEll, self).execute(fp)  # perform common operations
 
 class Tee(pypeType):
@@ -954,11 +1033,21 @@ class Tee(pypeType):
             "Tee",
             QT_TRANSLATE_NOOP("App::Property", "Run and Branch Size"),
         ).Profile = str(obj.OD) + "x" + str(obj.OD2)
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
     
+    def computePorts(self, fp):
+        return (
+            [
+                FreeCAD.Vector(0, 0, -float(fp.C)),
+                FreeCAD.Vector(0, 0, float(fp.C)),
+                FreeCAD.Vector(0, float(fp.M), 0),
+            ],
+            [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1), FreeCAD.Vector(0, 1, 0)],
+        )
+
     def execute(self, fp):
         
         fp.Profile = str(fp.OD) + "x" + str(fp.OD2)        
@@ -1045,10 +1134,7 @@ class Tee(pypeType):
                     )
 
         fp.Shape = Base
-        fp.Ports = [FreeCAD.Vector(0, 0, -float(fp.C)), FreeCAD.Vector(0, 0, float(fp.C)), FreeCAD.Vector(0, float(fp.M), 0)]
-        fp.PortDirections = [FreeCAD.Vector(0, 0, -1), 
-                      FreeCAD.Vector(0, 0, 1), 
-                      FreeCAD.Vector(0, 1, 0)]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(Tee, self).execute(fp)  # perform common operations
 
 class SocketTee(pypeType):
@@ -1153,11 +1239,28 @@ class SocketTee(pypeType):
                               "Connection type (SW=Socket Weld, TH=Threaded)"),
         ).Conn = Conn
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        # Port 0: run end at -Z  (primary insertion port, outward direction -Z)
+        # Port 1: run end at +Z  (outward direction +Z)
+        # Port 2: branch at +Y   (outward direction +Y)
+        return (
+            [
+                FreeCAD.Vector(0, 0, -float(fp.E)),
+                FreeCAD.Vector(0, 0,  float(fp.E)),
+                FreeCAD.Vector(0,  float(fp.E), 0),
+            ],
+            [
+                FreeCAD.Vector(0, 0, -1),
+                FreeCAD.Vector(0, 0,  1),
+                FreeCAD.Vector(0,  1,  0),
+            ],
+        )
+
     def execute(self, fp):
         # ── outer body ───────────────────────────────────────────────────────
         centerBodyRadius = fp.D / 2 + fp.G
@@ -1224,20 +1327,7 @@ class SocketTee(pypeType):
         base = base.cut(cutout)
         fp.Shape = base
 
-        # ── ports ─────────────────────────────────────────────────────────────
-        # Port 0: run end at -Z  (primary insertion port, outward direction -Z)
-        # Port 1: run end at +Z  (outward direction +Z)
-        # Port 2: branch at +Y   (outward direction +Y)
-        fp.Ports = [
-            FreeCAD.Vector(0, 0, -float(fp.E)),
-            FreeCAD.Vector(0, 0,  float(fp.E)),
-            FreeCAD.Vector(0,  float(fp.E), 0),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0, -1),
-            FreeCAD.Vector(0, 0,  1),
-            FreeCAD.Vector(0,  1,  0),
-        ]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(SocketTee, self).execute(fp)  # perform common operations
 
     
@@ -1331,11 +1421,24 @@ class Reduct(pypeType):
             QT_TRANSLATE_NOOP("App::Property", "Concentric or Eccentric"),
         ).conc = conc
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        if fp.OD <= fp.OD2:
+            return None
+        H = float(fp.Height)
+        if fp.calcH or H == 0:
+            H = 3 * float(fp.OD - fp.OD2)
+        if fp.conc:
+            port1 = FreeCAD.Vector(0, 0, H)
+        else:
+            port1 = FreeCAD.Vector(float(fp.OD - fp.OD2) / 2, 0, H)
+        # in either case, ports face -Z and +Z
+        return [FreeCAD.Vector(), port1], [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)]
+
     def execute(self, fp):
         if fp.OD > fp.OD2:
             if fp.calcH or fp.Height == 0:
@@ -1349,8 +1452,6 @@ class Reduct(pypeType):
                     )
                 else:
                     fp.Shape = sol
-                fp.Ports = [FreeCAD.Vector(), FreeCAD.Vector(0, 0, float(fp.Height))]
-
             else:
                 C = Part.makeCircle(fp.OD / 2, FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(0, 0, 1))
                 c = Part.makeCircle(fp.OD2 / 2, FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(0, 0, 1))
@@ -1371,11 +1472,7 @@ class Reduct(pypeType):
                     fp.Shape = sol.cut(Part.makeLoft([c, C], True))
                 else:
                     fp.Shape = sol
-                fp.Ports = [
-                    FreeCAD.Vector(),
-                    FreeCAD.Vector((fp.OD - fp.OD2) / 2, 0, float(fp.Height)),
-                ]
-            fp.PortDirections = [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)] #in either case, ports face +Z and -Z
+            fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(Reduct, self).execute(fp)  # perform common operations
 
 class Cap(pypeType):
@@ -1420,11 +1517,14 @@ class Cap(pypeType):
             QT_TRANSLATE_NOOP("App::Property", "Section dim."),
         ).Profile = str(obj.OD) + "x" + str(obj.thk)
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        return [FreeCAD.Vector()], [FreeCAD.Vector(0, 0, -1)]
+
     def execute(self, fp):
         if fp.thk > fp.OD / 2:
             fp.thk = fp.OD / 2.1
@@ -1446,8 +1546,7 @@ class Cap(pypeType):
         )
         cap = cut.makeThickness([f for f in cut.Faces if type(f.Surface) == Part.Plane], -s, 1.0e-3)
         fp.Shape = cap
-        fp.Ports = [FreeCAD.Vector()]
-        fp.PortDirections = [FreeCAD.Vector(0, 0, -1)]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(Cap, self).execute(fp)  # perform common operations
 
 class PypeLine2(pypeType):
@@ -1919,24 +2018,55 @@ class Valve(pypeType):
                 QT_TRANSLATE_NOOP("App::Property", "Inside diameter"),
             ).ID = ID
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
-    def execute(self, fp):
-        H = float(fp.Height)
+    def _connType(self, fp):
+        "returns 'flanged', 'sw_th' or 'legacy' according the Conn property"
         conn = getattr(fp, "Conn", None)
         # Check for flanged pressure-class connection.
         # The tuple is inlined here rather than referenced via self.FLANGE_CONNS
         # to ensure correct dispatch when the proxy is reconstructed on reload.
         _flanged = ("150lb", "300lb", "600lb", "900lb", "1500lb", "2500lb")
         if conn is not None and conn.strip() in _flanged:
-            self._execute_flanged(fp, H)
+            return "flanged"
         elif conn is not None:
+            return "sw_th"
+        return "legacy"
+
+    def computePorts(self, fp):
+        H = float(fp.Height)
+        conn = self._connType(fp)
+        if conn == "flanged":
+            # ports at flange faces
+            return (
+                [FreeCAD.Vector(0, 0,  H / 2.0), FreeCAD.Vector(0, 0, -H / 2.0)],
+                [FreeCAD.Vector(0, 0,  1), FreeCAD.Vector(0, 0, -1)],
+            )
+        elif conn == "sw_th":
+            # ports at the bottom of the sockets / end of the threads
+            E = float(fp.E)
+            return (
+                [FreeCAD.Vector(0, 0,  H / 2 - E), FreeCAD.Vector(0, 0, -H / 2 + E)],
+                [FreeCAD.Vector(0, 0,  1), FreeCAD.Vector(0, 0, -1)],
+            )
+        return (
+            [FreeCAD.Vector(0, 0, -H / 2), FreeCAD.Vector(0, 0,  H / 2)],
+            [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0,  1)],
+        )
+
+    def execute(self, fp):
+        H = float(fp.Height)
+        conn = self._connType(fp)
+        if conn == "flanged":
+            self._execute_flanged(fp, H)
+        elif conn == "sw_th":
             self._execute_sw_th(fp, H)
         else:
             self._execute_legacy(fp, H)
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(Valve, self).execute(fp)
 
     def _execute_flanged(self, fp, H):
@@ -2208,16 +2338,6 @@ class Valve(pypeType):
             valve = valve.removeSplitter()
             fp.Shape = valve
 
-        # ── ports at flange faces ─────────────────────────────────────────
-        fp.Ports = [
-            FreeCAD.Vector(0, 0,  H / 2.0),
-            FreeCAD.Vector(0, 0, -H / 2.0),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0,  1),
-            FreeCAD.Vector(0, 0, -1),
-        ]
-
     def _execute_sw_th(self, fp, H):
         import math
 
@@ -2336,16 +2456,6 @@ class Valve(pypeType):
         valve = valve.removeSplitter()
         fp.Shape = valve
 
-        # ── ports ──────────────────────────────────────────────────────────────
-        fp.Ports = [
-            FreeCAD.Vector(0, 0,  H / 2 - E),
-            FreeCAD.Vector(0, 0, -H / 2 + E),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0,  1),
-            FreeCAD.Vector(0, 0, -1),
-        ]
-
     def _execute_legacy(self, fp, H):
         c = Part.makeCone(fp.ODBody / 2, fp.ODBody / 5, H / 2,
                           FreeCAD.Vector(0, 0, -H / 2))
@@ -2354,14 +2464,6 @@ class Valve(pypeType):
             r = min(H * 0.45, float(fp.ODBody) / 2)
             v = v.fuse(Part.makeSphere(r, FreeCAD.Vector(0, 0, 0)))
         fp.Shape = v
-        fp.Ports = [
-            FreeCAD.Vector(0, 0, -H / 2),
-            FreeCAD.Vector(0, 0,  H / 2),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0, -1),
-            FreeCAD.Vector(0, 0,  1),
-        ]
 
 class PypeBranch2(pypeType):  # use AttachExtensionPython
     """Class for object PType="PypeBranch2"
@@ -2588,7 +2690,7 @@ class Gasket(pypeType):
             QT_TRANSLATE_NOOP("App::Property", "Inner and centering ring thickness"),
         ).Rthk = Rthk
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         # Sealing element must be thicker than or equal to the rings
@@ -2599,6 +2701,13 @@ class Gasket(pypeType):
             )
         return None
 
+    def computePorts(self, fp):
+        # Ports at each face of the sealing element, pointing outward
+        return (
+            [FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(0, 0, float(fp.SEthk))],
+            [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0, 1)],
+        )
+
     def execute(self, fp):
         # Validate dimensions before attempting geometry construction
         if not (fp.IRID > 0 and fp.SEID > fp.IRID and fp.SEOD > fp.SEID
@@ -2641,16 +2750,7 @@ class Gasket(pypeType):
         gasket = inner_ring.fuse(sealing_element).fuse(centering_ring)
         gasket = gasket.removeSplitter()
         fp.Shape = gasket
-
-        # Ports at each face of the sealing element, pointing outward
-        fp.Ports = [
-            FreeCAD.Vector(0, 0, 0),
-            FreeCAD.Vector(0, 0, float(fp.SEthk)),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0, -1),
-            FreeCAD.Vector(0, 0, 1),
-        ]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
 
         super(Gasket, self).execute(fp)  # perform common operations
 
@@ -2737,11 +2837,21 @@ class Bolts_Nuts(pypeType):
                               "Sealing element thickness of the matching gasket"),
         ).SEthk = SEthk
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        # Ports at the gasket faces (same convention as Gasket class)
+        return (
+            [
+                FreeCAD.Vector(0, 0, -float(fp.SEthk) / 2),
+                FreeCAD.Vector(0, 0,  float(fp.SEthk) / 2),
+            ],
+            [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0,  1)],
+        )
+
     def execute(self, fp):
         from math import cos, sin, pi
 
@@ -2845,16 +2955,7 @@ class Bolts_Nuts(pypeType):
                 shape = shape.fuse(s)
         #shape = shape.removeSplitter()
         fp.Shape = shape
-
-        # Ports at the gasket faces (same convention as Gasket class)
-        fp.Ports = [
-            FreeCAD.Vector(0, 0, -float(fp.SEthk) / 2),
-            FreeCAD.Vector(0, 0,  float(fp.SEthk) / 2),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0, -1),
-            FreeCAD.Vector(0, 0,  1),
-        ]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
 
         super(Bolts_Nuts, self).execute(fp)  # perform common operations
 
@@ -2972,7 +3073,7 @@ class Outlet(pypeType):
             QT_TRANSLATE_NOOP("App::Property", "Section dimensions"),
         ).Profile = str(OD) + "x" + str(thk)
 
-        self.execute(obj)
+        self.initShape(obj)
 
     # ------------------------------------------------------------------
     def onChanged(self, fp, prop):
@@ -2982,6 +3083,24 @@ class Outlet(pypeType):
     def onChanged(self, fp, prop):
         return None
 
+    # ------------------------------------------------------------------
+    def computePorts(self, fp):
+        import math
+
+        A       = float(fp.A)
+        E       = float(fp.E)
+        endType = str(fp.EndType)
+        # The single port is at the open pipe-connection end (top).
+        # Direction faces outward (away from the body).
+        if endType in ("SocketWeld", "SW"):
+            h = min(E, A - 0.5) if E > 0 else A * 0.3
+        else:
+            h = A
+        if int(fp.Angle) == 45:
+            s2 = math.sqrt(2.0) / 2.0
+            return [FreeCAD.Vector(0, -h * s2, h * s2)], [FreeCAD.Vector(0, -s2, s2)]
+        return [FreeCAD.Vector(0, 0, h)], [FreeCAD.Vector(0, 0, 1)]
+
     # ------------------------------------------------------------------
     def execute(self, fp):
         import math
@@ -3134,27 +3253,7 @@ class Outlet(pypeType):
         fp.Shape = body
 
         # ── 4. Set port ──────────────────────────────────────────────────────
-        #
-        # The single port is at the open pipe-connection end (top).
-        # Direction faces outward (away from the body).
-        if angle == 45:
-            s2 = math.sqrt(2.0) / 2.0
-            if endType in ("SocketWeld", "SW"):
-                E_clamped = min(E, A - 0.5) if E > 0 else A * 0.3
-                port_pos = FreeCAD.Vector(0, -E_clamped * s2, E_clamped * s2)
-            else:
-                port_pos = FreeCAD.Vector(0, -A * s2, A * s2)
-            port_dir = FreeCAD.Vector(0, -s2, s2)
-        else:
-            if endType in ("SocketWeld", "SW"):
-                E_clamped = min(E, A - 0.5) if E > 0 else A * 0.3
-                port_pos = FreeCAD.Vector(0, 0, E_clamped)
-            else:
-                port_pos = FreeCAD.Vector(0, 0, A)
-            port_dir = FreeCAD.Vector(0, 0, 1)
-
-        fp.Ports          = [port_pos]
-        fp.PortDirections = [port_dir]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
 
         super(Outlet, self).execute(fp)   # positionBySupport()
 
@@ -3209,11 +3308,14 @@ class SocketCap(pypeType):
             "SocketCap",
             QT_TRANSLATE_NOOP("App::Property", "Connection type (SW=Socket Weld, TH=Threaded)"),
         ).Conn = Conn
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        return [FreeCAD.Vector(0, 0, 0)], [FreeCAD.Vector(0, 0, -1)]
+
     def execute(self, fp):
 
         base = Part.makeCylinder(float(fp.C)+float(fp.OD)/2, fp.A, FreeCAD.Vector(0, 0, -float(fp.E)), FreeCAD.Vector(0, 0,1)) 
@@ -3224,8 +3326,7 @@ class SocketCap(pypeType):
 
         fp.Shape = base   
 
-        fp.Ports = [ FreeCAD.Vector(0,0, 0)]
-        fp.PortDirections = [FreeCAD.Vector(0,0,-1)]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(SocketCap, self).execute(fp)  # perform common operations
 
 class SocketCoupling(pypeType):
@@ -3323,11 +3424,26 @@ class SocketCoupling(pypeType):
                               "Connection type (SW=Socket Weld, TH=Threaded)"),
         ).Conn = Conn
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        A = float(fp.A)
+        E = float(fp.E)
+        # Ports sit at the bottom of each socket pocket (where the pipe end rests)
+        return (
+            [
+                FreeCAD.Vector(0, 0, -A + E),   # port 0: inside socket 0
+                FreeCAD.Vector(0, 0,  A - E),   # port 1: inside socket 1
+            ],
+            [
+                FreeCAD.Vector(0, 0, -1),        # port 0 outward: -Z
+                FreeCAD.Vector(0, 0,  1),        # port 1 outward: +Z
+            ],
+        )
+
     def execute(self, fp):
         OD  = float(fp.OD)
         OD2 = float(fp.OD2)
@@ -3366,16 +3482,7 @@ class SocketCoupling(pypeType):
 
         fp.Shape = base
 
-        # ── ports ─────────────────────────────────────────────────────────────
-        # Ports sit at the bottom of each socket pocket (where the pipe end rests)
-        fp.Ports = [
-            FreeCAD.Vector(0, 0, -A + E),   # port 0: inside socket 0
-            FreeCAD.Vector(0, 0,  A - E),   # port 1: inside socket 1
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0, -1),        # port 0 outward: -Z
-            FreeCAD.Vector(0, 0,  1),        # port 1 outward: +Z
-        ]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(SocketCoupling, self).execute(fp)  # perform common operations
 
 
@@ -3455,11 +3562,20 @@ class SocketUnion(pypeType):
                               "Connection type (SW=Socket Weld, TH=Threaded)"),
         ).Conn = Conn
 
-        self.execute(obj)
+        self.initShape(obj)
 
     def onChanged(self, fp, prop):
         return None
 
+    def computePorts(self, fp):
+        # same as SocketCoupling: at the bottom of each socket pocket
+        A = float(fp.A)
+        E = float(fp.E)
+        return (
+            [FreeCAD.Vector(0, 0, -A + E), FreeCAD.Vector(0, 0,  A - E)],
+            [FreeCAD.Vector(0, 0, -1), FreeCAD.Vector(0, 0,  1)],
+        )
+
     def execute(self, fp):
         OD  = float(fp.OD)
         A   = float(fp.A)
@@ -3518,13 +3634,5 @@ class SocketUnion(pypeType):
 
         fp.Shape = base
 
-        # ── ports ─────────────────────────────────────────────────────────────
-        fp.Ports = [
-            FreeCAD.Vector(0, 0, -A + E),
-            FreeCAD.Vector(0, 0,  A - E),
-        ]
-        fp.PortDirections = [
-            FreeCAD.Vector(0, 0, -1),
-            FreeCAD.Vector(0, 0,  1),
-        ]
+        fp.Ports, fp.PortDirections = self.computePorts(fp)
         super(SocketUnion, self).execute(fp)  # perform common operations
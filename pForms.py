@@ -17,6 +17,7 @@ from PySide.QtGui import *
 import dodoDialogs
 import fCmd
 import pCmd
+import pBOM
 from PySide.QtWidgets import QCheckBox
 
 pq = FreeCAD.Units.parseQuantity
@@ -195,58 +196,21 @@ class insertPipeForm(dodoDialogs.protoPypeForm):
         pass  # Base changeRating handles blockSignals, fillSizes, and PSize preservation.
 
     def changeSize(self, s):
-        """Generate a preview thumbnail for the selected pipe size.
+        """Show the preview thumbnail of the selected pipe size.
 
-        The base changeSize calls self.insert() with the user's live selection,
-        which would create a pipe at the selected position and corrupt state.
-        Instead, a temporary pipe is created at origin with a fixed 200 mm length
-        via pCmd.makePipe(), capturePreviewProfile() saves the image, then the
-        pipe is deleted.  The selection is cleared for the duration so that
-        makePipe() places the object at the origin rather than at a port.
+        The base changeSize would render self.insert(), i.e. a pipe as long as
+        the selected edge or the length in the form.  Instead the preview is
+        a pipe with a fixed 200 mm length made by pCmd.makePipe().
 
         Image filename always uses the raw DN PSize (never the NPS display label)
-        for compatibility with existing cached images.  Any cached file whose
-        name starts with <rating><DN_psize> is accepted as a hit so that legacy
-        files with dimension suffixes still match.
+        for compatibility with existing cached images.
         """
-        from os.path import exists, join
-        from os import makedirs, listdir
-        from PySide.QtGui import QPixmap
-
         idx = self.sizeList.currentIndex()
         if idx < 0 or idx >= len(self.pipeDictList):
             return
-
-        # Always use the raw DN PSize for the filename, never the display label
-        dn_psize = self.pipeDictList[idx].get("PSize", "")
-        rateselected = self.ratingList.currentText()
-        preview_dir = join(self.previewSectionsPath, self.PType)
-        makedirs(preview_dir, exist_ok=True)
-
-        # Canonical filename for new images
-        canonical_path = join(preview_dir, rateselected + dn_psize + ".png")
-
-        # Cache check: accept any file whose name starts with rate+dn_psize
-        # (covers legacy files with dimensions appended to the name)
-        prefix = rateselected + dn_psize
-        cached_path = None
-        if exists(canonical_path):
-            cached_path = canonical_path
-        else:
-            try:
-                for fname in listdir(preview_dir):
-                    if fname.startswith(prefix) and fname.endswith(".png"):
-                        cached_path = join(preview_dir, fname)
-                        break
-            except OSError:
-                pass
-
-        if cached_path:
-            self.labImage.setPixmap(QPixmap(cached_path).scaledToWidth(180))
-            return
-
-        # Image not yet cached -- create a temporary pipe at origin
         size_selected = self.pipeDictList[idx]
+        dn_psize = size_selected.get("PSize", "")
+        rateselected = self.ratingList.currentText()
         try:
             propList = [
                 dn_psize,
@@ -256,26 +220,10 @@ class insertPipeForm(dodoDialogs.protoPypeForm):
             ]
         except (KeyError, Exception):
             return
-        try:
-            saved_sel = FreeCADGui.Selection.getSelectionEx()
-            FreeCADGui.Selection.clearSelection()
-            preview_pipe = pCmd.makePipe(rateselected, propList)
-            FreeCAD.activeDocument().recompute()
-            # Reset to origin in case positionBySupport() moved it
-            preview_pipe.Placement = FreeCAD.Placement()
-            self.fullimagepath = canonical_path
-            self.capturePreviewProfile()
-            FreeCAD.activeDocument().removeObject(preview_pipe.Name)
-            FreeCAD.activeDocument().recompute()
-            # Restore the user's selection
-            for sx in saved_sel:
-                for sub in sx.SubElementNames:
-                    FreeCADGui.Selection.addSelection(sx.Object, sub)
-                if not sx.SubElementNames:
-                    FreeCADGui.Selection.addSelection(sx.Object)
-        except Exception:
-            pass
-
+        self.showPreview(
+            (self.PType, rateselected, dn_psize),
+            lambda: pCmd.makePipe(rateselected, propList),
+        )
 
     def reverse(self):  # revert orientation of selected or last inserted pipe
         selPipes = [
@@ -2267,7 +2215,10 @@ class insertPypeLineForm(dodoDialogs.protoPypeForm):
             return
         size_selected = self.pipeDictList[_idx]
         rating = self.ratingList.currentText()
-        FreeCAD.activeDocument().openTransaction(translate("Transaction", "Insert pipe line"))
+        with pCmd.batch(translate("Transaction", "Insert pipe line")):
+            self._insert(size_selected)
+
+    def _insert(self, size_selected):
         if self.existingObjs.currentText() == translate("insertPypeLineForm", "<new>"):
             plLabel = self.edit1.text()
             if not plLabel:
@@ -2292,9 +2243,6 @@ class insertPypeLineForm(dodoDialogs.protoPypeForm):
                 pl=plname,
                 color=plcolor,
             )
-        FreeCAD.activeDocument().commitTransaction()
-        FreeCAD.ActiveDocument.recompute()
-        FreeCAD.ActiveDocument.recompute()
 
     def getBase(self):
         if self.existingObjs.currentText() != translate("insertPypeLineForm", "<new>"):
@@ -2346,7 +2294,11 @@ class insertPypeLineForm(dodoDialogs.protoPypeForm):
                     FreeCAD.__activePypeLine__ + "_pieces"
                 )[0]
                 fields = ["Label", "PType", "PSize", "Volume", "Height"]
-                rows = list()
+                bom = pBOM.getCache()
+                # the rows are kept between calls: only the changed ones are read again
+                if getattr(self, "takeOff", None) is None or self.takeOff.cache is not bom:
+                    self.takeOff = pBOM.TakeOff(bom)
+                names = list()
                 for o in group.OutList:
                     if hasattr(o, "PType"):
                         if o.PType in [
@@ -2358,23 +2310,16 @@ class insertPypeLineForm(dodoDialogs.protoPypeForm):
                             "Cap",
                             "Tee",
                         ]:
-                            data = [o.Label, o.PType, o.PSize, o.Shape.Volume, "-"]
-                            if o.PType == "Pipe":
-                                data[4] = o.Height
-                            rows.append(dict(zip(fields, data)))
+                            names.append(o.Name)
                         elif o.PType in ["PypeBranch"]:
-                            for name in o.Tubes + o.Curves:
-                                pype = FreeCAD.ActiveDocument.getObject(name)
-                                data = [
-                                    pype.Label,
-                                    pype.PType,
-                                    pype.PSize,
-                                    pype.Shape.Volume,
-                                    "-",
-                                ]
-                                if pype.PType == "Pipe":
-                                    data[4] = pype.Height
-                                rows.append(dict(zip(fields, data)))
+                            names.extend(o.Tubes + o.Curves)
+                rows = list()
+                for r in self.takeOff.refresh(names):
+                    data = [r["Label"], r["PType"], r["PSize"], r["Volume"], "-"]
+                    if r["PType"] == "Pipe":
+                        # as the Height property, e.g. "1000.0 mm"
+                        data[4] = FreeCAD.Units.Quantity(r["Height"], FreeCAD.Units.Length)
+                    rows.append(dict(zip(fields, data)))
                 plist = open(abspath(f), "w")
                 w = csv.DictWriter(plist, fields, restval="-", delimiter=";")
                 w.writeheader()
@@ -0,0 +1,410 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Builds pipe routes from line lists exported by process design tools.
+
+Two formats are accepted.
+
+JSON:
+  {
+    "nodes": {"N1": [x, y, z], ...},
+    "segments": [
+      {"Line": "L100", "From": "N1", "To": "N2",
+       "PSize": "DN50", "PRating": "SCH-STD", "BendRadius": 45}, ...],
+    "fittings": {"N9": "Cap", ...}
+  }
+
+CSV (";" or "," delimited), one segment per row:
+  Line;From;To;X1;Y1;Z1;X2;Y2;Z2;PSize;PRating;BendRadius;Fitting
+  From/To may be empty: nodes are then matched by rounded coordinates.
+  Fitting, if given, applies to the To node (e.g. "Cap").
+
+Fittings are inferred from the topology of each node:
+  2 segments, not aligned      -> Elbow
+  2 segments, aligned, DN vary -> Reduct (concentric)
+  3 segments, two aligned      -> Tee
+  1 segment + fitting "Cap"    -> Cap
+Pipes are then trimmed by the length taken by the fittings.
+All objects are created in one transaction and recomputed once.
+"""
+
+__title__ = "pypeTools line list importer"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+
+import csv
+import json
+from math import degrees, radians, tan
+
+import FreeCAD
+
+import pCmd
+import pFeatures
+
+translate = FreeCAD.Qt.translate
+
+TOL = 1e-6  # tolerance for alignment of directions
+DIGITS = 3  # rounding of coordinates used to match nodes
+
+
+class LineListError(Exception):
+    pass
+
+
+############### READERS ###############
+
+
+def _float(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def readJSON(fileName):
+    """
+    readJSON(fileName)
+    Returns (nodes, segments, fittings) read from a JSON line list.
+    """
+    with open(fileName, "r") as f:
+        data = json.load(f)
+    nodes = dict()
+    for name, xyz in data.get("nodes", {}).items():
+        nodes[str(name)] = FreeCAD.Vector(*[float(c) for c in xyz])
+    segments = list()
+    for s in data.get("segments", []):
+        seg = dict(s)
+        seg["From"] = str(seg["From"])
+        seg["To"] = str(seg["To"])
+        segments.append(seg)
+    fittings = dict((str(k), v) for k, v in data.get("fittings", {}).items())
+    return nodes, segments, fittings
+
+
+def readCSV(fileName):
+    """
+    readCSV(fileName)
+    Returns (nodes, segments, fittings) read from a CSV line list.
+    """
+    nodes = dict()
+    segments = list()
+    fittings = dict()
+    with open(fileName, "r", newline="") as f:
+        sample = f.readline()
+        f.seek(0)
+        delimiter = ";" if sample.count(";") >= sample.count(",") else ","
+        reader = csv.DictReader(f, delimiter=delimiter)
+        for i, row in enumerate(reader):
+            ends = list()
+            for n in ("1", "2"):
+                try:
+                    v = FreeCAD.Vector(
+                        float(row["X" + n]), float(row["Y" + n]), float(row["Z" + n])
+                    )
+                except (KeyError, TypeError, ValueError):
+                    raise LineListError("Row %i: invalid coordinates" % (i + 2))
+                name = row.get("From" if n == "1" else "To")
+                if not name:
+                    name = "%.*f,%.*f,%.*f" % (DIGITS, v.x, DIGITS, v.y, DIGITS, v.z)
+                nodes.setdefault(name, v)
+                ends.append(name)
+            seg = dict(row)
+            seg["From"], seg["To"] = ends
+            segments.append(seg)
+            if row.get("Fitting"):
+                fittings[ends[1]] = row["Fitting"]
+    return nodes, segments, fittings
+
+
+def readLineList(fileName):
+    "readLineList(fileName): reads a .json or .csv line list"
+    if fileName.lower().endswith(".json"):
+        return readJSON(fileName)
+    return readCSV(fileName)
+
+
+############### CATALOG ###############
+
+
+class _Catalog(object):
+    """
+    Caches the tables in ./tablez read during one import
+    so that each file is parsed once.
+    """
+
+    def __init__(self):
+        self.tables = dict()
+        self.pipes = dict()  # (PSize, rating) -> (OD, thk)
+
+    def table(self, fileName):
+        if fileName not in self.tables:
+            try:
+                self.tables[fileName] = pCmd.readTable(fileName)
+            except IOError:
+                self.tables[fileName] = []
+        return self.tables[fileName]
+
+    def pipe(self, PSize, rating):
+        if (PSize, rating) not in self.pipes:
+            for row in self.table("Pipe_" + rating + ".csv"):
+                self.pipes[(row["PSize"], rating)] = float(row["OD"]), float(row["thk"])
+        try:
+            return self.pipes[(PSize, rating)]
+        except KeyError:
+            raise LineListError("%s not found in Pipe_%s.csv" % (PSize, rating))
+
+    def tee(self, PSize, PSize2, rating):
+        rows = self.table("Tee_" + rating + ".csv")
+        equal = None
+        for row in rows:
+            if row["PSize"] == PSize:
+                if row["PSizeBranch"] == PSize2:
+                    return row
+                if row["PSizeBranch"] == PSize:
+                    equal = row
+        return equal
+
+    def reduct(self, PSize, PSize2, rating):
+        "returns [OD, OD2, thk, thk2, H] or None"
+        for row in self.table("Reduct_" + rating + ".csv"):
+            if row["PSize"] != PSize:
+                continue
+            sizes = row["PSize2"].split(">")
+            if PSize2 in sizes:
+                k = sizes.index(PSize2)
+                return [
+                    float(row["OD"]),
+                    float(row["OD2"].split(">")[k]),
+                    float(row["thk"]),
+                    float(row["thk2"].split(">")[k]),
+                    float(row["H"]),
+                ]
+        return None
+
+
+############### BUILDER ###############
+
+
+def _size(seg):
+    "key used to sort nominal sizes, i.e. DN50 -> 50"
+    digits = "".join(c for c in seg["PSize"] if c.isdigit() or c == ".")
+    return _float(digits, 0.0)
+
+
+class RouteBuilder(object):
+    """
+    RouteBuilder(nodes, segments, fittings=None, rating="SCH-STD")
+    Builds Pipe, Elbow, Tee, Reduct and Cap objects over the segments.
+      nodes: {name: FreeCAD.Vector}
+      segments: list of dict with keys From, To, PSize and optionally
+        Line, PRating, BendRadius
+      fittings: {node name: fitting type}
+      rating: the default PRating
+    """
+
+    def __init__(self, nodes, segments, fittings=None, rating="SCH-STD"):
+        self.nodes = nodes
+        self.segments = segments
+        self.fittings = fittings or dict()
+        self.rating = rating
+        self.catalog = _Catalog()
+        self.trims = [[0.0, 0.0] for s in segments]  # length taken at From, To
+        self.groups = dict()  # Line -> list of objects
+        self.errors = list()
+
+    def _props(self, seg):
+        rating = seg.get("PRating") or self.rating
+        OD, thk = self.catalog.pipe(seg["PSize"], rating)
+        BR = _float(seg.get("BendRadius")) or 0.75 * OD
+        return rating, OD, thk, BR
+
+    def _out(self, i, node):
+        "unit direction of segment i leaving node"
+        seg = self.segments[i]
+        other = seg["To"] if seg["From"] == node else seg["From"]
+        v = self.nodes[other] - self.nodes[node]
+        if v.Length < TOL:
+            raise LineListError("Segment %i has zero length" % i)
+        return v.normalize()
+
+    def _trim(self, i, node, length):
+        seg = self.segments[i]
+        self.trims[i][0 if seg["From"] == node else 1] = length
+
+    def _add(self, seg, obj):
+        self.groups.setdefault(seg.get("Line") or "", []).append(obj)
+
+    def lineProps(self, line):
+        """
+        lineProps(line)
+        Returns (PRating, PSize, OD, thk, BR) of the Line, read from its
+        first Pipe, or first object, actually built: no catalog lookup.
+        """
+        objs = self.groups[line]
+        first = next((o for o in objs if o.PType == "Pipe"), objs[0])
+        elbow = next((o for o in objs if o.PType == "Elbow"), None)
+        OD = float(first.OD)
+        BR = float(elbow.BendRadius) if elbow else 0.75 * OD
+        return first.PRating, first.PSize, OD, float(first.thk), BR
+
+    def build(self):
+        """
+        build()
+        Creates the objects and returns the dictionary {Line: [objects]}.
+        """
+        adjacency = dict()
+        for i, seg in enumerate(self.segments):
+            for node in (seg["From"], seg["To"]):
+                if node not in self.nodes:
+                    raise LineListError("Node %s is not defined" % node)
+                adjacency.setdefault(node, []).append(i)
+        for node, incident in adjacency.items():
+            try:
+                self.buildNode(node, incident)
+            except LineListError as e:
+                self.errors.append(str(e))
+        for i, seg in enumerate(self.segments):
+            try:
+                self.buildPipe(i, seg)
+            except LineListError as e:
+                self.errors.append(str(e))
+        return self.groups
+
+    def buildNode(self, node, incident):
+        P = self.nodes[node]
+        dirs = [self._out(i, node) for i in incident]
+        if len(incident) == 1:
+            fitting = self.fittings.get(node)
+            if fitting and fitting.lower() == "cap":
+                seg = self.segments[incident[0]]
+                rating, OD, thk, BR = self._props(seg)
+                cap = pCmd.makeCap([seg["PSize"], OD, thk], P, dirs[0].negative(), rating)
+                self._add(seg, cap)
+            elif fitting:
+                self.errors.append("Fitting %s at node %s not supported" % (fitting, node))
+        elif len(incident) == 2:
+            i1, i2 = incident
+            s1, s2 = self.segments[i1], self.segments[i2]
+            if abs(dirs[0].dot(dirs[1]) + 1) < TOL:  # aligned
+                if s1["PSize"] != s2["PSize"]:
+                    self.buildReduct(node, P, i1, i2, dirs)
+            elif abs(dirs[0].dot(dirs[1]) - 1) < TOL:
+                raise LineListError("Segments %i and %i overlap at %s" % (i1, i2, node))
+            else:
+                rating, OD, thk, BR = self._props(s1)
+                v1 = dirs[0].negative()  # entering the node
+                v2 = dirs[1]  # leaving the node
+                ang = degrees(v1.getAngle(v2))
+                elb = pCmd.makeElbow([s1["PSize"], OD, thk, ang, BR], rating=rating)
+                pCmd.placeoTherElbow(elb, v1, v2, P)
+                t = BR * tan(radians(ang) / 2)
+                self._trim(i1, node, t)
+                self._trim(i2, node, t)
+                self._add(s1, elb)
+        elif len(incident) == 3:
+            self.buildTee(node, P, incident, dirs)
+        else:
+            raise LineListError("Node %s joins %i segments" % (node, len(incident)))
+
+    def buildReduct(self, node, P, i1, i2, dirs):
+        s1, s2 = self.segments[i1], self.segments[i2]
+        if _size(s1) < _size(s2):
+            i1, i2 = i2, i1
+            s1, s2 = s2, s1
+            dirs = [dirs[1], dirs[0]]
+        rating = s1.get("PRating") or self.rating
+        dims = self.catalog.reduct(s1["PSize"], s2["PSize"], rating)
+        if not dims:
+            OD, thk = self.catalog.pipe(s1["PSize"], rating)
+            OD2, thk2 = self.catalog.pipe(s2["PSize"], s2.get("PRating") or rating)
+            dims = [OD, OD2, thk, thk2, 3 * (OD - OD2)]
+        propList = [s1["PSize"]] + dims + [s2["PSize"]]
+        r = pCmd.makeReduct(propList, P, dirs[1], rating=rating)
+        self._trim(i2, node, dims[4])
+        self._add(s1, r)
+
+    def buildTee(self, node, P, incident, dirs):
+        run = None
+        for a, b, c in ((0, 1, 2), (0, 2, 1), (1, 2, 0)):
+            if abs(dirs[a].dot(dirs[b]) + 1) < TOL:
+                run = a, b, c
+                break
+        if not run:
+            raise LineListError("No aligned run at node %s" % node)
+        a, b, c = run
+        sRun, sBranch = self.segments[incident[a]], self.segments[incident[c]]
+        rating = sRun.get("PRating") or self.rating
+        row = self.catalog.tee(sRun["PSize"], sBranch["PSize"], rating)
+        if not row:
+            raise LineListError(
+                "Tee %s x %s not found in Tee_%s.csv" % (sRun["PSize"], sBranch["PSize"], rating)
+            )
+        propList = [
+            row["PSize"],
+            float(row["OD"]),
+            float(row["OD2"]),
+            float(row["thk"]),
+            float(row["thk2"]),
+            float(row["C"]),
+            float(row["M"]),
+            row["PSizeBranch"],
+        ]
+        tee = pCmd.makeTee(propList, rating=rating)
+        r, br = dirs[a], dirs[c]
+        tee.Placement = FreeCAD.Placement(P, FreeCAD.Rotation(br.cross(r), br, r, "ZYX"))
+        self._trim(incident[a], node, propList[5])
+        self._trim(incident[b], node, propList[5])
+        self._trim(incident[c], node, propList[6])
+        self._add(sRun, tee)
+
+    def buildPipe(self, i, seg):
+        rating, OD, thk, BR = self._props(seg)
+        start, end = self.nodes[seg["From"]], self.nodes[seg["To"]]
+        ax = end - start
+        L = ax.Length - sum(self.trims[i])
+        if L <= TOL:
+            raise LineListError("Segment %i is shorter than its fittings" % i)
+        ax.normalize()
+        pos = start + ax * self.trims[i][0]
+        pipe = pCmd.makePipe(rating, [seg["PSize"], OD, thk, L], pos, ax)
+        self._add(seg, pipe)
+
+
+############### ENTRY POINT ###############
+
+
+def importLineList(fileName, rating="SCH-STD", doc=None):
+    """
+    importLineList(fileName, rating="SCH-STD", doc=None)
+    Builds the route described in fileName (.json or .csv) inside
+    a lazy pCmd.batch(), i.e. one transaction and one recompute that
+    builds all the shapes. Objects of each Line are collected in a PypeLine
+    named after it. Returns the RouteBuilder (see .groups and .errors).
+      rating: default PRating for segments that don't specify one
+      doc: the document; default the ActiveDocument
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    if doc is None:
+        doc = FreeCAD.newDocument()
+    if doc is not FreeCAD.ActiveDocument:
+        FreeCAD.setActiveDocument(doc.Name)
+    nodes, segments, fittings = readLineList(fileName)
+    with pCmd.batch(translate("Transaction", "Import line list"), doc, lazy=True):
+        builder = RouteBuilder(nodes, segments, fittings, rating)
+        groups = builder.build()
+        for line, objs in groups.items():
+            if not line:
+                continue
+            PRating, PSize, OD, thk, BR = builder.lineProps(line)
+            pl = doc.addObject("Part::FeaturePython", line)
+            pFeatures.PypeLine2(pl, PRating, PSize, OD, thk, BR, line)
+            if pCmd.viewProviders and FreeCAD.GuiUp:
+                pFeatures.ViewProviderPypeLine(pl.ViewObject)
+            pl.getParentGroup().addObjects(objs)  # the group created by PypeLine2
+    for e in builder.errors:
+        FreeCAD.Console.PrintError(e + "\n")
+    FreeCAD.Console.PrintMessage("Imported %i segments from %s\n" % (len(segments), fileName))
+    return builder
@@ -0,0 +1,326 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Thumbnails of the insert dialogs.
+
+The images are stored in <previewSectionsPath>/<PType>/<rating><size stem>.png
+and listed in <previewSectionsPath>/index.json, a dictionary
+"PType|rating|size stem" -> path relative to previewSectionsPath, so that
+looking for one image does not need to list the directory.
+Missing images are drawn by renderOffscreen() in a hidden scratch document:
+the user's document, selection and 3D view are not touched. The insert
+forms queue these renderings (see dodoDialogs.protoPypeForm.showPreview()).
+The scaled thumbnails are kept in memory by thumbnail(); buildAtlas() packs
+those of one PType in <previewSectionsPath>/<PType>/atlas.png, so that
+browsing the sizes reads one file only.
+"""
+
+__title__ = "pypeTools previews"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+import json
+from collections import OrderedDict
+from os import listdir, makedirs
+from os.path import abspath, dirname, exists, getmtime, isdir, join
+
+import FreeCAD
+
+if FreeCAD.GuiUp:
+    import FreeCADGui
+
+INDEX_FILE = "index.json"
+asynchronous = True  # False: the forms render the missing previews at once
+DELAY = 250  # ms of idle browsing before a queued preview is rendered
+ATLAS_FILE = "atlas"  # <PType>/atlas.png + <PType>/atlas.json
+ATLAS_COLUMNS = 8
+CACHE_SIZE = 64  # scaled pixmaps kept in memory
+WIDTH = 180  # width of the thumbnails in the forms
+ISOMETRIC = (0.424708, 0.17592, 0.339851, 0.820473)  # quaternion of viewIsometric()
+
+_indexes = dict()  # previewSectionsPath -> PreviewIndex
+_pixmaps = OrderedDict()  # (root, PType, rating, stem, width) -> QPixmap, LRU
+_atlases = dict()  # (root, PType) -> (QPixmap, {"rating|stem": [x, y, w, h]}) or None
+
+
+def ratingsOf(PType):
+    "the ratings available in ./tablez for PType"
+    prefix = PType + "_"
+    return [
+        f[len(prefix) : -len(".csv")]
+        for f in listdir(join(dirname(abspath(__file__)), "tablez"))
+        if f.startswith(prefix) and f.endswith(".csv")
+    ]
+
+
+class PreviewIndex(object):
+    """
+    PreviewIndex(root)
+    The index of the thumbnails saved under root.
+      root: the directory of the previews (protoPypeForm.previewSectionsPath)
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.fileName = join(root, INDEX_FILE)
+        self.entries = None
+
+    def key(self, PType, rating, stem):
+        return "|".join([PType, rating, stem])
+
+    def load(self):
+        "reads the index file or, if missing, builds it from the existing images"
+        if self.entries is not None:
+            return
+        try:
+            with open(self.fileName, "r") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = dict()
+            self.scan()
+
+    def scan(self):
+        "adds to the index the images named <rating><size stem>.png"
+        if not isdir(self.root):
+            return
+        for PType in listdir(self.root):
+            folder = join(self.root, PType)
+            if not isdir(folder):
+                continue
+            # longest rating first: "SCH-40" must not match as "SCH-4" + "0DN50"
+            ratings = sorted(ratingsOf(PType), key=len, reverse=True)
+            for fname in listdir(folder):
+                if not fname.endswith(".png"):
+                    continue
+                for rating in ratings:
+                    if fname.startswith(rating):
+                        stem = fname[len(rating) : -len(".png")]
+                        self.entries[self.key(PType, rating, stem)] = PType + "/" + fname
+                        break
+        self.save()
+
+    def save(self):
+        try:
+            makedirs(self.root, exist_ok=True)
+            with open(self.fileName, "w") as f:
+                json.dump(self.entries, f, indent=0, sort_keys=True)
+        except OSError as e:
+            FreeCAD.Console.PrintWarning("Preview index not saved: %s\n" % e)
+
+    def path(self, PType, rating, stem):
+        "the canonical path of the image, whether it exists or not"
+        return join(self.root, PType, rating + stem + ".png")
+
+    def lookup(self, PType, rating, stem):
+        "the path of the image if it's in the index, else None"
+        self.load()
+        rel = self.entries.get(self.key(PType, rating, stem))
+        if rel and exists(join(self.root, rel)):
+            return join(self.root, rel)
+        return None
+
+    def record(self, PType, rating, stem):
+        "adds the image of the canonical path() to the index"
+        self.load()
+        self.entries[self.key(PType, rating, stem)] = PType + "/" + rating + stem + ".png"
+        self.save()
+        forget(self.root, PType, rating, stem)
+
+    def items(self, PType):
+        "list of (rating, stem, path) of the images of PType"
+        self.load()
+        result = list()
+        for k, rel in sorted(self.entries.items()):
+            p, rating, stem = k.split("|")
+            if p == PType and exists(join(self.root, rel)):
+                result.append((rating, stem, join(self.root, rel)))
+        return result
+
+
+def getIndex(root):
+    """
+    getIndex(root)
+    Returns the PreviewIndex of the directory root, loaded once per session.
+    """
+    index = _indexes.get(root)
+    if index is None:
+        index = _indexes[root] = PreviewIndex(root)
+    return index
+
+
+def forget(root, PType, rating, stem):
+    "drops the cached thumbnails of an image that was rendered again"
+    for k in [k for k in _pixmaps if k[:4] == (root, PType, rating, stem)]:
+        del _pixmaps[k]
+    atlas = _atlases.get((root, PType))
+    if atlas:
+        atlas[1].pop(rating + "|" + stem, None)
+
+
+def loadAtlas(root, PType, width=WIDTH):
+    """
+    loadAtlas(root, PType, width=WIDTH)
+    Returns (pixmap, tiles) of the atlas of PType, read once per session,
+    or None if it's missing or made for another width.
+    """
+    key = (root, PType)
+    if key not in _atlases:
+        from PySide.QtGui import QPixmap
+
+        atlas = None
+        base = join(root, PType, ATLAS_FILE)
+        try:
+            with open(base + ".json", "r") as f:
+                layout = json.load(f)
+            if layout["width"] == width:
+                pixmap = QPixmap(base + ".png")
+                if not pixmap.isNull():
+                    atlas = (pixmap, layout["tiles"])
+        except (OSError, ValueError, KeyError):
+            pass
+        _atlases[key] = atlas
+    return _atlases[key]
+
+
+def buildAtlas(root, PType, width=WIDTH):
+    """
+    buildAtlas(root, PType, width=WIDTH)
+    Packs the indexed images of PType, scaled to width, in a grid of
+    ATLAS_COLUMNS columns saved in <root>/<PType>/atlas.png; the position
+    of each tile is saved in atlas.json.
+    Returns the number of tiles.
+    """
+    from PySide.QtCore import Qt
+    from PySide.QtGui import QPainter, QPixmap
+
+    images = list()
+    for rating, stem, fileName in getIndex(root).items(PType):
+        pixmap = QPixmap(fileName)
+        if not pixmap.isNull():
+            images.append(
+                (rating + "|" + stem, pixmap.scaledToWidth(width, Qt.SmoothTransformation))
+            )
+    if not images:
+        return 0
+    rowHeight = max(p.height() for k, p in images)
+    rows = (len(images) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+    atlas = QPixmap(width * min(len(images), ATLAS_COLUMNS), rowHeight * rows)
+    atlas.fill(Qt.transparent)
+    tiles = dict()
+    painter = QPainter(atlas)
+    for i, (k, p) in enumerate(images):
+        x, y = (i % ATLAS_COLUMNS) * width, (i // ATLAS_COLUMNS) * rowHeight
+        painter.drawPixmap(x, y, p)
+        tiles[k] = [x, y, p.width(), p.height()]
+    painter.end()
+    base = join(root, PType, ATLAS_FILE)
+    if not atlas.save(base + ".png", "PNG"):
+        FreeCAD.Console.PrintWarning("Atlas not saved: %s.png\n" % base)
+        return 0
+    with open(base + ".json", "w") as f:
+        json.dump({"width": width, "tiles": tiles}, f, indent=0, sort_keys=True)
+    _atlases.pop((root, PType), None)
+    return len(tiles)
+
+
+def thumbnail(root, PType, rating, stem, width=WIDTH):
+    """
+    thumbnail(root, PType, rating, stem, width=WIDTH)
+    Returns the QPixmap of the image of (PType, rating, stem) scaled to
+    width, taken from the atlas of PType if the tile is there, else read
+    from the file; None if the image is not in the index.
+    The last CACHE_SIZE thumbnails are kept in memory.
+    """
+    key = (root, PType, rating, stem, width)
+    pixmap = _pixmaps.get(key)
+    if pixmap is not None:
+        _pixmaps.move_to_end(key)
+        return pixmap
+    fileName = getIndex(root).lookup(PType, rating, stem)
+    if fileName is None:
+        return None
+    atlas = loadAtlas(root, PType, width)
+    tile = atlas and atlas[1].get(rating + "|" + stem)
+    atlasFile = join(root, PType, ATLAS_FILE + ".png")
+    if tile and getmtime(fileName) <= getmtime(atlasFile):
+        pixmap = atlas[0].copy(*tile)
+    else:
+        from PySide.QtGui import QPixmap
+
+        pixmap = QPixmap(fileName).scaledToWidth(width)
+    _pixmaps[key] = pixmap
+    if len(_pixmaps) > CACHE_SIZE:
+        _pixmaps.popitem(last=False)
+    return pixmap
+
+
+def renderOffscreen(build, fileName, size=300):
+    """
+    renderOffscreen(build, fileName, size=300)
+    Calls build() in a hidden scratch document with no selection and no
+    active pypeline, then draws its objects in isometric view to the PNG
+    fileName with the Coin offscreen renderer.
+    The scratch document is closed and the active document restored.
+    Returns True if the image was saved.
+      build: callable that inserts the objects in FreeCAD.ActiveDocument
+      size: width and height of the image in pixels
+    """
+    from pivy import coin
+    from PySide.QtGui import QImage
+
+    userDoc = FreeCAD.ActiveDocument
+    pypeLine = getattr(FreeCAD, "__activePypeLine__", None)
+    doc = FreeCAD.newDocument("QuetzalPreview", hidden=True)
+    try:
+        FreeCAD.setActiveDocument(doc.Name)
+        FreeCAD.__activePypeLine__ = None
+        build()
+        doc.recompute()
+        root = coin.SoSeparator()
+        camera = coin.SoOrthographicCamera()
+        camera.orientation.setValue(coin.SbRotation(*ISOMETRIC))
+        root.addChild(camera)
+        light = coin.SoDirectionalLight()
+        light.direction.setValue(camera.orientation.getValue().multVec(coin.SbVec3f(0, 0, -1)))
+        root.addChild(light)
+        for o in doc.Objects:
+            if o.ViewObject and o.ViewObject.Visibility:
+                root.addChild(o.ViewObject.RootNode)
+        viewport = coin.SbViewportRegion(size, size)
+        camera.viewAll(root, viewport)
+        renderer = coin.SoOffscreenRenderer(viewport)
+        renderer.setComponents(coin.SoOffscreenRenderer.RGB_TRANSPARENCY)
+        if not renderer.render(root):
+            return False
+        image = QImage(renderer.getBuffer(), size, size, QImage.Format_RGBA8888)
+        makedirs(dirname(fileName), exist_ok=True)
+        return image.mirrored().save(fileName, "PNG")
+    except Exception as e:
+        FreeCAD.Console.PrintWarning("Preview not rendered: %s\n" % e)
+        return False
+    finally:
+        FreeCAD.__activePypeLine__ = pypeLine
+        FreeCAD.closeDocument(doc.Name)
+        if userDoc:
+            FreeCAD.setActiveDocument(userDoc.Name)
+            if FreeCAD.GuiUp:
+                FreeCADGui.setActiveDocument(userDoc.Name)
+
+
+def preview(root, PType, rating, stem, build):
+    """
+    preview(root, PType, rating, stem, build)
+    Returns the path of the thumbnail of (PType, rating, stem), rendering
+    it with renderOffscreen(build) and recording it in the index of root
+    if it's missing; None if it can't be rendered.
+    """
+    index = getIndex(root)
+    fileName = index.lookup(PType, rating, stem)
+    if fileName is None and build is not None:
+        fileName = index.path(PType, rating, stem)
+        if renderOffscreen(build, fileName):
+            index.record(PType, rating, stem)
+        else:
+            fileName = None
+    return fileName
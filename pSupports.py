@@ -0,0 +1,307 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Supports of the pipes of the pype-lines.
+
+The allowable span of each pipe is the lesser of the span where the
+bending stress of a continuous beam (M = w L^2 / 10) reaches the allowable
+stress of the material and the span where the sag of a simply supported
+beam (5 w L^4 / 384 E I) reaches DEFLECTION; w is the weight of the pipe
+full of fluid.
+The supports are proposed walking the connected parts of each PypeLine
+from its free ends: the distance from the last support is carried across
+the fittings, so a short spool gets no support if the one before is
+close enough; along each pipe the next support is on the farthest beam
+crossed within the span, if any, else at the span.
+The beams are those of the frames and the other Quetzal beams, kept in an
+AABB tree of their axes so that each pipe queries only the beams nearby.
+"""
+
+__title__ = "pypeTools supports"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+import csv
+from math import pi, sqrt
+from os.path import abspath, dirname, join
+
+import FreeCAD
+
+import fSection
+import pCmd
+from pClearance import portLinks, pypeLines
+from uClash import AABBTree, closestParameters, pointSegmentDistance
+
+translate = FreeCAD.Qt.translate
+
+# material -> E (MPa), density (kg/m3), allowable bending stress (MPa)
+MATERIALS = {
+    "steel": (203000.0, 7850.0, 100.0),
+    "stainless": (193000.0, 7950.0, 100.0),
+    "copper": (110000.0, 8940.0, 40.0),
+    "PVC": (3000.0, 1400.0, 10.0),
+}
+FLUID_DENSITY = 1000.0  # kg/m3, where the parts and their PypeLine have no "FluidDensity"
+DEFLECTION = 2.5  # mm, the sag allowed between two supports
+SNAP = 300.0  # mm, max distance of the axis of a beam from the surface of the pipe
+CLAMP = "DIN-UBolt"  # the table ./tablez/Clamp_<CLAMP>.csv
+TOL = 1.0  # mm
+G = 9.81  # m/s2
+
+
+def allowableSpan(OD, thk, fluidDensity=FLUID_DENSITY, material="steel"):
+    """
+    allowableSpan(OD, thk, fluidDensity=FLUID_DENSITY, material="steel")
+    Returns the allowable distance in mm between the supports of the pipe
+    OD x thk full of fluid, or None if the material is not in MATERIALS.
+      fluidDensity: kg/m3; 0 for gas lines
+    """
+    if material not in MATERIALS or thk <= 0:
+        return None
+    E, density, S = MATERIALS[material]
+    sp = fSection.properties("tube", OD, thk)
+    ID = OD - 2 * thk
+    w = (sp["A"] * density + pi * ID**2 / 4 * fluidDensity) * 1e-9 * G  # N/mm
+    stress = sqrt(10 * S * sp["Wx"] / w)
+    sag = (384 * E * sp["Ix"] * DEFLECTION / (5 * w)) ** 0.25
+    return min(stress, sag)
+
+
+def stations(L, span, crossings=(), start=None, free=True):
+    """
+    stations(L, span, crossings=(), start=None, free=True)
+    Returns (positions, back): the distances from the start of a pipe of
+    length L where to put supports at most span apart and the distance
+    from its end back to the last support. The next support is at the
+    farthest of the crossings within the span, if any; at a free end the
+    last one is in the middle of the interval left.
+      crossings: distances from the start where the pipe passes over a beam
+      start: the position of the last support before the pipe, <= 0, or
+        None for a free start, where the first support is within span/2
+      free: True if the end is free, so that the last support must be
+        within span/2 from it
+    """
+    result = list()
+    pos = -span / 2 if start is None else start
+    reach = span / 2 if free else span
+    while L - pos > reach + TOL:
+        limit = min(max(pos + span, 0.0), L)
+        near = [u for u in crossings if pos + TOL < u <= limit]
+        if near:
+            pos = max(near)
+        elif free and pos + span >= L - span / 2:
+            pos = (max(0.0, L - span / 2) + limit) / 2
+        else:
+            pos = limit
+        result.append(pos)
+    return result, L - pos
+
+
+class Segment(object):
+    """
+    Segment(obj, P1, P2)
+    The axis P1-P2 of a beam or the position of a clamp (P1 == P2) with the
+    BoundBox of uClash.AABBTree.
+    """
+
+    def __init__(self, obj, P1, P2):
+        self.name = obj.Name
+        self.P1, self.P2 = P1, P2
+        self.bb = FreeCAD.BoundBox()
+        self.bb.add(P1)
+        self.bb.add(P2)
+
+
+def beamSegments(doc):
+    """
+    beamSegments(doc)
+    Returns the Segments of the axes of the beams of the frames and of the
+    other Quetzal beams of the document.
+    """
+    import fExport
+
+    beams = {b.Name: b for g, b in fExport.frameBeams(doc)}
+    for o in doc.Objects:
+        if getattr(o, "FType", None) == "Beam" and hasattr(o, "Height"):
+            beams.setdefault(o.Name, o)
+    result = list()
+    for b in beams.values():
+        P1, P2 = fExport.memberAxis(b)[:2]
+        if (P2 - P1).Length > TOL:
+            result.append(Segment(b, P1, P2))
+    return result
+
+
+def clampSizes(clampType=CLAMP):
+    """
+    clampSizes(clampType=CLAMP)
+    Returns the dictionary {PSize: [PSize, ClampType, C, H, d]} of the
+    rows of ./tablez/Clamp_<clampType>.csv, the propList of pCmd.makeUbolt().
+    """
+    sizes = dict()
+    fileName = join(dirname(abspath(__file__)), "tablez", "Clamp_%s.csv" % clampType)
+    with open(fileName, "r") as f:
+        for row in csv.DictReader(f, delimiter=";"):
+            sizes[row["PSize"]] = [
+                row["PSize"],
+                clampType,
+                float(row["C"]),
+                float(row["H"]),
+                float(row["d"]),
+            ]
+    return sizes
+
+
+def valueOf(obj, line, prop, default):
+    "the property prop of obj if any, else that of its PypeLine line, else default"
+    for o in (obj, line):
+        if o is not None and hasattr(o, prop):
+            return getattr(o, prop)
+    return default
+
+
+def globalPorts(obj):
+    "the ports of obj in global coordinates; those of a Pipe from its Height"
+    if obj.PType == "Pipe":
+        H = FreeCAD.Vector(0, 0, float(obj.Height))
+        return [obj.Placement.Base, obj.Placement.multVec(H)]
+    return [obj.Placement.multVec(p) for p in getattr(obj, "Ports", [])]
+
+
+def pipeCrossings(pipe, A, B, beamTree, snap):
+    """
+    pipeCrossings(pipe, A, B, beamTree, snap)
+    Returns the dictionary {distance from A: (point of the beam, beam name)}
+    of the beams of beamTree that the pipe from A to B crosses within snap.
+    """
+    L = (B - A).Length
+    ax = (B - A) * (1 / L)
+    bb = Segment(pipe, A, B).bb
+    bb.enlarge(float(pipe.OD) / 2 + snap)
+    crossings = dict()
+    for b in beamTree.query(bb) if beamTree else []:
+        d = b.P2 - b.P1
+        if abs(d.normalize().dot(ax)) > 0.99:
+            continue
+        s, t = closestParameters(A, B, b.P1, b.P2)
+        Q, R = A + ax * (L * s), b.P1 + (b.P2 - b.P1) * t
+        if (Q - R).Length <= float(pipe.OD) / 2 + snap:
+            crossings[L * s] = (R, b.name)
+    return crossings
+
+
+def planSupports(doc=None, fluidDensity=FLUID_DENSITY, material="steel", snap=SNAP):
+    """
+    planSupports(doc=None, fluidDensity=FLUID_DENSITY, material="steel", snap=SNAP)
+    Returns the list of (line, pipe, P, up, beam) of the supports proposed
+    for the pipes of the PypeLines:
+      P: the point of the axis of the pipe
+      up: the direction from the beam to the pipe, or None
+      beam: the name of the beam, or None if no beam is within snap
+    Each PypeLine is walked from the free ports of its parts, carrying the
+    distance from the last support across the fittings; the clamps already
+    on a pipe are its supports and no new one is added to it.
+    The properties "FluidDensity" and "Material" of the pipe or of its
+    PypeLine override fluidDensity and material. The beams parallel to
+    the pipe are not snapped.
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    beams = beamSegments(doc)
+    beamTree = AABBTree(beams) if beams else None
+    clamps = [
+        Segment(o, o.Placement.Base, o.Placement.Base)
+        for o in doc.Objects
+        if getattr(o, "PType", None) == "Clamp"
+    ]
+    clampTree = AABBTree(clamps) if clamps else None
+    members = dict()  # PypeLine -> {name: part}
+    for name, line in pypeLines(doc).items():
+        o = doc.getObject(name)
+        if line.PType == "PypeLine" and hasattr(o, "PType") and o.PType != "Clamp":
+            members.setdefault(line, dict())[name] = o
+    result = list()
+    for line, parts in sorted(members.items(), key=lambda item: item[0].Name):
+        ports = {name: globalPorts(o) for name, o in parts.items()}
+        links = portLinks(ports)
+        free = [(n, k, None) for n, k in sorted(links) if not links[(n, k)]]
+        stack = list(reversed(free + [(n, 0, None) for n in sorted(parts)]))
+        visited = set()
+        while stack:
+            name, k, back = stack.pop()  # back: the distance to the last support
+            if name in visited or k >= len(ports[name]):
+                continue
+            visited.add(name)
+            part = parts[name]
+            if part.PType != "Pipe":
+                for j, P in enumerate(ports[name]):
+                    if j != k:
+                        d = None if back is None else back + (P - ports[name][k]).Length
+                        stack.extend((n, i, d) for n, i in links[(name, j)])
+                continue
+            A, B = ports[name][k], ports[name][1 - k]
+            L = (B - A).Length
+            mat = str(valueOf(part, line, "Material", material))
+            rho = float(valueOf(part, line, "FluidDensity", fluidDensity))
+            span = allowableSpan(
+                float(part.OD), float(part.thk), rho, mat if mat in MATERIALS else material
+            )
+            after = None
+            if span and L > TOL:
+                bb = Segment(part, A, B).bb
+                bb.enlarge(TOL)
+                existing = [
+                    (c.P1 - A).Length
+                    for c in (clampTree.query(bb) if clampTree else [])
+                    if pointSegmentDistance(c.P1, A, B) < TOL
+                ]
+                if existing:
+                    after = L - max(existing)
+                else:
+                    ax = (B - A) * (1 / L)
+                    crossings = pipeCrossings(part, A, B, beamTree, snap)
+                    start = None if back is None else -back
+                    positions, after = stations(L, span, crossings, start, not links[(name, 1 - k)])
+                    for u in positions:
+                        P = A + ax * u
+                        up, beam = None, None
+                        if u in crossings:
+                            R, beam = crossings[u]
+                            up = P - R
+                            up = up - ax * up.dot(ax)
+                            up = up.normalize() if up.Length > TOL else None
+                        result.append((line, part, P, up, beam))
+            elif back is not None:
+                after = back + L
+            stack.extend((n, i, after) for n, i in links[(name, 1 - k)])
+    return result
+
+
+def placeSupports(doc=None, fluidDensity=FLUID_DENSITY, material="steel", snap=SNAP):
+    """
+    placeSupports(doc=None, fluidDensity=FLUID_DENSITY, material="steel", snap=SNAP)
+    Inserts the U-bolts of planSupports() in one transaction, recomputing
+    the document once, and moves them to the PypeLine of their pipe.
+    Returns the list of the U-bolts.
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    plan = planSupports(doc, fluidDensity, material, snap)
+    sizes = clampSizes()
+    missing = sorted({pipe.PSize for line, pipe, P, up, beam in plan} - set(sizes))
+    for PSize in missing:
+        FreeCAD.Console.PrintWarning("No %s clamp of size %s\n" % (CLAMP, PSize))
+    ubolts = list()
+    with pCmd.batch(translate("Transaction", "Insert supports"), doc):
+        for line, pipe, P, up, beam in plan:
+            if pipe.PSize not in sizes:
+                continue
+            ax = pipe.Placement.Rotation.multVec(FreeCAD.Vector(0, 0, 1))
+            ub = pCmd.makeUbolt(sizes[pipe.PSize], pos=P, Z=ax, doc=doc)
+            if up:
+                # the legs of the U-bolt go along -Y of its Shape, towards the beam
+                ub.Placement.Rotation = FreeCAD.Rotation(up.cross(ax), up, ax, "ZYX")
+            pCmd.moveToPyLi(ub, line.Label)
+            ubolts.append(ub)
+    return ubolts
@@ -1,10 +1,8 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 
-import inspect
 import os
 
 import FreeCAD
-import FreeCADGui
 
 __version__ = "1.8.9"
 
@@ -22,18 +20,14 @@ def get_icon_path(icon_name: str) -> str:
 
 
 # helper -------------------------------------------------------------------
-# FreeCAD TemplatePyMod module
-# (c) 2007 Juergen Riegel LGPL
-
-
-def addCommand(name, cmdObject):
-    (list, num) = inspect.getsourcelines(cmdObject.Activated)
-    pos = 0
-    # check for indentation
-    while list[1][pos] == " " or list[1][pos] == "\t":
-        pos += 1
-    source = ""
-    for i in range(len(list) - 1):
-        source += list[i + 1][pos:]
+
+
+def addCommand(name, cmdObject, source=""):
+    """
+    addCommand(name, cmdObject, source="")
+    Registers cmdObject as the FreeCAD command name.
+      source: optional text passed to FreeCADGui.addCommand()
+    """
+    import FreeCADGui
+
     FreeCADGui.addCommand(name, cmdObject, source)
-    # FreeCAD.Console.PrintMessage("Quetzal " + name + "source: <<< " + source + " >>>\n")
@@ -6,11 +6,13 @@
 #   User parameter:BaseApp/Preferences/Mod/Quetzal
 #   NominalSizeSystem  int    0 = DN (metric)   1 = NPS (imperial)
 #   LengthUnit         str    "mm" | "in" | ""  (blank = follow FreeCAD schema)
+#   UseInstances       bool   insert repeated fittings as App::Link (see pCmd)
 # ---------------------------------------------------------------------------
 
 import FreeCAD
 from PySide.QtGui  import (QWidget, QVBoxLayout, QHBoxLayout, QGroupBox,
-                            QLabel, QComboBox, QRadioButton, QButtonGroup)
+                            QLabel, QComboBox, QRadioButton, QButtonGroup,
+                            QCheckBox)
 
 translate = FreeCAD.Qt.translate
 
@@ -235,6 +237,14 @@ class QuetzalPreferencePage(QWidget):
         prevRow.addStretch()
         unitLayout.addLayout(prevRow)
         layout.addWidget(unitGrp)
+
+        # -- Insertion ----------------------------------------------------------
+        insGrp = QGroupBox(translate('QuetzalPrefs', 'Insertion'))
+        insLayout = QVBoxLayout(insGrp)
+        self._instances = QCheckBox(translate('QuetzalPrefs',
+            'Insert identical fittings as links to a shared prototype'))
+        insLayout.addWidget(self._instances)
+        layout.addWidget(insGrp)
         layout.addStretch()
 
         self._radioDN.toggled.connect(self._updatePreview)
@@ -253,11 +263,13 @@ class QuetzalPreferencePage(QWidget):
         self._unitCombo.setCurrentIndex(idx if idx >= 0 else 0)
         if idx < 0:
             self._unitCombo.setCurrentText(unit)
+        self._instances.setChecked(_pref().GetBool('UseInstances', False))
         self._updatePreview()
 
     def saveSettings(self):
         set_size_system(1 if self._radioNPS.isChecked() else 0)
         set_length_unit(self._unitCombo.currentText())
+        _pref().SetBool('UseInstances', self._instances.isChecked())
 
     def _updatePreview(self):
         sys  = 1 if self._radioNPS.isChecked() else 0
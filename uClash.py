@@ -0,0 +1,469 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Clash detection between pipes, elbows, beams and AnyThing objects.
+
+Each object is reduced to analytic primitives: pipes to cylinders, elbows
+to two cylinders along the chords of their axis, beams to oriented boxes
+around the axis; the other objects keep their Shape.
+The broad phase looks for overlapping bounding boxes in an AABB tree; the
+narrow phase measures segment-segment distance for cylinders, segment-box
+distance and separating axes for boxes, and uses distToShape() only for
+the pairs that involve a Shape.
+Parts whose ports or axes meet (e.g. a pipe and its elbow, the beams of one
+joint) are connected, not clashing, and are skipped.
+checkClashes() remembers the objects of the last run, so that the next
+run checks only the pairs of the objects that have changed since.
+"""
+
+__title__ = "utilities clash detection"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+from math import sqrt
+
+import FreeCAD
+
+CLASH_PTYPES = ["Pipe", "Elbow", "Any"]
+LEAF_SIZE = 4  # items per leaf of the AABBTree
+GOLDEN = (sqrt(5) - 1) / 2
+
+_states = dict()  # document name -> (signatures of the items, clashes) of the last run
+
+
+class ClashItem(object):
+    """
+    ClashItem(obj, prims, ends, axes)
+    An object to check:
+      prims: list of ("cyl", P1, P2, r), ("box", C, [u, v, w], [hu, hv, hw])
+        or ("shape", Shape), in global coordinates
+      ends: the points where other parts connect (ports, ends of the axis)
+      axes: list of (P1, P2) segments where other parts connect
+    """
+
+    def __init__(self, obj, prims, ends, axes):
+        self.name = obj.Name
+        self.label = obj.Label
+        self.prims = prims
+        self.ends = ends
+        self.axes = axes
+        self.bb = FreeCAD.BoundBox()
+        for p in prims:
+            self.bb.add(primBox(p))
+        self.signature = tuple(_signature(p) for p in prims)
+
+
+def _xyz(v):
+    return (v.x, v.y, v.z)
+
+
+def _signature(prim):
+    "the values of the primitive, to find the items that changed"
+    if prim[0] == "shape":
+        bb = prim[1].BoundBox
+        values = [bb.XMin, bb.YMin, bb.ZMin, bb.XMax, bb.YMax, bb.ZMax]
+    else:
+        values = list()
+        for v in prim[1:]:
+            for x in v if isinstance(v, list) else [v]:
+                values.extend(_xyz(x) if hasattr(x, "x") else [x])
+    return (prim[0],) + tuple(round(x, 6) for x in values)
+
+
+def primBox(prim):
+    "the global BoundBox of the primitive"
+    if prim[0] == "cyl":
+        P1, P2, r = prim[1:]
+        d = P2 - P1
+        d = d * (1 / d.Length) if d.Length else FreeCAD.Vector()
+        e = [r * sqrt(max(0.0, 1 - c * c)) for c in _xyz(d)]
+        lo = [min(a, b) - k for a, b, k in zip(_xyz(P1), _xyz(P2), e)]
+        hi = [max(a, b) + k for a, b, k in zip(_xyz(P1), _xyz(P2), e)]
+        return FreeCAD.BoundBox(*(lo + hi))
+    if prim[0] == "box":
+        C, axes, half = prim[1:]
+        e = [sum(abs(_xyz(a)[i]) * h for a, h in zip(axes, half)) for i in range(3)]
+        lo = [c - k for c, k in zip(_xyz(C), e)]
+        hi = [c + k for c, k in zip(_xyz(C), e)]
+        return FreeCAD.BoundBox(*(lo + hi))
+    return FreeCAD.BoundBox(prim[1].BoundBox)
+
+
+################ items ###########################
+
+
+def _axisBox(P1, P2, xAxis, xRange, yRange):
+    "the box primitive around the axis P1-P2 of a beam with section xRange x yRange"
+    w = P2 - P1
+    L = w.Length
+    w = w * (1 / L)
+    u = FreeCAD.Vector(xAxis)
+    u = (u - w * u.dot(w)).normalize()
+    v = w.cross(u)
+    cx, cy = sum(xRange) / 2, sum(yRange) / 2
+    C = (P1 + P2) * 0.5 + u * cx + v * cy
+    half = [(xRange[1] - xRange[0]) / 2, (yRange[1] - yRange[0]) / 2, L / 2]
+    return ("box", C, [u, v, w], half)
+
+
+def _shapeItem(obj):
+    ends = [obj.Placement.multVec(p) for p in getattr(obj, "Ports", [])]
+    return ClashItem(obj, [("shape", obj.Shape)], ends, [])
+
+
+def clashItem(obj):
+    """
+    clashItem(obj)
+    Returns the ClashItem of obj, or None if obj is not checked.
+    """
+    PType = getattr(obj, "PType", None)
+    if PType == "Pipe" and float(obj.Height) > 0:
+        P1 = obj.Placement.Base
+        P2 = obj.Placement.multVec(FreeCAD.Vector(0, 0, float(obj.Height)))
+        return ClashItem(obj, [("cyl", P1, P2, float(obj.OD) / 2)], [P1, P2], [(P1, P2)])
+    if PType == "Elbow" and len(obj.Ports) > 1 and 0 < float(obj.BendAngle) < 180:
+        P1, P2 = [obj.Placement.multVec(p) for p in obj.Ports[:2]]
+        # the App::Link instances carry BendAngle and BendRadius, not the Proxy
+        M = obj.Placement.multVec(obj.getLinkedObject(True).Proxy.midPoint(obj))
+        r = float(obj.OD) / 2
+        return ClashItem(obj, [("cyl", P1, M, r), ("cyl", M, P2, r)], [P1, P2], [(P1, M), (M, P2)])
+    if getattr(obj, "FType", None) == "Beam" and hasattr(obj, "stype"):
+        bb = obj.Proxy.profileFace(obj).BoundBox
+        rot = obj.Placement.Rotation
+        P1 = obj.Placement.Base
+        P2 = obj.Placement.multVec(FreeCAD.Vector(0, 0, float(obj.Height)))
+        if (P2 - P1).Length:
+            xAxis = rot.multVec(FreeCAD.Vector(1, 0, 0))
+            box = _axisBox(P1, P2, xAxis, (bb.XMin, bb.XMax), (bb.YMin, bb.YMax))
+            return ClashItem(obj, [box], [P1, P2], [(P1, P2)])
+    if PType in CLASH_PTYPES and hasattr(obj, "Shape") and not obj.Shape.isNull():
+        return _shapeItem(obj)
+    return None
+
+
+def frameItem(beam):
+    """
+    frameItem(beam)
+    Returns the ClashItem of a beam of FrameBranch or FrameLine: a box of
+    the dimensions of its section around its axis, or its Shape.
+    """
+    import fExport
+
+    P1, P2, xAxis = fExport.memberAxis(beam)
+    props = fExport.sectionOf(beam)[1]
+    H, W = props.get("H"), props.get("W")
+    if H and W and (P2 - P1).Length:
+        box = _axisBox(P1, P2, xAxis, (-W / 2, W / 2), (-H / 2, H / 2))
+        return ClashItem(beam, [box], [P1, P2], [(P1, P2)])
+    if hasattr(beam, "Shape") and not beam.Shape.isNull():
+        item = _shapeItem(beam)
+        item.ends, item.axes = [P1, P2], [(P1, P2)]
+        return item
+    return None
+
+
+def clashItems(doc=None):
+    """
+    clashItems(doc=None)
+    Returns the dictionary {name: ClashItem} of the Pipe, Elbow, Beam and
+    AnyThing objects and of the beams of the frames of the document.
+    """
+    import fExport
+
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    items = dict()
+    for group, beam in fExport.frameBeams(doc):
+        item = frameItem(beam)
+        if item:
+            items[beam.Name] = item
+    for o in doc.Objects:
+        if o.Name not in items and not hasattr(o, "InstanceKey"):
+            item = clashItem(o)
+            if item:
+                items[o.Name] = item
+    return items
+
+
+################ broad phase ###########################
+
+
+class AABBTree(object):
+    """
+    AABBTree(items)
+    Bounding volume hierarchy of the ClashItems: each node is split at the
+    median of its longest side, down to LEAF_SIZE items.
+    """
+
+    def __init__(self, items):
+        self.root = self.build(list(items))
+
+    def build(self, items):
+        bb = FreeCAD.BoundBox()
+        for i in items:
+            bb.add(i.bb)
+        if len(items) <= LEAF_SIZE:
+            return (bb, None, None, items)
+        k = max(range(3), key=lambda j: (bb.XLength, bb.YLength, bb.ZLength)[j])
+        items.sort(key=lambda i: (i.bb.Center.x, i.bb.Center.y, i.bb.Center.z)[k])
+        n = len(items) // 2
+        return (bb, self.build(items[:n]), self.build(items[n:]), None)
+
+    def query(self, bb):
+        "the items whose BoundBox intersects bb"
+        result = list()
+        stack = [self.root]
+        while stack:
+            nodeBB, left, right, items = stack.pop()
+            if not nodeBB.isValid() or not nodeBB.intersect(bb):
+                continue
+            if items is not None:
+                result.extend(i for i in items if i.bb.intersect(bb))
+            else:
+                stack.extend([left, right])
+        return result
+
+
+################ narrow phase ###########################
+
+
+def closestParameters(P1, Q1, P2, Q2):
+    """
+    closestParameters(P1, Q1, P2, Q2)
+    Returns (s, t) in [0, 1] of the closest points P1 + (Q1 - P1) * s and
+    P2 + (Q2 - P2) * t of the segments P1-Q1 and P2-Q2.
+    """
+    d1, d2, r = Q1 - P1, Q2 - P2, P1 - P2
+    a, e, f = d1.dot(d1), d2.dot(d2), d2.dot(r)
+    if a < 1e-12 and e < 1e-12:
+        return 0.0, 0.0
+    if a < 1e-12:
+        s, t = 0.0, min(max(f / e, 0.0), 1.0)
+    else:
+        c = d1.dot(r)
+        if e < 1e-12:
+            s, t = min(max(-c / a, 0.0), 1.0), 0.0
+        else:
+            b = d1.dot(d2)
+            denom = a * e - b * b
+            s = min(max((b * f - c * e) / denom, 0.0), 1.0) if denom > 1e-12 else 0.0
+            t = (b * s + f) / e
+            if t < 0:
+                s, t = min(max(-c / a, 0.0), 1.0), 0.0
+            elif t > 1:
+                s, t = min(max((b - c) / a, 0.0), 1.0), 1.0
+    return s, t
+
+
+def segmentDistance(P1, Q1, P2, Q2):
+    "the minimum distance between the segments P1-Q1 and P2-Q2"
+    s, t = closestParameters(P1, Q1, P2, Q2)
+    return ((P1 + (Q1 - P1) * s) - (P2 + (Q2 - P2) * t)).Length
+
+
+def pointSegmentDistance(P, A, B):
+    "the distance of the point P from the segment A-B"
+    d = B - A
+    L2 = d.dot(d)
+    t = min(max((P - A).dot(d) / L2, 0.0), 1.0) if L2 else 0.0
+    return (P - (A + d * t)).Length
+
+
+def _boxDistance(p, half):
+    "distance of the local point p from the box of half sizes half"
+    return sqrt(sum(max(abs(c) - h, 0.0) ** 2 for c, h in zip(p, half)))
+
+
+def segmentBoxDistance(P, Q, box):
+    """
+    segmentBoxDistance(P, Q, box)
+    The minimum distance between the segment P-Q and the box primitive:
+    the distance from the box is convex along the segment, so a golden
+    section search finds it.
+    """
+    C, axes, half = box[1:]
+    p = [(P - C).dot(a) for a in axes]
+    q = [(Q - C).dot(a) for a in axes]
+
+    def f(t):
+        return _boxDistance([a + (b - a) * t for a, b in zip(p, q)], half)
+
+    lo, hi = 0.0, 1.0
+    x1, x2 = hi - GOLDEN * (hi - lo), lo + GOLDEN * (hi - lo)
+    f1, f2 = f(x1), f(x2)
+    for i in range(40):
+        if f1 <= f2:
+            hi, x2, f2 = x2, x1, f1
+            x1 = hi - GOLDEN * (hi - lo)
+            f1 = f(x1)
+        else:
+            lo, x1, f1 = x1, x2, f2
+            x2 = lo + GOLDEN * (hi - lo)
+            f2 = f(x2)
+    return min(f(0.0), f(1.0), f1, f2)
+
+
+def boxOverlap(b1, b2):
+    """
+    boxOverlap(b1, b2)
+    The penetration of the box primitives on the separating axes: the
+    smallest overlap of their projections, negative if they are apart.
+    """
+    C1, A1, h1 = b1[1:]
+    C2, A2, h2 = b2[1:]
+    T = C2 - C1
+    axes = list(A1) + list(A2)
+    for a in A1:
+        for b in A2:
+            c = a.cross(b)
+            if c.Length > 1e-9:
+                axes.append(c.normalize())
+    depth = None
+    for n in axes:
+        r1 = sum(abs(a.dot(n)) * h for a, h in zip(A1, h1))
+        r2 = sum(abs(a.dot(n)) * h for a, h in zip(A2, h2))
+        overlap = r1 + r2 - abs(T.dot(n))
+        if depth is None or overlap < depth:
+            depth = overlap
+            if depth < 0:
+                break
+    return depth
+
+
+def primDepth(p1, p2):
+    """
+    primDepth(p1, p2)
+    The penetration of the primitives p1 and p2 in mm, negative if they
+    are apart; 0.0 for the shapes that touch or intersect.
+    """
+    kinds = (p1[0], p2[0])
+    if kinds == ("cyl", "cyl"):
+        return p1[3] + p2[3] - segmentDistance(p1[1], p1[2], p2[1], p2[2])
+    if kinds == ("cyl", "box"):
+        return p1[3] - segmentBoxDistance(p1[1], p1[2], p2)
+    if kinds == ("box", "cyl"):
+        return primDepth(p2, p1)
+    if kinds == ("box", "box"):
+        return boxOverlap(p1, p2)
+    s1, s2 = [_primShape(p) for p in (p1, p2)]
+    return -s1.distToShape(s2)[0]
+
+
+def _primShape(prim):
+    "the Shape of the primitive, for distToShape()"
+    import Part
+
+    if prim[0] == "shape":
+        return prim[1]
+    if prim[0] == "cyl":
+        P1, P2, r = prim[1:]
+        return Part.makeCylinder(r, (P2 - P1).Length, P1, P2 - P1)
+    C, (u, v, w), (hu, hv, hw) = prim[1:]
+    box = Part.makeBox(2 * hu, 2 * hv, 2 * hw)
+    M = FreeCAD.Matrix(u.x, v.x, w.x, 0, u.y, v.y, w.y, 0, u.z, v.z, w.z, 0)
+    pl = FreeCAD.Placement(M)
+    pl.Base = C - u * hu - v * hv - w * hw
+    box.Placement = pl
+    return box
+
+
+def connected(i1, i2, tol):
+    "True if the ports or the axes of the items meet, as in a joint"
+    for P in i1.ends:
+        if any((P - Q).Length <= tol for Q in i2.ends):
+            return True
+        if any(pointSegmentDistance(P, A, B) <= tol for A, B in i2.axes):
+            return True
+    for P in i2.ends:
+        if any(pointSegmentDistance(P, A, B) <= tol for A, B in i1.axes):
+            return True
+    return False
+
+
+def clashDepth(i1, i2, tol=1.0):
+    """
+    clashDepth(i1, i2, tol=1.0)
+    Returns the penetration in mm of the ClashItems, or None if they do
+    not clash by more than tol or are connected.
+    """
+    if connected(i1, i2, tol):
+        return None
+    depth = None
+    for p1 in i1.prims:
+        for p2 in i2.prims:
+            if not primBox(p1).intersect(primBox(p2)):
+                continue
+            d = primDepth(p1, p2)
+            if depth is None or d > depth:
+                depth = d
+    shapes = "shape" in [p[0] for p in i1.prims + i2.prims]
+    if depth is None or depth < (0.0 if shapes else tol):
+        return None
+    return depth
+
+
+def checkClashes(doc=None, changedOnly=True, tol=1.0):
+    """
+    checkClashes(doc=None, changedOnly=True, tol=1.0)
+    Returns the sorted list of (depth, name1, name2) of the clashing items
+    of the document.
+      changedOnly: check only the objects added or changed since the last
+        run and keep the other clashes found then
+      tol: the penetration in mm that is not a clash
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    items = clashItems(doc)
+    signatures, clashes = _states.get(doc.Name, (dict(), dict()))
+    if changedOnly and signatures:
+        changed = {n for n, i in items.items() if signatures.get(n) != i.signature}
+        clashes = {
+            k: d
+            for k, d in clashes.items()
+            if k[0] in items and k[1] in items and not changed & set(k)
+        }
+    else:
+        changed, clashes = set(items), dict()
+    tree = AABBTree(items.values())
+    for name in changed:
+        item = items[name]
+        bb = FreeCAD.BoundBox(item.bb)
+        bb.enlarge(tol)
+        for other in tree.query(bb):
+            if other.name == name or (other.name in changed and other.name < name):
+                continue
+            d = clashDepth(item, other, tol)
+            if d is not None:
+                clashes[tuple(sorted((name, other.name)))] = d
+    _states[doc.Name] = ({n: i.signature for n, i in items.items()}, clashes)
+    return sorted(((d, a, b) for (a, b), d in clashes.items()), reverse=True)
+
+
+def forget(doc=None):
+    "drops the results of the last run: the next one checks all the objects"
+    _states.pop((doc or FreeCAD.ActiveDocument).Name, None)
+
+
+def report(clashes, doc=None):
+    """
+    report(clashes, doc=None)
+    Prints the clashes returned by checkClashes() and selects the objects
+    involved in the 3D view.
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    if not clashes:
+        FreeCAD.Console.PrintMessage("No clashes found\n")
+        return
+    FreeCAD.Console.PrintWarning("%d clashes found:\n" % len(clashes))
+    for d, a, b in clashes:
+        FreeCAD.Console.PrintWarning(
+            "  %s - %s: %.1f mm\n" % (doc.getObject(a).Label, doc.getObject(b).Label, d)
+        )
+    if FreeCAD.GuiUp:
+        import FreeCADGui
+
+        FreeCADGui.Selection.clearSelection()
+        for name in {n for d, a, b in clashes for n in (a, b)}:
+            FreeCADGui.Selection.addSelection(doc.getObject(name))
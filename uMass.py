@@ -0,0 +1,347 @@
+# SPDX-License-Identifier: LGPL-3.0-or-later
+
+"""
+Weight and center of gravity of the frames and of the pype-lines.
+
+The mass of each part is evaluated from its properties only:
+- pipes and elbows: steel density x ring area x length of the axis;
+- beams: mass per metre of the section (see fSection) x length;
+- fittings: the "kg" column of ./tablez/<PType>_<PRating>.csv, if any,
+  else the volume of the Shape.
+The MassCache of the document keeps the value of each part and the totals
+of each group (FrameBranch, FrameLine, PypeLine and PypeBranch) and the
+MassObserver marks dirty only the parts that change and their groups: the
+totals are evaluated again when asked, summing the values kept.
+"""
+
+__title__ = "utilities weight roll-up"
+__author__ = "oddtopus"
+__url__ = "github.com/oddtopus/dodo"
+__license__ = "LGPL 3"
+
+import csv
+from math import cos, pi, sin, sqrt
+from os.path import abspath, dirname, isfile, join
+
+import FreeCAD
+
+from pBOM import isBOMItem
+
+DENSITY = 7850  # kg/m3, steel, as fSection.DENSITY
+SHEET = "MassRollUp"  # name of the spreadsheet of toSpreadsheet()
+
+# properties that change the mass or the center of gravity of a part
+MASS_PROPS = [
+    "Placement",
+    "Shape",
+    "Height",
+    "OD",
+    "thk",
+    "BendAngle",
+    "BendRadius",
+    "PRating",
+    "PSize",
+    "FlangeType",
+    "CutLength",
+    "stype",
+    "H",
+    "W",
+    "ta",
+    "tf",
+    "Base",
+    "tailOffset",
+    "headOffset",
+]
+# properties that change the members of a group
+GROUP_PROPS = ["Beams", "Tubes", "Curves", "Group"]
+
+_caches = dict()  # document name -> MassCache
+_observer = None
+_weights = dict()  # (PType, PRating) -> {(PSize, FlangeType): kg}
+
+
+def catalogWeight(PType, PRating, PSize, FlangeType=None):
+    """
+    catalogWeight(PType, PRating, PSize, FlangeType=None)
+    Returns the weight in kg of the part of ./tablez/<PType>_<PRating>.csv,
+    or None if the table has no column "kg" or no such row.
+    The tables are read once.
+    """
+    key = (PType, PRating)
+    if key not in _weights:
+        table = _weights[key] = dict()
+        fileName = join(dirname(abspath(__file__)), "tablez", "%s_%s.csv" % key)
+        if isfile(fileName):
+            with open(fileName, "r") as f:
+                for row in csv.DictReader(f, delimiter=";"):
+                    try:
+                        table[(row["PSize"], row.get("FlangeType"))] = float(row["kg"])
+                    except KeyError:
+                        break  # no column "kg"
+                    except (TypeError, ValueError):
+                        continue  # no weight in this row
+    return _weights[key].get((PSize, FlangeType))
+
+
+def combine(items):
+    """
+    combine(items)
+    Returns (mass, CoG) of the list of (mass, CoG) items.
+    """
+    M = sum(m for m, G in items)
+    if not M:
+        return 0.0, FreeCAD.Vector()
+    G = FreeCAD.Vector()
+    for m, P in items:
+        G += P * (m / M)
+    return M, G
+
+
+def _ring(obj):
+    "the area in mm2 of the section of the pipe or elbow obj"
+    OD, thk = float(obj.OD), float(obj.thk)
+    ID = max(OD - 2 * thk, 0.0)
+    return pi * (OD**2 - ID**2) / 4
+
+
+def partMass(obj):
+    """
+    partMass(obj)
+    Returns (mass in kg, global CoG) of the part obj, evaluated from its
+    properties, or None if it has no mass.
+    """
+    PType = getattr(obj, "PType", None)
+    if PType == "Pipe":
+        L = float(obj.Height)
+        G = obj.Placement.multVec(FreeCAD.Vector(0, 0, L / 2))
+        return _ring(obj) * L * 1e-9 * DENSITY, G
+    if PType == "Elbow" and 0 < float(obj.BendAngle) < 180:
+        # the axis is the arc of radius BR around C, see Elbow.computePorts()
+        BR = float(obj.BendRadius)
+        BA = float(obj.BendAngle) / 180 * pi
+        d = BR * sqrt(2) - BR / cos(BA / 2)
+        C = FreeCAD.Vector(1, 1, 0) * (BR - d * cos(pi / 4))
+        G = C - FreeCAD.Vector(1, 1, 0).normalize() * (BR * sin(BA / 2) / (BA / 2))
+        return _ring(obj) * BR * BA * 1e-9 * DENSITY, obj.Placement.multVec(G)
+    if PType:
+        kg = catalogWeight(PType, obj.PRating, obj.PSize, getattr(obj, "FlangeType", None))
+        if kg is not None:
+            ports = [obj.Placement.multVec(p) for p in getattr(obj, "Ports", [])]
+            G = combine([(1.0, p) for p in ports])[1] if ports else obj.Placement.Base
+            return kg, G
+    if getattr(obj, "FType", None) == "Beam" and hasattr(obj, "stype"):
+        import fSection
+
+        sp = fSection.properties(obj.stype, obj.H, obj.W, obj.ta, obj.tf)
+        if sp:
+            L = float(getattr(obj, "CutLength", 0) or obj.Height)
+            G = obj.Placement.multVec(FreeCAD.Vector(0, 0, float(obj.Height) / 2))
+            return sp["mass"] * L / 1000, G
+    if hasattr(obj, "Base") and hasattr(obj, "Height") and not PType:
+        import fExport
+
+        mass = fExport.sectionOf(obj)[1].get("mass")
+        if mass:
+            P1, P2 = fExport.memberAxis(obj)[:2]
+            return mass * (P2 - P1).Length / 1000, (P1 + P2) * 0.5
+    if hasattr(obj, "Shape") and not obj.Shape.isNull():
+        try:
+            shape = obj.Shape
+            return shape.Volume * 1e-9 * DENSITY, shape.CenterOfMass
+        except Exception:
+            return None
+    return None
+
+
+def isMassItem(obj):
+    "True if obj is a part whose mass is summed in the roll-up"
+    if getattr(obj, "PType", None) in ("PypeLine", "PypeBranch"):
+        return False
+    return isBOMItem(obj)
+
+
+def groupsOf(doc):
+    """
+    groupsOf(doc)
+    Returns the dictionary {group name: [names of the parts]} of the
+    FrameBranch, FrameLine, PypeLine and PypeBranch objects of doc.
+    """
+    groups = dict()
+    for o in doc.Objects:
+        FType, PType = getattr(o, "FType", None), getattr(o, "PType", None)
+        if FType == "FrameBranch":
+            names = [n for n in o.Beams if n]
+        elif PType == "PypeBranch":
+            names = list(o.Tubes) + list(o.Curves)
+        elif FType == "FrameLine" or PType == "PypeLine":
+            found = doc.getObjectsByLabel(o.Group)
+            names = [x.Name for x in found[0].OutList if x != o] if found else []
+        else:
+            continue
+        groups[o.Name] = names
+    return groups
+
+
+class MassCache(object):
+    """
+    MassCache(doc)
+    Keeps (mass, CoG) of the parts of the document doc and the totals of
+    its groups: the MassObserver marks dirty the parts that change, so
+    that only these are evaluated again by partMass().
+      doc: the App document
+    """
+
+    def __init__(self, doc):
+        self.docName = doc.Name
+        self.parts = dict()  # part name -> (mass, CoG) or None
+        self.totals = dict()  # group name -> (mass, CoG)
+        self.groups = None  # group name -> part names, see groupsOf()
+        self.groupsOfPart = dict()  # part name -> group names
+
+    def doc(self):
+        return FreeCAD.getDocument(self.docName)
+
+    def members(self):
+        "the dictionary {group name: [names of the parts]}, built once"
+        if self.groups is None:
+            self.groups = groupsOf(self.doc())
+            self.groupsOfPart = dict()
+            for g, names in self.groups.items():
+                for n in names:
+                    self.groupsOfPart.setdefault(n, list()).append(g)
+            self.totals.clear()
+        return self.groups
+
+    def invalidate(self, name):
+        "the part name changed: forget its value and the totals of its groups"
+        self.parts.pop(name, None)
+        if self.groups is not None:
+            for g in self.groupsOfPart.get(name, []):
+                self.totals.pop(g, None)
+
+    def invalidateGroups(self):
+        "the members of some group changed"
+        self.groups = None
+        self.totals.clear()
+
+    def part(self, name):
+        "(mass, CoG) of the part name, or None"
+        if name not in self.parts:
+            o = self.doc().getObject(name)
+            try:
+                self.parts[name] = partMass(o) if o else None
+            except Exception as e:
+                FreeCAD.Console.PrintWarning("Mass of %s not evaluated: %s\n" % (name, e))
+                self.parts[name] = None
+        return self.parts[name]
+
+    def group(self, name):
+        "(mass, CoG) of the group name, summing the values of its parts"
+        members = self.members()
+        if name not in self.totals:
+            items = [self.part(n) for n in members.get(name, [])]
+            self.totals[name] = combine([i for i in items if i])
+        return self.totals[name]
+
+    def assembly(self):
+        "(mass, CoG) of all the parts of the groups and of the other parts"
+        names = {n for names in self.members().values() for n in names}
+        names.update(o.Name for o in self.doc().Objects if isMassItem(o))
+        return combine([i for i in (self.part(n) for n in names) if i])
+
+    def report(self):
+        """
+        report()
+        Returns the list of (label, mass, CoG) of each group and, last,
+        of the assembly.
+        """
+        doc = self.doc()
+        rows = list()
+        for name in sorted(self.members()):
+            o = doc.getObject(name)
+            if o:
+                rows.append((o.Label,) + self.group(name))
+        rows.append(("Assembly",) + self.assembly())
+        return rows
+
+
+class MassObserver(object):
+    "Document observer that keeps the MassCache instances up to date"
+
+    def slotCreatedObject(self, obj):
+        cache = _caches.get(obj.Document.Name)
+        if cache:
+            cache.invalidateGroups()
+
+    def slotDeletedObject(self, obj):
+        cache = _caches.get(obj.Document.Name)
+        if cache:
+            cache.invalidate(obj.Name)
+            cache.invalidateGroups()
+
+    def slotChangedObject(self, obj, prop):
+        cache = _caches.get(obj.Document.Name)
+        if cache:
+            if prop in MASS_PROPS:
+                cache.invalidate(obj.Name)
+            elif prop in GROUP_PROPS:
+                cache.invalidateGroups()
+
+    def slotDeletedDocument(self, doc):
+        _caches.pop(doc.Name, None)
+
+
+def install():
+    "register the document observer once"
+    global _observer
+    if _observer is None:
+        _observer = MassObserver()
+        FreeCAD.addDocumentObserver(_observer)
+
+
+def uninstall():
+    global _observer
+    if _observer is not None:
+        FreeCAD.removeDocumentObserver(_observer)
+        _observer = None
+    _caches.clear()
+
+
+def getCache(doc=None):
+    """
+    getCache(doc=None)
+    Returns the MassCache of the document, building it at first call.
+      doc: the App document; default the ActiveDocument
+    """
+    if doc is None:
+        doc = FreeCAD.ActiveDocument
+    if doc is None:
+        return None
+    install()
+    cache = _caches.get(doc.Name)
+    if cache is None:
+        cache = _caches[doc.Name] = MassCache(doc)
+    return cache
+
+
+def toSpreadsheet(doc=None):
+    """
+    toSpreadsheet(doc=None)
+    Writes the report() of the document in the spreadsheet SHEET, created
+    if missing: label, mass (kg) and CoG (mm) of each group and of the
+    assembly. Returns the spreadsheet.
+    """
+    cache = getCache(doc)
+    doc = cache.doc()
+    sheet = doc.getObject(SHEET)
+    if sheet is None:
+        sheet = doc.addObject("Spreadsheet::Sheet", SHEET)
+    sheet.clearAll()
+    for col, title in zip("ABCDE", ["Group", "Mass [kg]", "CoG X", "CoG Y", "CoG Z"]):
+        sheet.set(col + "1", title)
+    for i, (label, mass, G) in enumerate(cache.report(), 2):
+        sheet.set("A%d" % i, label)
+        for col, value in zip("BCDE", (mass, G.x, G.y, G.z)):
+            sheet.set("%s%d" % (col, i), "%.3f" % value)
+    doc.recompute([sheet])
+    return sheet